@@ -0,0 +1,10 @@
+""" pytaf benchmarks
+
+Run from the source tree root:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json
+
+See benchmarks.run for what is measured and benchmarks.corpus
+for the reports it is measured on.
+"""
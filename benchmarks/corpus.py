@@ -0,0 +1,236 @@
+""" Synthetic report corpora
+
+Reports are generated from a seeded random number generator, so the same
+seed always gives the same corpus and benchmark runs are comparable.
+Profiles:
+
+    us         US stations: statute mile visibility, knots, FM groups, A altimeter
+    icao       ICAO stations: visibility in meters, m/s or knots, CAVOK,
+               BECMG, TEMPO and PROB groups, Q pressure
+    heavy      Long TAFs with many FM and TEMPO groups and heavy weather
+    malformed  Damaged reports: truncated, garbled, missing header parts, junk
+    mixed      All of the above, mostly well-formed
+
+A corpus can also be written out, one report per line:
+
+    python -m benchmarks.corpus --profile mixed --count 1000 --seed 1 > reports.txt
+"""
+
+import sys
+import random
+import argparse
+
+PROFILES = ("us", "icao", "heavy", "malformed", "mixed")
+
+# Share of every profile in the mixed corpus
+MIX = (("us", 40), ("icao", 40), ("heavy", 15), ("malformed", 5))
+
+# Share of METARs in the us and icao profiles
+METAR_SHARE = 0.4
+
+LIGHT_WEATHER = ("-RA", "RA", "-SHRA", "BR", "HZ", "-DZ", "-SN", "VCSH", "FG", "BCFG", "-RADZ", "MIFG")
+HEAVY_WEATHER = ("+RA", "+TSRA", "+TSRAGR", "TSGS", "+SHSN", "+FZRA", "FZDZ", "+SHRASN", "BLSN",
+                 "DRSN", "+DS", "+SS", "FC", "+FC", "SQ", "VCTS", "PO", "VA", "-FZRAPL", "+SHGR")
+
+US_VISIBILITY = ("P6SM", "P6SM", "6SM", "5SM", "3SM", "2SM", "1 1/2SM", "1SM", "3/4SM", "1/2SM", "1/4SM")
+ICAO_VISIBILITY = ("9999", "9999", "8000", "6000", "4000", "2500", "1200", "0800", "0400", "0100")
+
+
+class _Generator(object):
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def station(self, prefixes):
+        r = self.random
+        return(r.choice(prefixes) + "".join(r.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3)))
+
+    def wind(self, units=("KT",)):
+        r = self.random
+        if r.random() < 0.1:
+            return("00000" + r.choice(units))
+        direction = "VRB" if r.random() < 0.1 else "%03d" % (r.randrange(1, 37) * 10)
+        speed = r.randrange(2, 30)
+        gust = "G%02d" % (speed + r.randrange(8, 25)) if r.random() < 0.2 else ""
+        return("%s%02d%s%s" % (direction, speed, gust, r.choice(units)))
+
+    def clouds(self, clear="SKC"):
+        r = self.random
+        if r.random() < 0.15:
+            return(clear)
+        if r.random() < 0.03:
+            return("VV%03d" % r.randrange(1, 10))
+
+        layers = []
+        height = 0
+        for amount in ("FEW", "SCT", "BKN", "OVC")[r.randrange(0, 3):][:r.randrange(1, 4)]:
+            height += r.randrange(5, 60)
+            cloud_type = r.choice(("CB", "TCU")) if r.random() < 0.1 else ""
+            layers.append("%s%03d%s" % (amount, height, cloud_type))
+        return(" ".join(layers))
+
+    def weather(self, heavy=False):
+        r = self.random
+        words = []
+        for _ in range(r.randrange(0, 4 if heavy else 2)):
+            words.append(r.choice(HEAVY_WEATHER if heavy and r.random() < 0.7 else LIGHT_WEATHER))
+        return(words)
+
+    def windshear(self):
+        r = self.random
+        return("WS%03d/%03d%02dKT" % (r.randrange(1, 20), r.randrange(1, 37) * 10, r.randrange(20, 60)))
+
+    def conditions(self, us, heavy=False):
+        r = self.random
+        parts = [self.wind(("KT",) if us else ("KT", "MPS"))]
+        if not us and r.random() < 0.15:
+            parts.append("CAVOK")
+            return(" ".join(parts))
+
+        parts.append(r.choice(US_VISIBILITY if us else ICAO_VISIBILITY))
+        parts.extend(self.weather(heavy))
+        parts.append(self.clouds("SKC" if us else "NSC"))
+        if heavy and r.random() < 0.3:
+            parts.append(self.windshear())
+        return(" ".join(parts))
+
+    def taf(self, us, heavy=False):
+        r = self.random
+        day = r.randrange(1, 29)
+        start = r.choice((0, 6, 12, 18))
+        station = self.station("K" if us else "ELU")
+        kind = r.choice(("", "", "", "", "AMD ", "COR "))
+
+        lines = ["TAF %s%s %02d%02d%02dZ %02d%02d/%02d%02d %s" % (
+            kind, station, day, (start + 22) % 24, r.randrange(20, 50),
+            day, start, day + 1, start, self.conditions(us, heavy))]
+
+        hour = start
+        for _ in range(r.randrange(8, 20) if heavy else r.randrange(0, 6)):
+            hour += r.randrange(1, 4)
+            if hour >= start + 24:
+                break
+            from_day, from_hour = day + hour // 24, hour % 24
+            till = hour + r.randrange(2, 5)
+            till_day, till_hour = day + till // 24, till % 24
+
+            if us:
+                change = r.choice(("FM", "FM", "FM", "TEMPO", "PROB30"))
+            else:
+                change = r.choice(("BECMG", "TEMPO", "TEMPO", "PROB30", "PROB40 TEMPO", "FM"))
+
+            if change == "FM":
+                lines.append("FM%02d%02d00 %s" % (from_day, from_hour, self.conditions(us, heavy)))
+            else:
+                lines.append("%s %02d%02d/%02d%02d %s" % (change, from_day, from_hour, till_day, till_hour,
+                                                          self.conditions(us, heavy)))
+
+        report = "\n     ".join(lines)
+        if r.random() < 0.02:
+            report += " $"
+        return(report)
+
+    def metar(self, us):
+        r = self.random
+        temperature = r.randrange(-25, 35)
+        dewpoint = temperature - r.randrange(0, 10)
+
+        def degrees(value):
+            return("M%02d" % -value if value < 0 else "%02d" % value)
+
+        if us:
+            pressure = "A%04d" % r.randrange(2900, 3100)
+        else:
+            pressure = "Q%04d" % r.randrange(980, 1040)
+
+        return("METAR %s %02d%02d%02dZ %s %s/%s %s" % (
+            self.station("K" if us else "ELU"), r.randrange(1, 29), r.randrange(0, 24), r.choice((20, 50, 53)),
+            self.conditions(us), degrees(temperature), degrees(dewpoint), pressure))
+
+    def malformed(self):
+        r = self.random
+        report = self.taf(r.random() < 0.5) if r.random() < 0.7 else self.metar(r.random() < 0.5)
+        damage = r.randrange(0, 6)
+
+        if damage == 0:
+            # Truncated in transmission
+            return(report[:r.randrange(1, len(report))])
+        elif damage == 1:
+            # Garbled tokens
+            tokens = report.split()
+            for _ in range(r.randrange(1, 4)):
+                i = r.randrange(len(tokens))
+                tokens[i] = "".join(r.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789/") for _ in tokens[i])
+            return(" ".join(tokens))
+        elif damage == 2:
+            # No issue time
+            tokens = report.split()
+            return(" ".join(token for token in tokens if not token.endswith("Z")))
+        elif damage == 3:
+            # Line noise
+            return("".join(r.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789/ ") for _ in range(r.randrange(5, 400))))
+        elif damage == 4:
+            # Repeated groups, as sent by a stuck encoder
+            return(report + (" " + report.split(None, 4)[-1]) * r.randrange(5, 30))
+        else:
+            return("")
+
+    def report(self, profile):
+        r = self.random
+        if profile == "us" or profile == "icao":
+            us = profile == "us"
+            return(self.metar(us) if r.random() < METAR_SHARE else self.taf(us))
+        elif profile == "heavy":
+            return(self.taf(r.random() < 0.5, heavy=True))
+        elif profile == "malformed":
+            return(self.malformed())
+        else:
+            raise ValueError("Unknown corpus profile: %s" % profile)
+
+
+def generate(count, seed=0, profile="mixed"):
+    """ Generates a list of reports
+
+    Args:
+        count: Number of reports
+        seed: Random seed, the same seed gives the same reports
+        profile: One of PROFILES
+
+    Returns:
+        List of report strings
+    """
+    return(list(iter_reports(count, seed, profile)))
+
+
+def iter_reports(count, seed=0, profile="mixed"):
+    """ Yields the reports of generate() one at a time, for corpora too big to hold twice """
+
+    if profile not in PROFILES:
+        raise ValueError("Unknown corpus profile: %s" % profile)
+
+    generator = _Generator("%s-%s" % (profile, seed))
+
+    if profile != "mixed":
+        for _ in range(count):
+            yield generator.report(profile)
+        return
+
+    profiles = []
+    for name, share in MIX:
+        profiles.extend([name] * share)
+    for _ in range(count):
+        yield generator.report(generator.random.choice(profiles))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic TAF/METAR corpus, one report per line")
+    parser.add_argument("--profile", choices=PROFILES, default="mixed")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for report in generate(args.count, args.seed, args.profile):
+        sys.stdout.write(" ".join(report.split()) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+""" Benchmark runner
+
+Measures, on corpora from benchmarks.corpus:
+
+    parse.<profile>.<variant>  TAF construction, reports/s, for every profile with
+                               the default options, and for the mixed corpus with
+                               the tokens engine, the slots model and lazy parsing
+    field.<name>               Cost of every field parser (TAF._parse_*) on its own,
+                               calls/s on the raw groups of the mixed corpus
+    decode.<profile>           Decoder.decode_taf() throughput, reports/s
+    memory.<model>[.interned]  Peak memory use (tracemalloc) while parsing the mixed
+                               corpus and keeping the results, bytes per report,
+                               with and without TAF(string, intern=True)
+    serialize.<format>         pickle, JSON and pytaf.binary: size, dump and load
+                               throughput on the parsed mixed corpus
+    export.<profile>.<model>.<encoder>
+                               First JSON export of every report of the mixed
+                               and heavy corpora, reports/s, with pytaf.export
+                               and with json.dumps() of the whole report
+
+With --archive COUNT, the memory held by an archive of COUNT mixed reports
+(parsed and kept, as in an in-memory store) is also measured, for every
+model with and without interning, as archive.<model>[.interned]. Every variant
+runs in a new process, and memory is measured as the growth of its peak
+resident set size, so archives far too big for tracemalloc can be measured.
+That takes a while, and up to about 11 KB per report with the dict model.
+
+Results are printed as JSON, and written to a file with --output.
+With --baseline, results are compared with an earlier run, and the exit status
+is 1 if any benchmark got slower (or used more memory) by more than --tolerance:
+
+    python -m benchmarks.run --output before.json
+    # make changes
+    python -m benchmarks.run --baseline before.json
+
+The pytaf package from the source tree (lib/) is benchmarked,
+not an installed one. Every timing is the best of --repeat runs.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import pickle
+import resource
+import argparse
+import platform
+import tracemalloc
+import multiprocessing
+import concurrent.futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib"))
+
+import pytaf
+import pytaf.binary
+import pytaf.export
+from pytaf.model import _to_plain
+
+from . import corpus
+
+FORMAT = 1
+
+# Result fields where bigger is better, and where smaller is better
+RATES = ("reports_per_sec", "calls_per_sec", "dump_reports_per_sec", "load_reports_per_sec")
+COSTS = ("peak_bytes_per_report", "bytes_per_report", "rss_bytes_per_report")
+
+VARIANTS = (("tokens", {"engine": "tokens"}),
+            ("slots", {"model": "slots"}),
+            ("lazy", {"lazy": True}))
+
+
+def _best(function, repeat):
+    """ Returns the shortest time function() takes, in seconds """
+
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return(best)
+
+
+def _parse(reports, **options):
+    return([pytaf.TAF(report, strict=False, **options) for report in reports])
+
+
+def bench_parse(corpora, repeat):
+    results = {}
+    for profile, reports in sorted(corpora.items()):
+        seconds = _best(lambda: _parse(reports), repeat)
+        failed = sum(1 for taf in _parse(reports) if taf.get_status() != pytaf.TAF.STATUS_OK)
+        results["parse.%s.regex" % profile] = {"reports": len(reports), "failed": failed, "seconds": seconds,
+                                               "reports_per_sec": len(reports) / seconds}
+
+    reports = corpora["mixed"]
+    for name, options in VARIANTS:
+        seconds = _best(lambda: _parse(reports, **options), repeat)
+        results["parse.mixed.%s" % name] = {"reports": len(reports), "seconds": seconds,
+                                            "reports_per_sec": len(reports) / seconds}
+    return(results)
+
+
+def bench_fields(reports, repeat):
+    """ Times every field parser on the raw groups it's given during parsing """
+
+    # (parser name, TAF object, raw group) for every group
+    calls = {}
+    for taf in _parse(reports):
+        if taf.get_status() != pytaf.TAF.STATUS_OK:
+            continue
+        if taf.get_header()["form"] == "metar":
+            raw_groups = [taf._get_body()]
+            fields = taf.METAR_GROUP_FIELDS
+        else:
+            raw_groups = taf._raw_weather_groups
+            fields = taf.TAF_GROUP_FIELDS
+        for _, parser in fields:
+            calls.setdefault(parser, []).extend((taf, group) for group in raw_groups)
+
+    results = {}
+    for parser, arguments in sorted(calls.items()):
+        def run():
+            for taf, group in arguments:
+                getattr(taf, parser)(group)
+
+        seconds = _best(run, repeat)
+        results["field.%s" % parser.replace("_parse_", "", 1)] = {
+            "calls": len(arguments), "seconds": seconds, "calls_per_sec": len(arguments) / seconds}
+    return(results)
+
+
+def bench_decode(corpora, repeat):
+    results = {}
+    for profile, reports in sorted(corpora.items()):
+        tafs = [taf for taf in _parse(reports) if taf.get_header() is not None]
+
+        def run():
+            for taf in tafs:
+                # Decoded text is memoized on the TAF object
+                taf._decoded = {}
+                pytaf.Decoder(taf).decode_taf()
+
+        seconds = _best(run, repeat)
+        results["decode.%s" % profile] = {"reports": len(tafs), "seconds": seconds,
+                                          "reports_per_sec": len(tafs) / seconds}
+    return(results)
+
+
+def _memory_variants():
+    """ Yields (name suffix, TAF options) for every model, with and without interning """
+
+    for model in pytaf.TAF.MODELS:
+        yield (model, {"model": model})
+        yield ("%s.interned" % model, {"model": model, "intern": True})
+
+
+def bench_memory(reports):
+    results = {}
+    for name, options in _memory_variants():
+        gc.collect()
+        tracemalloc.start()
+        tafs = _parse(reports, **options)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del tafs
+
+        results["memory.%s" % name] = {"reports": len(reports), "retained_bytes_per_report": current / len(reports),
+                                       "peak_bytes_per_report": peak / len(reports)}
+    return(results)
+
+
+def _max_rss():
+    """ Returns the peak resident set size of the process, in bytes """
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes everywhere but on macOS
+    return(rss if sys.platform == "darwin" else rss * 1024)
+
+
+def _archive(count, seed, options):
+    """ Parses and keeps an archive, in a worker process
+
+    Returns:
+        (memory growth in bytes, seconds)
+    """
+
+    gc.collect()
+    before = _max_rss()
+    start = time.perf_counter()
+    tafs = [pytaf.TAF(report, strict=False, **options) for report in corpus.iter_reports(count, seed)]
+    seconds = time.perf_counter() - start
+    gc.collect()
+    growth = _max_rss() - before
+    del tafs
+    return((growth, seconds))
+
+
+def bench_archive(count, seed):
+    """ Measures the memory held by a big archive of parsed reports, see --archive """
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name, options in _memory_variants():
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=context) as executor:
+            growth, seconds = executor.submit(_archive, count, seed, options).result()
+
+        results["archive.%s" % name] = {"reports": count, "rss_bytes": growth,
+                                        "rss_bytes_per_report": growth / count,
+                                        "reports_per_sec": count / seconds}
+    return(results)
+
+
+def _to_json(tafs):
+    return(json.dumps([[taf.get_taf(), _to_plain(taf.get_header()), _to_plain(taf.get_groups()),
+                        taf.get_maintenance()] for taf in tafs]).encode("utf-8"))
+
+
+def bench_serialize(reports, repeat):
+    tafs = _parse(reports)
+    formats = (("pickle", lambda: pickle.dumps(tafs, pickle.HIGHEST_PROTOCOL), pickle.loads),
+               ("json", lambda: _to_json(tafs), json.loads),
+               ("binary", lambda: pytaf.binary.dumps(tafs), pytaf.binary.loads))
+
+    results = {}
+    for name, dump, load in formats:
+        data = dump()
+        dump_seconds = _best(dump, repeat)
+        load_seconds = _best(lambda: load(data), repeat)
+        results["serialize.%s" % name] = {"reports": len(tafs), "bytes_per_report": len(data) / len(tafs),
+                                          "dump_reports_per_sec": len(tafs) / dump_seconds,
+                                          "load_reports_per_sec": len(tafs) / load_seconds}
+    return(results)
+
+
+def _report_dict(taf):
+    return({"report": taf.get_taf(), "status": taf.get_status(),
+            "error": taf.get_error(), "error_stage": taf.get_error_stage(),
+            "header": _to_plain(taf.get_header()), "groups": _to_plain(taf.get_groups()),
+            "maintenance": taf.get_maintenance()})
+
+
+def bench_export(corpora, repeat):
+    """ Times the first export of every report: pytaf.export memoizes
+        the JSON of a report on it, that memo is cleared before every run.
+        Memoized objects (winds, cloud layers...) are kept between runs,
+        as in a long-running process.
+    """
+
+    encoders = (("pytaf", pytaf.export.dumps),
+                ("json", lambda taf: json.dumps(_report_dict(taf))))
+
+    results = {}
+    for profile in ("mixed", "heavy"):
+        for model in pytaf.TAF.MODELS:
+            tafs = _parse(corpora[profile], model=model)
+            for name, dumps in encoders:
+                def run():
+                    for taf in tafs:
+                        taf._decoded = {}
+                        dumps(taf)
+
+                seconds = _best(run, repeat)
+                size = sum(len(dumps(taf)) for taf in tafs)
+                results["export.%s.%s.%s" % (profile, model, name)] = {
+                    "reports": len(tafs), "bytes_per_report": size / len(tafs),
+                    "seconds": seconds, "reports_per_sec": len(tafs) / seconds}
+    return(results)
+
+
+def run(count=2000, seed=0, repeat=3, archive=None):
+    """ Runs all benchmarks, and the archive benchmark with archive reports if given
+
+    Returns:
+        Dict of run parameters, environment and results, by benchmark name
+    """
+
+    corpora = dict((profile, corpus.generate(count, seed, profile)) for profile in corpus.PROFILES)
+
+    results = {}
+    results.update(bench_parse(corpora, repeat))
+    results.update(bench_fields(corpora["mixed"], repeat))
+    results.update(bench_decode(corpora, repeat))
+    results.update(bench_memory(corpora["mixed"]))
+    results.update(bench_serialize(corpora["mixed"], repeat))
+    results.update(bench_export(corpora, repeat))
+    if archive:
+        results.update(bench_archive(archive, seed))
+
+    return({"format": FORMAT,
+            "python": "%s %s" % (platform.python_implementation(), platform.python_version()),
+            "platform": platform.platform(),
+            "time": int(time.time()),
+            "count": count, "seed": seed, "repeat": repeat, "archive": archive,
+            "results": results})
+
+
+def compare(run, baseline, tolerance):
+    """ Compares results with a baseline run
+
+    Returns:
+        List of (benchmark, field, baseline value, new value) for every
+        result that got worse by more than tolerance (a fraction)
+    """
+
+    regressions = []
+    for name, result in sorted(run["results"].items()):
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for field, value in sorted(result.items()):
+            if field not in old:
+                continue
+            if field in RATES and value < old[field] * (1 - tolerance):
+                regressions.append((name, field, old[field], value))
+            elif field in COSTS and value > old[field] * (1 + tolerance):
+                regressions.append((name, field, old[field], value))
+    return(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run pytaf benchmarks")
+    parser.add_argument("--count", type=int, default=2000, help="Reports per corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing, the best one is kept")
+    parser.add_argument("--archive", type=int, metavar="COUNT",
+                        help="Also measure the memory held by an archive of that many reports, e.g. 2000000")
+    parser.add_argument("--output", help="Write results to a file")
+    parser.add_argument("--baseline", help="Compare with results from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Slowdown ignored when comparing, as a fraction (default 0.1)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline["count"], baseline["seed"]) != (args.count, args.seed):
+            sys.stderr.write("Warning: baseline was run with a different corpus\n")
+
+    results = run(args.count, args.seed, args.repeat, args.archive)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, field, old, new in regressions:
+            sys.stderr.write("Regression: %s %s %.1f -> %.1f (%+.0f%%)\n" % (name, field, old, new,
+                                                                            (new / old - 1) * 100))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
 import re
 from .taf import TAF, MalformedTAF
 from .tafdecoder import Decoder, DecodeError
+from .batch import parse_many, ParseFailure, BatchStats
+from . import grammar
+from .bulletin import read_bulletins
+from .cache import ParseCache
+from .store import StationStore
@@ -0,0 +1,173 @@
+""" asyncio front end (Python 3.6+)
+
+parse_stream() reads bulletins from an asyncio.StreamReader, frames
+the reports as they arrive (see pytaf.bulletin), and parses them in an
+executor, by default a pool of worker processes shared by all streams,
+so that a single event loop can serve many slow connections and still
+keep all CPUs busy:
+
+    async def handle(reader, writer):
+        async for taf in pytaf.aio.parse_stream(reader, errors="skip"):
+            ...
+
+The shared pool is created on first use and lives until shutdown() is called
+or the interpreter exits.
+
+This module is not imported by the pytaf package, import pytaf.aio explicitly.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import collections
+import concurrent.futures
+
+from . import bulletin
+from .batch import BatchStats, _parse_chunk, _check_result
+
+# Worker process pool shared by all streams, and its number of workers
+_executor = None
+_workers = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(concurrency=None):
+    """ Returns the shared worker process pool, creating it if needed
+
+    Args:
+        concurrency: Number of worker processes. Defaults to the number of CPUs.
+
+    Raises:
+        ValueError: The pool exists already with a different number of workers
+    """
+
+    global _executor, _workers
+
+    with _executor_lock:
+        if _executor is None:
+            _workers = concurrency or os.cpu_count() or 1
+            _executor = concurrent.futures.ProcessPoolExecutor(max_workers=_workers)
+        elif concurrency is not None and concurrency != _workers:
+            raise ValueError("The shared pool has %d workers already, call shutdown() to resize it" % _workers)
+        return(_executor)
+
+
+def shutdown(wait=True):
+    """ Shuts the shared worker process pool down, the next stream creates a new one """
+
+    global _executor, _workers
+
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+        _workers = None
+
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def parse_stream(reader, errors="raise", concurrency=None, queue_size=None, executor=None,
+                       chunksize=64, encoding="latin-1", blocksize=65536, stats=None, **options):
+    """ Parses reports from a stream as they arrive
+
+    Results are yielded in the order the reports arrived. At most queue_size
+    chunks of reports are being parsed or waiting to be yielded at any time.
+    Reports framed beyond that wait until the oldest chunk is consumed,
+    and the stream is not read while any are waiting, so slow consumers
+    slow down the sender.
+
+    Args:
+        reader: asyncio.StreamReader, or anything with a coroutine read(n) method
+        errors: Malformed report handling, see parse_many()
+        concurrency: Number of worker processes of the shared pool, see get_executor(),
+                     when no executor is given
+        queue_size: Maximum number of chunks in flight, four per worker by default
+        executor: concurrent.futures executor to parse reports in, instead of
+                  the shared pool. It's not shut down afterwards.
+        chunksize: Maximum number of reports per chunk. Reports framed from
+                   the same block of data are sent to the executor together.
+        encoding: Text encoding of the reports
+        blocksize: Number of bytes read from the stream at once
+        stats: BatchStats object to update with counters
+        options: Keyword arguments passed to the TAF constructor
+
+    Raises:
+        MalformedTAF: A report could not be parsed and errors is "raise"
+
+    Returns:
+        Async generator of TAF (or ParseFailure) objects
+    """
+
+    if errors not in ("raise", "yield", "skip"):
+        raise ValueError("Unknown error handling mode: %s" % errors)
+
+    if executor is None:
+        executor = get_executor(concurrency)
+        concurrency = _workers
+    elif concurrency is None:
+        concurrency = os.cpu_count() or 1
+
+    if queue_size is None:
+        queue_size = concurrency * 4
+    elif queue_size < 1:
+        raise ValueError("queue_size must be at least 1")
+
+    if stats is None:
+        stats = BatchStats()
+
+    loop = asyncio.get_event_loop()
+
+    pending = collections.deque()
+    # (index, report) tuples framed, but not sent to the executor yet
+    backlog = collections.deque()
+    read = None
+    eof = False
+    leftover = b""
+    index = 0
+
+    stats.started = time.time()
+    stats.finished = None
+    try:
+        while True:
+            while backlog and len(pending) < queue_size:
+                chunk = [backlog.popleft() for _ in range(min(chunksize, len(backlog)))]
+                pending.append(loop.run_in_executor(executor, _parse_chunk, chunk, options))
+
+            if read is None and not eof and not backlog and len(pending) < queue_size:
+                read = asyncio.ensure_future(reader.read(blocksize))
+
+            waiting = [pending[0]] if pending else []
+            if read is not None:
+                waiting.append(read)
+            if not waiting:
+                break
+
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if read is not None and read.done():
+                block = read.result()
+                read = None
+
+                if block:
+                    reports, leftover = bulletin._split_block(leftover, block, encoding)
+                else:
+                    # Last report may be missing its terminator
+                    eof = True
+                    report = bulletin.normalize_report(leftover, encoding)
+                    reports = [report] if report else []
+
+                for report in reports:
+                    backlog.append((index, report))
+                    index += 1
+
+            while pending and pending[0].done():
+                for result in pending.popleft().result():
+                    if _check_result(result, errors, stats):
+                        yield result
+    finally:
+        stats.finished = time.time()
+        if read is not None:
+            read.cancel()
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,247 @@
+""" Parsing many reports at once """
+
+import time
+import collections
+
+from .taf import TAF, MalformedTAF
+
+
+class ParseFailure(object):
+    """ A report that could not be parsed, yielded in place of a TAF object
+        when parse_many() is told not to raise errors
+    """
+
+    __slots__ = ("index", "report", "error", "stage")
+
+    def __init__(self, index, report, error, stage=None):
+        """
+        Args:
+            index: Position of the report in the input
+            report: Raw report string
+            error: Error message
+            stage: Parsing stage that failed, one of TAF.STAGES
+        """
+        self.index = index
+        self.report = report
+        self.error = error
+        self.stage = stage
+
+    # Slotted objects need explicit state for pickling with protocol < 2
+    def __getstate__(self):
+        return((self.index, self.report, self.error, self.stage))
+
+    def __setstate__(self, state):
+        self.index, self.report, self.error, self.stage = state
+
+    def __repr__(self):
+        return("ParseFailure(%r, %r, %r, %r)" % (self.index, self.report, self.error, self.stage))
+
+
+class BatchStats(object):
+    """ Counters filled in by parse_many() """
+
+    def __init__(self):
+        self.reports = 0
+        self.failures = 0
+        # Failure counts by parsing stage and by error message
+        self.failed_stages = {}
+        self.failed_errors = {}
+        self.started = None
+        self.finished = None
+
+    def add_failure(self, stage, error):
+        """ Counts a failed report """
+        self.failures += 1
+        self.failed_stages[stage] = self.failed_stages.get(stage, 0) + 1
+        self.failed_errors[error] = self.failed_errors.get(error, 0) + 1
+
+    def elapsed(self):
+        """ Returns time spent parsing in seconds, so far or in total """
+        if self.started is None:
+            return(0.0)
+
+        if self.finished is None:
+            return(time.time() - self.started)
+        else:
+            return(self.finished - self.started)
+
+    def rate(self):
+        """ Returns throughput in reports per second """
+        elapsed = self.elapsed()
+        if elapsed > 0:
+            return(self.reports / elapsed)
+        else:
+            return(0.0)
+
+    def __repr__(self):
+        return("BatchStats(reports=%d, failures=%d, failed_stages=%r, elapsed=%.3f, rate=%.1f)" %
+               (self.reports, self.failures, self.failed_stages, self.elapsed(), self.rate()))
+
+
+def parse_many(reports, errors="raise", skip_blank=True, workers=None, chunksize=256,
+               ordered=True, stats=None, cache=None, **options):
+    """ Lazily parses reports one by one, or in a pool of worker processes
+
+    Args:
+        reports: Any iterable of TAF/METAR report strings,
+                 such as a list, a file object, or a generator
+        errors: What to do with malformed reports: "raise" to raise
+                MalformedTAF, "yield" to yield a ParseFailure in place
+                of the report, "skip" to drop it silently. With strict=False,
+                reports never fail, and failed and partial results are
+                yielded as TAF objects (and counted in stats).
+        skip_blank: Ignore empty and whitespace-only strings
+                    (e.g. blank lines in a file)
+        workers: Number of worker processes. Reports are sent to the workers
+                 in chunks, and only a few chunks per worker are in flight
+                 at any time. None or 1 means parsing in the current process.
+        chunksize: Number of reports per chunk sent to a worker
+        ordered: With workers, yield results in input order.
+                 If False, chunks are yielded as soon as they are done,
+                 and (index, result) tuples are yielded instead of results,
+                 where index is the position of the report in the input
+                 (counting blank ones), the same as ParseFailure.index.
+        stats: BatchStats object to update with counters
+        cache: ParseCache to look reports up in, instead of parsing them
+               with the options given here. Can't be used with workers.
+        options: Keyword arguments passed to the TAF constructor
+
+    Raises:
+        MalformedTAF: A report could not be parsed and errors is "raise"
+
+    Returns:
+        Generator of TAF (or ParseFailure) objects,
+        or of (index, result) tuples if not ordered
+    """
+
+    if errors not in ("raise", "yield", "skip"):
+        raise ValueError("Unknown error handling mode: %s" % errors)
+
+    if stats is None:
+        stats = BatchStats()
+
+    if cache is not None and workers is not None and workers > 1:
+        raise ValueError("A parse cache can't be shared with worker processes")
+
+    if workers is None or workers <= 1:
+        results = _parse_serial(reports, skip_blank, options, cache)
+    else:
+        results = _parse_parallel(reports, skip_blank, options, workers, chunksize, ordered)
+
+    stats.started = time.time()
+    stats.finished = None
+    try:
+        for index, result in results:
+            if _check_result(result, errors, stats):
+                if ordered:
+                    yield result
+                else:
+                    yield (index, result)
+    finally:
+        stats.finished = time.time()
+        results.close()
+
+
+def _check_result(result, errors, stats):
+    """ Counts a result, and tells if it should be passed on
+
+    Raises:
+        MalformedTAF: The result is a ParseFailure and errors is "raise"
+    """
+
+    stats.reports += 1
+    if isinstance(result, ParseFailure):
+        stats.add_failure(result.stage, result.error)
+        if errors == "raise":
+            raise MalformedTAF(result.error, result.stage)
+        elif errors == "skip":
+            return(False)
+    elif result._status != TAF.STATUS_OK:
+        # Parsed with strict=False. Private attributes, since
+        # get_status() would force parsing of lazy results.
+        stats.add_failure(result._error_stage, result._error)
+    return(True)
+
+
+def _parse_one(index, report, options, cache=None):
+    try:
+        if cache is not None:
+            return(cache.parse(report))
+        return(TAF(report, **options))
+    except MalformedTAF as e:
+        return(ParseFailure(index, report, e.strerror, e.stage))
+
+
+def _parse_chunk(chunk, options):
+    """ Worker process entry point """
+    return([_parse_one(index, report, options) for index, report in chunk])
+
+
+def _enumerate_reports(reports, skip_blank):
+    index = -1
+    for report in reports:
+        index += 1
+
+        if skip_blank and isinstance(report, str) and not report.strip():
+            continue
+
+        yield (index, report)
+
+
+def _chunks(reports, skip_blank, chunksize):
+    chunk = []
+    for item in _enumerate_reports(reports, skip_blank):
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+# Both yield (index, result) tuples
+
+def _parse_serial(reports, skip_blank, options, cache):
+    for index, report in _enumerate_reports(reports, skip_blank):
+        yield (index, _parse_one(index, report, options, cache))
+
+
+def _parse_parallel(reports, skip_blank, options, workers, chunksize, ordered):
+    # Not available in Python 2 without the "futures" backport,
+    # so it's only imported when actually needed
+    import concurrent.futures
+
+    max_pending = workers * 4
+    chunks = _chunks(reports, skip_blank, chunksize)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # (chunk, future) tuples
+        pending = collections.deque()
+        exhausted = False
+
+        while True:
+            # Keep the pool busy, but don't read the whole input into memory
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append((chunk, executor.submit(_parse_chunk, chunk, options)))
+
+            if not pending:
+                break
+
+            if ordered:
+                chunk, done = pending.popleft()
+            else:
+                finished, _ = concurrent.futures.wait([future for _, future in pending],
+                                                      return_when=concurrent.futures.FIRST_COMPLETED)
+                done = finished.pop()
+                entry = next(entry for entry in pending if entry[1] is done)
+                pending.remove(entry)
+                chunk = entry[0]
+
+            for (index, _), result in zip(chunk, done.result()):
+                yield (index, result)
@@ -0,0 +1,553 @@
+""" Compact binary serialization of parsed reports
+
+dumps() turns parsed reports into a single binary blob, much smaller
+than their pickles or JSON, and Reader gives access to the reports
+and their fields straight from the blob, a memoryview or an mmap,
+without decoding anything that isn't looked up:
+
+    with open("reports.bin", "wb") as f:
+        pytaf.binary.dump(tafs, f)
+
+    with pytaf.binary.Reader.open("reports.bin") as reader:
+        for report in reader:
+            report.header_field("icao_code"), report.group_field(0, "wind", "speed")
+
+Format (version 1, little-endian):
+
+    header   "PTAF", version (H), code table size (H), report count (I),
+             offset of the report index (I), offset of the string pool (I)
+    reports  one record per report, see below
+    index    offset of every record (I)
+    pool     string count (I), offset of every string and of the end
+             of the last one, relative to the pool data (I), UTF-8 data
+
+    record   length (I), status (B), header span start and end (i, -1 if none),
+             group count (H), offset of every group relative to the record (I),
+             then the values: report text, header, maintenance, error,
+             error stage, groups
+
+Every value starts with a one byte tag. Strings from pytaf.codes are stored
+as their position in the code table: positions below 240 (field names,
+keywords, weather codes and two digit numbers) in the tag itself,
+others after it (H). Other strings are stored as their position in
+the string pool (I), where every distinct string is stored once, integers
+(resolved times) as q. Lists and dicts start with their size in bytes (I),
+so that they can be skipped over without decoding them, followed by
+their items. Dict keys are values too.
+"""
+
+import mmap
+import struct
+
+from . import codes
+from .taf import TAF
+from .model import Record, Header, Group
+
+MAGIC = b"PTAF"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIII")
+_RECORD = struct.Struct("<IBiiH")
+_UINT16 = struct.Struct("<H")
+_UINT32 = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+
+# Value tags
+NONE = 0
+TRUE = 1
+FALSE = 2
+CODE = 3
+STRING = 4
+INTEGER = 5
+LIST = 6
+DICT = 7
+TEXT = 8
+
+# Tags from SHORT_CODE up are codes at position tag - SHORT_CODE
+SHORT_CODE = 16
+_SHORT_CODES = 256 - SHORT_CODE
+
+# Fixed value sizes, tag included
+_SIZES = {NONE: 1, TRUE: 1, FALSE: 1, CODE: 3, STRING: 5, INTEGER: 9}
+
+STATUSES = (TAF.STATUS_OK, TAF.STATUS_PARTIAL, TAF.STATUS_FAILED)
+
+
+class FormatError(Exception):
+    """ Data is not in a format this version can read """
+    pass
+
+
+class Writer(object):
+    """ Serializes reports one by one """
+
+    def __init__(self):
+        self._records = bytearray()
+        self._offsets = []
+        # String -> position in the pool
+        self._pool = {}
+
+    def add(self, taf):
+        """ Adds a TAF object """
+
+        groups = taf.get_groups()
+        if groups is None:
+            groups = []
+
+        span = taf.get_header_span() or (-1, -1)
+        out = self._records
+        start = len(out)
+        self._offsets.append(start)
+
+        out += _RECORD.pack(0, STATUSES.index(taf.get_status()), span[0], span[1], len(groups))
+        table = len(out)
+        out += bytes(4 * len(groups))
+
+        raw = taf.get_taf()
+        if isinstance(raw, str):
+            text = raw.encode("utf-8")
+            out.append(TEXT)
+            out += _UINT32.pack(len(text))
+            out += text
+        else:
+            out.append(NONE)
+
+        self._add_value(taf.get_header())
+        self._add_value(taf.get_maintenance())
+        self._add_value(taf.get_error())
+        self._add_value(taf.get_error_stage())
+
+        for i, group in enumerate(groups):
+            _UINT32.pack_into(out, table + 4 * i, len(out) - start)
+            self._add_value(group)
+
+        _UINT32.pack_into(out, start, len(out) - start)
+
+    def _add_value(self, value):
+        out = self._records
+
+        if value is None:
+            out.append(NONE)
+        elif value is True:
+            out.append(TRUE)
+        elif value is False:
+            out.append(FALSE)
+        elif isinstance(value, str):
+            position = codes.INDEX.get(value)
+            if position is not None and position < _SHORT_CODES:
+                out.append(SHORT_CODE + position)
+            elif position is not None:
+                out.append(CODE)
+                out += _UINT16.pack(position)
+            else:
+                position = self._pool.get(value)
+                if position is None:
+                    position = self._pool[value] = len(self._pool)
+                out.append(STRING)
+                out += _UINT32.pack(position)
+        elif isinstance(value, int):
+            out.append(INTEGER)
+            out += _INT64.pack(value)
+        elif isinstance(value, (dict, Record)):
+            start = len(out)
+            out.append(DICT)
+            out += bytes(4)
+            for key, item in value.items():
+                self._add_value(key)
+                self._add_value(item)
+            _UINT32.pack_into(out, start + 1, len(out) - start)
+        elif isinstance(value, list):
+            start = len(out)
+            out.append(LIST)
+            out += bytes(4)
+            for item in value:
+                self._add_value(item)
+            _UINT32.pack_into(out, start + 1, len(out) - start)
+        else:
+            raise TypeError("Can't serialize %r" % (value,))
+
+    def getvalue(self):
+        """ Returns the serialized reports """
+
+        strings = [None] * len(self._pool)
+        for string, position in self._pool.items():
+            strings[position] = string.encode("utf-8")
+
+        index_offset = _HEADER.size + len(self._records)
+        pool_offset = index_offset + 4 * len(self._offsets)
+
+        data = [_HEADER.pack(MAGIC, VERSION, len(codes.CODES), len(self._offsets), index_offset, pool_offset),
+                bytes(self._records)]
+        data.append(struct.pack("<%dI" % len(self._offsets), *[offset + _HEADER.size for offset in self._offsets]))
+
+        positions = [0]
+        for string in strings:
+            positions.append(positions[-1] + len(string))
+        data.append(_UINT32.pack(len(strings)))
+        data.append(struct.pack("<%dI" % len(positions), *positions))
+        data.extend(strings)
+
+        return(b"".join(data))
+
+
+def dumps(tafs):
+    """ Serializes TAF objects
+
+    Args:
+        tafs: Iterable of TAF objects
+
+    Returns:
+        bytes
+    """
+
+    writer = Writer()
+    for taf in tafs:
+        writer.add(taf)
+    return(writer.getvalue())
+
+
+def dump(tafs, file):
+    """ Serializes TAF objects to a binary file object """
+    file.write(dumps(tafs))
+
+
+def loads(data, model="dict"):
+    """ Deserializes TAF objects
+
+    Args:
+        data: bytes, or anything that supports the buffer protocol
+        model: Result model of the TAF objects, see TAF
+
+    Returns:
+        List of TAF objects
+    """
+
+    reader = Reader(data)
+    return([report.to_taf(model) for report in reader])
+
+
+def load(file, model="dict"):
+    """ Deserializes TAF objects from a binary file object """
+    return(loads(file.read(), model))
+
+
+class Reader(object):
+    """ Serialized reports, read in place """
+
+    def __init__(self, buffer):
+        """
+        Args:
+            buffer: bytes, memoryview, mmap or anything that supports the buffer protocol.
+                    It's read in place, not copied.
+
+        Raises:
+            FormatError: Not serialized reports, or a newer format version
+        """
+
+        self._buffer = memoryview(buffer)
+        self._file = None
+        self._mmap = None
+
+        if len(self._buffer) < _HEADER.size:
+            raise FormatError("Data is too short")
+
+        magic, version, code_count, self._count, self._index, pool = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise FormatError("Not serialized reports")
+        if version != VERSION:
+            raise FormatError("Unsupported format version: %d" % version)
+        if code_count > len(codes.CODES):
+            raise FormatError("Data uses codes unknown to this version")
+
+        self._string_count = _UINT32.unpack_from(self._buffer, pool)[0]
+        self._string_offsets = pool + 4
+        self._string_data = self._string_offsets + 4 * (self._string_count + 1)
+
+        # Pool position -> decoded string
+        self._strings = {}
+
+    @classmethod
+    def open(cls, path):
+        """ Maps a file into memory and reads it in place """
+
+        file = open(path, "rb")
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            file.close()
+            raise
+
+        reader = cls(buffer)
+        reader._file = file
+        reader._mmap = buffer
+        return(reader)
+
+    def close(self):
+        """ Releases the buffer, and the file if it was opened by open().
+            Views and values obtained from the reader must not be used afterwards.
+        """
+
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+            self._file = None
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return(self._count)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("Report index out of range")
+        return(ReportView(self, _UINT32.unpack_from(self._buffer, self._index + 4 * i)[0]))
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def _string(self, position):
+        try:
+            return(self._strings[position])
+        except KeyError:
+            pass
+
+        start, end = struct.unpack_from("<II", self._buffer, self._string_offsets + 4 * position)
+        string = str(self._buffer[self._string_data + start:self._string_data + end], "utf-8")
+        self._strings[position] = string
+        return(string)
+
+    def _value(self, offset):
+        """ Decodes the value at offset
+
+        Returns:
+            (value, offset of the next value) tuple
+        """
+
+        buffer = self._buffer
+        tag = buffer[offset]
+
+        if tag >= SHORT_CODE:
+            return((codes.CODES[tag - SHORT_CODE], offset + 1))
+        elif tag == NONE:
+            return((None, offset + 1))
+        elif tag == DICT:
+            end = offset + _UINT32.unpack_from(buffer, offset + 1)[0]
+            value = {}
+            offset += 5
+            while offset < end:
+                key, offset = self._value(offset)
+                value[key], offset = self._value(offset)
+            return((value, end))
+        elif tag == LIST:
+            end = offset + _UINT32.unpack_from(buffer, offset + 1)[0]
+            value = []
+            offset += 5
+            while offset < end:
+                item, offset = self._value(offset)
+                value.append(item)
+            return((value, end))
+        elif tag == STRING:
+            return((self._string(_UINT32.unpack_from(buffer, offset + 1)[0]), offset + 5))
+        elif tag == CODE:
+            return((codes.CODES[_UINT16.unpack_from(buffer, offset + 1)[0]], offset + 3))
+        elif tag == INTEGER:
+            return((_INT64.unpack_from(buffer, offset + 1)[0], offset + 9))
+        elif tag == TRUE:
+            return((True, offset + 1))
+        elif tag == FALSE:
+            return((False, offset + 1))
+        elif tag == TEXT:
+            size = _UINT32.unpack_from(buffer, offset + 1)[0]
+            return((str(buffer[offset + 5:offset + 5 + size], "utf-8"), offset + 5 + size))
+        else:
+            raise FormatError("Unknown value tag: %d" % tag)
+
+    def _skip(self, offset):
+        """ Returns the offset of the value after the one at offset """
+
+        tag = self._buffer[offset]
+        if tag >= SHORT_CODE:
+            return(offset + 1)
+        elif tag in (LIST, DICT):
+            return(offset + _UINT32.unpack_from(self._buffer, offset + 1)[0])
+        elif tag == TEXT:
+            return(offset + 5 + _UINT32.unpack_from(self._buffer, offset + 1)[0])
+        else:
+            return(offset + _SIZES[tag])
+
+    def _lookup(self, offset, path):
+        """ Decodes the value at a path of dict keys and list indices
+            under the value at offset, skipping over everything else
+
+        Raises:
+            KeyError, IndexError: Path doesn't exist
+        """
+
+        for step in path:
+            tag = self._buffer[offset]
+            if tag == DICT:
+                end = offset + _UINT32.unpack_from(self._buffer, offset + 1)[0]
+                position = offset + 5
+                while position < end:
+                    key, position = self._value(position)
+                    if key == step:
+                        break
+                    position = self._skip(position)
+                else:
+                    raise KeyError(step)
+            elif tag == LIST:
+                if not isinstance(step, int):
+                    raise IndexError(step)
+                end = offset + _UINT32.unpack_from(self._buffer, offset + 1)[0]
+                items = []
+                position = offset + 5
+                while position < end and (step < 0 or len(items) <= step):
+                    items.append(position)
+                    position = self._skip(position)
+                position = items[step]
+            else:
+                raise KeyError(step)
+            offset = position
+
+        return(self._value(offset)[0])
+
+
+class ReportView(object):
+    """ A serialized report, read in place
+
+    Has the same getters as TAF, plus field lookups that only decode
+    the field looked up.
+    """
+
+    __slots__ = ("_reader", "_offset")
+
+    def __init__(self, reader, offset):
+        self._reader = reader
+        self._offset = offset
+
+    def _record(self):
+        return(_RECORD.unpack_from(self._reader._buffer, self._offset))
+
+    def _values(self):
+        """ Returns the offset of the first value (the report text) """
+        return(self._offset + _RECORD.size + 4 * self._record()[4])
+
+    def _header_offset(self):
+        return(self._reader._skip(self._values()))
+
+    def _group_offset(self, index):
+        count = self._record()[4]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("Group index out of range")
+        return(self._offset + _UINT32.unpack_from(self._reader._buffer, self._offset + _RECORD.size + 4 * index)[0])
+
+    def get_taf(self):
+        return(self._reader._value(self._values())[0])
+
+    def get_header_span(self):
+        start, end = self._record()[2:4]
+        if start < 0:
+            return(None)
+        return((start, end))
+
+    def get_header(self):
+        return(self._reader._value(self._header_offset())[0])
+
+    def get_maintenance(self):
+        return(self._reader._value(self._reader._skip(self._header_offset()))[0])
+
+    def _error_offset(self):
+        return(self._reader._skip(self._reader._skip(self._header_offset())))
+
+    def get_error(self):
+        return(self._reader._value(self._error_offset())[0])
+
+    def get_error_stage(self):
+        return(self._reader._value(self._reader._skip(self._error_offset()))[0])
+
+    def get_status(self):
+        return(STATUSES[self._record()[1]])
+
+    def get_groups(self):
+        return([self._reader._value(self._group_offset(i))[0] for i in range(self.group_count())])
+
+    def group_count(self):
+        return(self._record()[4])
+
+    def get_group(self, index):
+        """ Returns a group dict """
+        return(self._reader._value(self._group_offset(index))[0])
+
+    def header_field(self, *path, **kwargs):
+        """ Returns a header field, e.g. header_field("icao_code")
+
+        Args:
+            path: Field name, followed by keys or indices of nested values if any
+            default: Returned if the field doesn't exist, None by default
+        """
+
+        try:
+            return(self._reader._lookup(self._header_offset(), path))
+        except (KeyError, IndexError):
+            return(kwargs.get("default"))
+
+    def group_field(self, index, *path, **kwargs):
+        """ Returns a group field, e.g. group_field(0, "wind", "speed")
+            or group_field(0, "clouds", 0, "layer")
+
+        Args:
+            index: Group index
+            path: Field name, followed by keys or indices of nested values if any
+            default: Returned if the field doesn't exist, None by default
+
+        Raises:
+            IndexError: No group with that index
+        """
+
+        offset = self._group_offset(index)
+        try:
+            return(self._reader._lookup(offset, path))
+        except (KeyError, IndexError):
+            return(kwargs.get("default"))
+
+    def to_taf(self, model="dict"):
+        """ Decodes the report into a TAF object
+
+        Args:
+            model: Result model, see TAF
+        """
+
+        if model not in TAF.MODELS:
+            raise ValueError("Unknown result model: %s" % model)
+
+        reader = self._reader
+        status, start, end, count = self._record()[1:]
+
+        raw, position = reader._value(self._values())
+        header, position = reader._value(position)
+        maintenance, position = reader._value(position)
+        error, position = reader._value(position)
+        error_stage, position = reader._value(position)
+
+        groups = []
+        for _ in range(count):
+            group, position = reader._value(position)
+            groups.append(group)
+
+        if model == "slots":
+            header = Header.from_dict(header)
+            groups = [Group.from_dict(group) for group in groups]
+
+        return(TAF._restore(raw, header, groups, maintenance, None if start < 0 else (start, end),
+                            STATUSES[status], error, error_stage, model))
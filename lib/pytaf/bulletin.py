@@ -0,0 +1,198 @@
+""" Reading reports from WMO bulletin files and streams
+
+Feeds usually deliver reports as bulletins: several reports in a row,
+each terminated by "=", possibly wrapped over several lines, with a WMO
+abbreviated heading (e.g. "FTUS80 KWBC 291200") and transmission control
+characters around them:
+
+    \\x01
+    123
+    FTUS80 KWBC 291200
+    TAF
+    KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001
+         TEMPO 2914/2915 1SM -BR CLR=
+    KBOS 291130Z 2912/3018 18005KT P6SM SKC=
+    \\x03
+
+Files are memory-mapped and scanned for report boundaries in place,
+only one report at a time is copied out of the map.
+"""
+
+import re
+import mmap
+
+from . import grammar
+from .taf import TAF
+from .batch import parse_many
+
+# Report terminator or end of transmission
+_TERMINATOR = re.compile(b"[=\x03]")
+
+# Start of transmission and other control characters
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Maximum length of an incomplete report kept between stream blocks.
+# Raw reports are longer than parsed ones (headings, line wrapping),
+# but anything past twice the parser limit can't be a report.
+MAX_PENDING = TAF.MAX_LENGTH * 2
+
+
+def normalize_report(data, encoding="latin-1"):
+    """ Turns a raw report from a bulletin into a single line report string
+
+    WMO headings, sequence numbers and control characters are removed,
+    continuation lines are joined, and runs of whitespace are
+    replaced with a single space.
+
+    Args:
+        data: Raw report text (bytes or str) without the "=" terminator
+        encoding: Encoding for bytes input
+
+    Returns:
+        Report string, empty if there's no report in data
+    """
+
+    if isinstance(data, bytes) and not isinstance(data, str):
+        data = data.decode(encoding, "replace")
+
+    heading = grammar.get("wmo_heading")
+    filler = grammar.get("bulletin_filler")
+
+    lines = []
+    for line in _CONTROL_CHARS.sub(" ", data).splitlines():
+        if filler.match(line) or heading.match(line):
+            continue
+        lines.append(line)
+
+    return(" ".join(" ".join(lines).split()))
+
+
+def _frames(buffer, start=0):
+    """ Finds report boundaries in a bytes-like buffer (bytes or mmap)
+
+    Yields:
+        (start, end) positions of every complete report,
+        terminator not included
+    """
+    while True:
+        match = _TERMINATOR.search(buffer, start)
+        if not match:
+            return
+        yield (start, match.start())
+        start = match.end()
+
+
+def iter_reports(source, encoding="latin-1", blocksize=65536):
+    """ Yields normalized report strings from a bulletin file or stream
+
+    Args:
+        source: File name (the file is memory-mapped), or a binary
+                file-like object with a read() method, such as sys.stdin.buffer
+                or a socket file
+        encoding: Text encoding of the reports
+        blocksize: Number of bytes read from a stream at once
+
+    Returns:
+        Generator of report strings, ready to be passed to TAF
+    """
+
+    if hasattr(source, "read"):
+        for report in _iter_stream(source, encoding, blocksize):
+            yield report
+        return
+
+    with open(source, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+
+        try:
+            consumed = 0
+            for start, end in _frames(buffer):
+                consumed = end + 1
+                report = normalize_report(buffer[start:end], encoding)
+                if report:
+                    yield report
+
+            # Last report may be missing its terminator
+            report = normalize_report(buffer[consumed:], encoding)
+            if report:
+                yield report
+        finally:
+            buffer.close()
+
+
+def _split_block(pending, block, encoding):
+    """ Frames reports in a block of a stream
+
+    Args:
+        pending: Incomplete report left over from the previous block
+        block: Data read from the stream
+        encoding: Text encoding of the reports
+
+    Returns:
+        (reports, pending) tuple: list of complete report strings,
+        and the incomplete report at the end of the block.
+        An incomplete report longer than MAX_PENDING is not kept,
+        it's passed on as a report of its own (which the parser rejects
+        as too long), and the rest of it up to the next terminator
+        makes another report.
+    """
+
+    if not isinstance(block, bytes):
+        block = block.encode(encoding, "replace")
+
+    reports = []
+    if _TERMINATOR.search(block):
+        buffer = pending + block
+        consumed = 0
+        for start, end in _frames(buffer):
+            consumed = end + 1
+            report = normalize_report(buffer[start:end], encoding)
+            if report:
+                reports.append(report)
+        pending = buffer[consumed:]
+    else:
+        # Pending data has no terminator in it, no need to scan it again
+        pending = pending + block
+
+    if len(pending) > MAX_PENDING:
+        report = normalize_report(pending, encoding)
+        if report:
+            reports.append(report)
+        pending = b""
+
+    return((reports, pending))
+
+
+def _iter_stream(stream, encoding, blocksize):
+    pending = b""
+    while True:
+        block = stream.read(blocksize)
+        if not block:
+            break
+
+        reports, pending = _split_block(pending, block, encoding)
+        for report in reports:
+            yield report
+
+    report = normalize_report(pending, encoding)
+    if report:
+        yield report
+
+
+def read_bulletins(source, errors="raise", encoding="latin-1", **options):
+    """ Parses all reports from a bulletin file or stream, one at a time
+
+    Args:
+        source: File name or binary file-like object, see iter_reports()
+        errors: Malformed report handling, see parse_many()
+        encoding: Text encoding of the reports
+        options: Keyword arguments passed to parse_many() and the TAF constructor
+
+    Returns:
+        Generator of TAF (or ParseFailure) objects
+    """
+    return(parse_many(iter_reports(source, encoding), errors=errors, **options))
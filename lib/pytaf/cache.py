@@ -0,0 +1,201 @@
+""" Size-bounded LRU cache of parsed reports
+
+The same report text is often delivered many times (re-broadcasts,
+several feeds carrying the same station). ParseCache parses every
+distinct report once and serves repeats from memory:
+
+    cache = pytaf.ParseCache(max_entries=50000, max_bytes=256 * 1024 * 1024)
+    taf = cache.parse(report)
+    print(cache.hits, cache.misses, cache.evictions)
+
+Reports are keyed by their text with runs of whitespace collapsed,
+so the same report wrapped differently is a cache hit. Cached reports
+are parsed from that normalized text, so get_taf() returns it rather than
+the string that was passed in, and header spans refer to it.
+
+Cached TAF objects are not handed out directly by default: every call
+returns a copy, so callers can't corrupt cached entries. Copies share
+the parsed header and groups with the cached object until get_header()
+or get_groups() is called, and only copy them then, so reports that are
+only exported or checked for status cost next to nothing to copy.
+"""
+
+import sys
+import threading
+import collections
+
+from .taf import TAF
+from .model import Record
+
+
+def normalize(string):
+    """ Returns the cache key for a report string """
+    return(" ".join(string.split()))
+
+
+def _copy(value):
+    """ Copies parsed report structures: dicts, lists and records of immutable values """
+    if isinstance(value, dict):
+        return(dict((key, _copy(item)) for key, item in value.items()))
+    elif isinstance(value, list):
+        return([_copy(item) for item in value])
+    elif isinstance(value, Record):
+        copy = value.copy()
+        for key, item in copy.items():
+            if isinstance(item, (dict, list, Record)):
+                copy[key] = _copy(item)
+        return(copy)
+    else:
+        return(value)
+
+
+def _size(value):
+    """ Approximate memory footprint of parsed report structures, in bytes """
+    size = sys.getsizeof(value)
+    if isinstance(value, (dict, Record)):
+        for key, item in value.items():
+            size += _size(item)
+    elif isinstance(value, list):
+        for item in value:
+            size += _size(item)
+    return(size)
+
+
+class _CachedCopy(TAF):
+    """ Copy of a cached TAF object, that shares its header and groups
+        until they are handed out, and copies them then
+    """
+
+    def get_header(self):
+        if self._shared:
+            self._unshare()
+        return(self._taf_header)
+
+    def get_groups(self):
+        if self._shared:
+            self._unshare()
+        return(self._weather_groups)
+
+    def _unshare(self):
+        self._taf_header = _copy(self._taf_header)
+        self._weather_groups = _copy(self._weather_groups)
+        self._shared = False
+        # Decoded text and JSON of the cached object don't hold for a copy
+        # the caller may modify. Decoder holds on to the dict, clear it in place.
+        self._decoded.clear()
+
+    def __getstate__(self):
+        state = super(_CachedCopy, self).__getstate__()
+        state['_shared'] = False
+        return(state)
+
+
+class ParseCache(object):
+    """ LRU cache of parsed reports, bounded by entry count and approximate size """
+
+    def __init__(self, max_entries=10000, max_bytes=None, **options):
+        """
+        Args:
+            max_entries: Maximum number of cached reports
+            max_bytes: Maximum approximate memory used by cached reports, None for no limit
+            options: Keyword arguments passed to the TAF constructor
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._options = options
+
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, string, copy=True):
+        """ Returns a parsed report, from the cache if possible
+
+        Args:
+            string: TAF/METAR report string
+            copy: Return a private copy of the cached object, see _CachedCopy.
+                  With copy=False, the cached object itself is returned,
+                  and must not be modified.
+
+        Raises:
+            MalformedTAF: An error parsing the report (errors are not cached,
+                          but results of strict=False parsing are)
+
+        Returns:
+            TAF object, parsed from the normalized report string: its get_taf()
+            returns the normalized string, not the one passed in
+        """
+
+        if not isinstance(string, str):
+            # Let the constructor complain
+            return(TAF(string, **self._options))
+
+        key = normalize(string)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                # Move to the most recently used end
+                self._entries[key] = entry
+                self.hits += 1
+
+        if entry is None:
+            taf = TAF(key, **self._options)
+            # Cached objects must be complete
+            taf.get_groups()
+            taf.get_maintenance()
+            size = _size(key) + _size(taf.get_header()) + _size(taf.get_groups())
+            entry = (taf, size)
+
+            with self._lock:
+                self.misses += 1
+                if key not in self._entries:
+                    self._entries[key] = entry
+                    self._bytes += size
+                    self._evict()
+
+        if copy:
+            return(self._copy_taf(entry[0]))
+        else:
+            return(entry[0])
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def _copy_taf(self, taf):
+        copy = _CachedCopy.__new__(_CachedCopy)
+        copy.__dict__.update(taf.__dict__)
+        copy._raw_weather_groups = list(taf._raw_weather_groups)
+        copy._decoded = dict(taf._decoded)
+        copy._shared = True
+        return(copy)
+
+    def clear(self):
+        """ Drops all entries (counters are kept) """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return(len(self._entries))
+
+    def __contains__(self, string):
+        return(normalize(string) in self._entries)
+
+    def size(self):
+        """ Returns approximate memory used by cached reports, in bytes """
+        return(self._bytes)
+
+    def stats(self):
+        """ Returns a dict of counters """
+        return({"entries": len(self._entries), "bytes": self._bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions})
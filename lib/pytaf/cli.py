@@ -0,0 +1,165 @@
+""" pytaf command line tool
+
+Parses and decodes reports from files, directories or standard input,
+one report per line, or WMO bulletins with --bulletins:
+
+    pytaf reports.txt
+    pytaf --format json --jobs 4 archive/ > reports.jsonl
+    cat bulletins | pytaf --bulletins --stats
+
+Reports are read, parsed and written out one chunk at a time,
+so memory use doesn't depend on the input size.
+
+Exit status is 0 if all reports were parsed, 1 if some of them could not be,
+and 2 on usage and input errors.
+"""
+
+import os
+import sys
+import argparse
+
+from . import export
+from .tafdecoder import Decoder
+from .batch import parse_many, ParseFailure, BatchStats
+from .bulletin import iter_reports
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_ERROR = 2
+
+FORMATS = ("text", "json")
+
+
+class InputError(Exception):
+    pass
+
+
+def _stdin():
+    return(getattr(sys.stdin, "buffer", sys.stdin))
+
+
+def _paths(paths):
+    """ Expands directories into the files in them, recursively, in name order """
+
+    for path in paths:
+        if path == "-" or not os.path.isdir(path):
+            yield path
+            continue
+
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(files):
+                yield os.path.join(directory, name)
+
+
+def _reports(paths, bulletins, encoding):
+    """ Yields report strings from all inputs in turn """
+
+    for path in _paths(paths):
+        try:
+            if bulletins:
+                for report in iter_reports(_stdin() if path == "-" else path, encoding):
+                    yield report
+            elif path == "-":
+                for line in _stdin():
+                    yield line.decode(encoding, "replace").strip()
+            else:
+                with open(path, "rb") as f:
+                    for line in f:
+                        yield line.decode(encoding, "replace").strip()
+        except (IOError, OSError) as e:
+            raise InputError("%s: %s" % (path, e.strerror or e))
+
+
+def _write(out, result, output_format):
+    """ Writes out a result
+
+    Returns:
+        False if the report could not be parsed
+    """
+
+    failed = isinstance(result, ParseFailure)
+
+    if output_format == "json":
+        out.write(export.dumps(result) + "\n")
+    elif failed:
+        sys.stderr.write("pytaf: report %d: %s: %s\n" % (result.index + 1, result.error,
+                                                         " ".join(result.report.split())))
+    else:
+        out.write("%s\n%s\n\n" % (result.get_taf(), Decoder(result).decode_taf()))
+
+    return(not failed)
+
+
+def _write_stats(stats):
+    sys.stderr.write("Reports: %d, failed: %d, time: %.3f s, rate: %.1f reports/s\n" %
+                     (stats.reports, stats.failures, stats.elapsed(), stats.rate()))
+    for stage, count in sorted(stats.failed_stages.items(), key=lambda item: str(item[0])):
+        sys.stderr.write("Failed at %s: %d\n" % (stage, count))
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="pytaf", description="Parse and decode TAF and METAR reports")
+    parser.add_argument("paths", nargs="*", metavar="PATH",
+                        help="Files or directories to read, standard input if none or \"-\"")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="text",
+                        help="Output decoded text, or JSON Lines with the parsed fields, see pytaf.export (default: text)")
+    parser.add_argument("-b", "--bulletins", action="store_true",
+                        help="Input is WMO bulletins with \"=\" terminated reports, not one report per line")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of parallel worker processes (default: 1)")
+    parser.add_argument("-s", "--stats", action="store_true",
+                        help="Print report and failure counts and throughput to standard error")
+    parser.add_argument("--encoding", default="latin-1", help="Input text encoding (default: latin-1)")
+    return(parser)
+
+
+def main(argv=None):
+    """ Runs the command line tool
+
+    Returns:
+        Exit status
+    """
+
+    parser = make_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return(e.code)
+
+    if args.jobs < 1:
+        sys.stderr.write("pytaf: --jobs must be at least 1\n")
+        return(EXIT_ERROR)
+
+    for path in args.paths:
+        if path != "-" and not os.path.exists(path):
+            sys.stderr.write("pytaf: %s: No such file or directory\n" % path)
+            return(EXIT_ERROR)
+
+    stats = BatchStats()
+    reports = _reports(args.paths or ["-"], args.bulletins, args.encoding)
+    status = EXIT_OK
+    out = sys.stdout
+
+    try:
+        for result in parse_many(reports, errors="yield", workers=args.jobs, stats=stats):
+            if not _write(out, result, args.format):
+                status = EXIT_FAILURES
+        out.flush()
+    except InputError as e:
+        sys.stderr.write("pytaf: %s\n" % e)
+        status = EXIT_ERROR
+    except BrokenPipeError:
+        # Output closed early, e.g. piped to head. Python would
+        # complain about it again when flushing stdout at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+        return(status)
+
+    if args.stats:
+        _write_stats(stats)
+
+    return(status)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
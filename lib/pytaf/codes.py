@@ -0,0 +1,98 @@
+""" Code tables
+
+Parsed reports are mostly made of the same few hundred short strings:
+field names, units, cloud layer and group type codes, weather codes,
+and two or three digit numbers. CODES lists them, so that they can be
+referred to by their position in the table (see pytaf.binary),
+and so that parsed reports can share a single copy of each of them
+(see intern_fields() and TAF(string, intern=True)).
+
+Positions are stored in serialized reports, so the table is append-only:
+new codes go at the end, existing codes never move.
+"""
+
+# Field names of header and group dicts
+FIELDS = (
+    "header", "type", "icao_code", "origin_date", "origin_hours", "origin_minutes",
+    "valid_from_date", "valid_from_hours", "valid_till_date", "valid_till_hours", "form",
+    "probability", "from_date", "from_hours", "from_minutes", "till_date", "till_hours",
+    "wind", "direction", "speed", "gust", "unit",
+    "visibility", "more", "range",
+    "clouds", "layer", "ceiling",
+    "vertical_visibility",
+    "weather", "intensity", "modifier", "phenomenon",
+    "windshear", "altitude",
+    "temperature", "air_prefix", "air", "dewpoint_prefix", "dewpoint",
+    "pressure", "altimeter_setting", "athm_pressure",
+    "origin_time", "valid_from_time", "valid_till_time", "from_time", "till_time",
+)
+
+# Field values
+KEYWORDS = (
+    "", "taf", "metar",
+    "AMD", "COR", "AMD COR", "COR AMD", "RTD",
+    "FM", "TEMPO", "BECMG", "PROB30", "PROB40", "PROB30 TEMPO", "PROB40 TEMPO",
+    "KT", "MPS", "SM", "VRB", "P", "M", "Q", "A",
+    "FEW", "SCT", "BKN", "OVC", "CU", "CB", "TCU", "CI",
+    "1/4", "1/2", "3/4", "1 1/4", "1 1/2", "1 3/4", "9999", "0000", "$",
+)
+
+# Weather codes, see pytaf.weather
+WEATHER = (
+    "-", "+", "VC", "RE",
+    "MI", "BC", "DR", "BL", "SH", "TS", "FZ", "PR",
+    "DZ", "RA", "SN", "SG", "IC", "PL", "GR", "GS", "UP", "BR", "FG",
+    "FU", "DU", "SA", "HZ", "PY", "VA", "PO", "SQ", "FC", "SS", "DS",
+)
+
+# Digits, days, hours, minutes, speeds, directions, heights
+NUMBERS = (tuple(str(n) for n in range(10)) +
+           tuple("%02d" % n for n in range(100)) +
+           tuple("%03d" % n for n in range(1000)))
+
+CODES = FIELDS + KEYWORDS + WEATHER + NUMBERS
+
+# Code -> position in CODES
+INDEX = dict((code, position) for position, code in enumerate(CODES))
+
+# Code -> the string in CODES, see intern()
+_CANONICAL = dict((code, code) for code in CODES)
+
+
+def intern(string):
+    """ Returns the string from CODES equal to string, or string itself if there is none """
+    return(_CANONICAL.get(string, string))
+
+
+def intern_fields(fields):
+    """ Replaces the strings in a header or group (a dict or a pytaf.model record),
+        and in the dicts, records and lists in it, with equal strings from CODES, in place.
+        Reports parsed separately then share their copies of codes, units and numbers.
+
+    Returns:
+        fields
+    """
+
+    for key, value in fields.items():
+        cls = value.__class__
+        if cls is str:
+            canonical = _CANONICAL.get(value)
+            if canonical is not None:
+                fields[key] = canonical
+        elif cls is dict:
+            intern_fields(value)
+        elif cls is list:
+            _intern_list(value)
+        elif value is not None and hasattr(value, "items"):
+            intern_fields(value)
+    return(fields)
+
+
+def _intern_list(values):
+    for index, value in enumerate(values):
+        if value.__class__ is str:
+            canonical = _CANONICAL.get(value)
+            if canonical is not None:
+                values[index] = canonical
+        elif value.__class__ is dict or (value is not None and hasattr(value, "items")):
+            intern_fields(value)
@@ -0,0 +1,244 @@
+""" Columnar (struct of arrays) export of parsed reports
+
+ColumnarCollector turns many TAF objects into one row per weather group,
+stored column by column: numeric columns in stdlib array.array buffers
+(NaN for missing values), text columns in lists. The numeric buffers
+are turned into NumPy arrays with a single memory copy each, and the whole
+table can be converted to Arrow or written to Parquet if pyarrow is installed.
+
+    collector = pytaf.columnar.ColumnarCollector()
+    collector.extend(pytaf.parse_many(lines))
+    columns = collector.to_numpy()
+    columns["wind_speed_kt"].mean()
+"""
+
+import array
+
+from . import units
+from .batch import ParseFailure
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+NAN = float("nan")
+
+# Column names and types: array typecodes for numeric columns
+# ("d" for floats, "l" for indexes), None for text columns
+COLUMNS = (
+    ("station", None),
+    ("form", None),
+    ("report_index", "l"),
+    ("group_index", "l"),
+    ("group_type", None),
+    ("probability", "d"),
+    ("issue_day", "d"),
+    ("issue_hour", "d"),
+    ("issue_minute", "d"),
+    ("from_day", "d"),
+    ("from_hour", "d"),
+    ("till_day", "d"),
+    ("till_hour", "d"),
+    ("wind_direction", "d"),
+    ("wind_variable", "d"),
+    ("wind_speed_kt", "d"),
+    ("wind_gust_kt", "d"),
+    ("visibility_m", "d"),
+    ("ceiling_ft", "d"),
+    ("weather", None),
+)
+
+# Group type of the initial TAF group and of METARs
+BASE_GROUP = "BASE"
+
+
+def _number(value):
+    """ Converts an optional numeric string to float, NaN if missing """
+    if value is None or value == "":
+        return(NAN)
+
+    try:
+        return(float(value))
+    except (TypeError, ValueError):
+        return(NAN)
+
+
+def _optional(value):
+    if value is None:
+        return(NAN)
+    return(value)
+
+
+class ColumnarCollector(object):
+    """ Collects parsed reports into columns, one row per weather group """
+
+    def __init__(self):
+        self._columns = {}
+        for name, typecode in COLUMNS:
+            if typecode is None:
+                self._columns[name] = []
+            else:
+                self._columns[name] = array.array(typecode)
+        self._reports = 0
+
+    def __len__(self):
+        """ Returns the number of rows (groups) """
+        return(len(self._columns["station"]))
+
+    def add(self, taf):
+        """ Adds all groups of a parsed report
+
+        Reports that could not be parsed have no groups to add: ParseFailure
+        objects from parse_many(errors="yield"), and failed reports parsed
+        with strict=False. They still count for report_index, which is
+        the position of the report among all the reports added.
+
+        Args:
+            taf: TAF object, or ParseFailure
+        """
+
+        columns = self._columns
+        report_index = self._reports
+        self._reports += 1
+
+        if isinstance(taf, ParseFailure):
+            return
+
+        header = taf.get_header()
+        if header is None:
+            return
+
+        station = header.get("icao_code")
+        form = header.get("form")
+        issue_day = _number(header.get("origin_date"))
+        issue_hour = _number(header.get("origin_hours"))
+        issue_minute = _number(header.get("origin_minutes"))
+
+        group_index = 0
+        for group in taf.get_groups() or ():
+            group_header = group.get("header")
+
+            columns["station"].append(station)
+            columns["form"].append(form)
+            columns["report_index"].append(report_index)
+            columns["group_index"].append(group_index)
+            columns["issue_day"].append(issue_day)
+            columns["issue_hour"].append(issue_hour)
+            columns["issue_minute"].append(issue_minute)
+
+            if group_header:
+                columns["group_type"].append(" ".join(group_header["type"].split()))
+                columns["probability"].append(_number(group_header.get("probability")))
+                columns["from_day"].append(_number(group_header.get("from_date")))
+                columns["from_hour"].append(_number(group_header.get("from_hours")))
+                columns["till_day"].append(_number(group_header.get("till_date")))
+                columns["till_hour"].append(_number(group_header.get("till_hours")))
+            else:
+                columns["group_type"].append(BASE_GROUP)
+                columns["probability"].append(NAN)
+                columns["from_day"].append(NAN)
+                columns["from_hour"].append(NAN)
+                columns["till_day"].append(NAN)
+                columns["till_hour"].append(NAN)
+
+            wind = group.get("wind")
+            if wind:
+                if wind["direction"] == "VRB":
+                    columns["wind_direction"].append(NAN)
+                    columns["wind_variable"].append(1.0)
+                else:
+                    columns["wind_direction"].append(_number(wind["direction"]))
+                    columns["wind_variable"].append(0.0)
+                columns["wind_speed_kt"].append(_optional(units.speed_knots(wind["speed"], wind["unit"])))
+                columns["wind_gust_kt"].append(_optional(units.speed_knots(wind["gust"], wind["unit"])))
+            else:
+                columns["wind_direction"].append(NAN)
+                columns["wind_variable"].append(NAN)
+                columns["wind_speed_kt"].append(NAN)
+                columns["wind_gust_kt"].append(NAN)
+
+            clouds = group.get("clouds")
+            columns["visibility_m"].append(_optional(units.visibility_meters(group.get("visibility"), clouds)))
+            columns["ceiling_ft"].append(_optional(units.ceiling_feet(clouds, group.get("vertical_visibility"))))
+
+            words = []
+            for word in group.get("weather") or []:
+                words.append("".join(word["intensity"]) + "".join(word["modifier"]) + "".join(word["phenomenon"]))
+            columns["weather"].append(" ".join(words))
+
+            group_index += 1
+
+    def extend(self, tafs):
+        """ Adds all reports from an iterable of TAF (or ParseFailure) objects """
+        for taf in tafs:
+            self.add(taf)
+
+    def columns(self):
+        """ Returns the column buffers: array.array for numeric columns, lists for text """
+        return(dict(self._columns))
+
+    def to_numpy(self):
+        """ Returns the columns as NumPy arrays
+
+        Raises:
+            ImportError: NumPy is not installed
+        """
+
+        if numpy is None:
+            raise ImportError("NumPy is required for to_numpy()")
+
+        result = {}
+        for name, typecode in COLUMNS:
+            column = self._columns[name]
+            if typecode is None:
+                result[name] = numpy.array(column, dtype=object)
+            else:
+                # A copy, since the collector can't grow arrays
+                # while their buffers are exported
+                result[name] = numpy.array(column, dtype=typecode)
+        return(result)
+
+    def to_arrow(self):
+        """ Returns the columns as a pyarrow.Table
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+
+        if pyarrow is None:
+            raise ImportError("pyarrow is required for to_arrow()")
+
+        arrays = []
+        names = []
+        for name, typecode in COLUMNS:
+            column = self._columns[name]
+            if typecode is None:
+                arrays.append(pyarrow.array(column, type=pyarrow.string()))
+            elif typecode == "l":
+                arrays.append(pyarrow.array(column, type=pyarrow.int64()))
+            else:
+                # NaN becomes null
+                arrays.append(pyarrow.array(column, type=pyarrow.float64(), from_pandas=True))
+            names.append(name)
+        return(pyarrow.Table.from_arrays(arrays, names=names))
+
+    def write_parquet(self, path, **options):
+        """ Writes the columns to a Parquet file
+
+        Args:
+            path: File name or writable binary file object
+            options: Keyword arguments for pyarrow.parquet.write_table()
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+
+        table = self.to_arrow()
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, path, **options)
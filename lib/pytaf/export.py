@@ -0,0 +1,356 @@
+""" JSON export of parsed reports
+
+Writes reports as JSON objects with a fixed schema, without going
+through generic dict serialization:
+
+    with open("reports.jsonl", "wb") as f:
+        pytaf.export.dump_lines(pytaf.parse_many(lines, errors="yield"), f)
+
+Schema of a report:
+
+    {"report": "TAF KDEN ...", "status": "ok", "error": ..., "error_stage": ...,
+     "header": {...}, "groups": [{...}, ...], "maintenance": "$"}
+
+Header and group fields have the names, nesting and order of the parsed
+dicts (see TAF.get_header() and get_groups()). Fields that are None, empty strings,
+empty lists or empty objects are left out, so are the error fields of reports
+that were parsed. ParseFailure objects from parse_many() are written
+as reports with the "failed" status.
+
+Reports are written in a single walk over the parsed dicts, with the
+"key": fragments of known fields computed beforehand. Short strings
+and small objects that repeat a lot (winds, cloud layers, weather) are
+memoized, so they are mostly written as a whole. The JSON of a TAF object
+is memoized on it too, like Decoder text, so reports that are served
+many times are only serialized once. Don't modify TAF objects after exporting them.
+
+Output is ASCII only, like json.dumps() output.
+"""
+
+import io
+import json
+
+from .taf import TAF
+from .batch import ParseFailure
+from . import model
+
+_escape = json.encoder.encode_basestring_ascii
+
+# Short strings (codes, numbers) -> their JSON representation
+_STRINGS_SIZE = 8192
+_STRINGS_LENGTH = 16
+
+
+class _Strings(dict):
+    """ String -> JSON memo, that escapes strings it doesn't have yet """
+
+    def __missing__(self, string):
+        escaped = _escape(string)
+        if len(string) <= _STRINGS_LENGTH:
+            if len(self) >= _STRINGS_SIZE:
+                self.clear()
+            self[string] = escaped
+        return(escaped)
+
+
+_strings = _Strings()
+
+# Key of the JSON memoized on TAF objects, along with decoded text
+_MEMO = object()
+
+# Objects made of a few short values repeat a lot, their JSON is memoized
+# by schema and by field, up to that many per memo
+_OBJECTS_SIZE = 16384
+
+
+def _key(name):
+    """ Returns the key fragment of a field that follows another one """
+
+    return(",%s:" % _escape(str(name)))
+
+
+class _Keys(dict):
+    """ Field name -> key fragment, for fields that are not in the schema too """
+
+    def __missing__(self, name):
+        key = self[name] = _key(name)
+        return(key)
+
+
+class _Schema(object):
+    """ Precomputed key fragments of an object """
+
+    __slots__ = ("keys", "nested", "memos", "objects", "lists")
+
+    def __init__(self, names, nested=None, lists=False, memoize=True):
+        """
+        Args:
+            names: Field names
+            nested: Dict of field name -> _Schema of its value, or of the items of its list value
+            lists: Values of the fields are lists of strings, rather than strings
+            memoize: False for objects that are unlikely to repeat.
+                     Objects with nested objects are never memoized.
+        """
+
+        # Name -> key fragment
+        self.keys = _Keys((name, _key(name)) for name in names)
+        self.nested = nested or {}
+        self.lists = lists
+
+        # Memoization key -> JSON, "" for objects without fields to write
+        self.objects = None
+        if memoize and names and not nested:
+            self.objects = {}
+
+        # Name -> memoization key -> the field as written, key fragment included,
+        # for fields with memoized objects
+        self.memos = dict((name, {}) for name, schema in self.nested.items()
+                          if schema.objects is not None and not schema.lists)
+
+    def memo_key(self, value):
+        """ Returns the memoization key of an object """
+        if self.lists:
+            # Names, then values, of a fixed number of fields
+            return((*value, *map(tuple, value.values())))
+        return(tuple(value.items()))
+
+
+_GENERIC = _Schema((), memoize=False)
+
+HEADER = _Schema(model.Header.__slots__, memoize=False)
+
+GROUP = _Schema(model.Group.__slots__, {
+    "header": _Schema(model.GroupHeader.__slots__),
+    "temperature": _Schema(model.Temperature.__slots__, memoize=False),
+    "pressure": _Schema(model.Pressure.__slots__),
+    "wind": _Schema(model.Wind.__slots__),
+    "visibility": _Schema(model.Visibility.__slots__),
+    "clouds": _Schema(model.CloudLayer.__slots__),
+    "weather": _Schema(model.WeatherWord.__slots__, lists=True),
+    "windshear": _Schema(model.WindShear.__slots__, memoize=False),
+}, memoize=False)
+
+_REPORT = _Schema(("report", "status", "error", "error_stage", "header", "groups", "maintenance"),
+                  {"header": HEADER, "groups": GROUP}, memoize=False)
+
+
+def _object(value, schema, parts):
+    """ Adds an object to parts, memoized if possible
+
+    Returns:
+        False if the object has no fields to write, and nothing was added
+    """
+
+    objects = schema.objects
+    if objects is None:
+        return(_fields(value, schema, parts))
+
+    try:
+        key = schema.memo_key(value)
+        string = objects[key]
+    except KeyError:
+        fields = []
+        string = "".join(fields) if _fields(value, schema, fields) else ""
+        if len(objects) >= _OBJECTS_SIZE:
+            objects.clear()
+        objects[key] = string
+    except TypeError:
+        # Unhashable values
+        return(_fields(value, schema, parts))
+
+    if string:
+        parts.append(string)
+        return(True)
+    return(False)
+
+
+def _list(value, schema, parts):
+    """ Adds a list to parts, empty objects in it included """
+
+    append = parts.append
+
+    append("[")
+    first = True
+    for item in value:
+        if first:
+            first = False
+        else:
+            append(",")
+
+        cls = item.__class__
+        if cls is str:
+            append(_strings[item])
+        elif cls is dict or isinstance(item, model.Record):
+            if not _object(item, schema or _GENERIC, parts):
+                append("{}")
+        elif item is None:
+            append("null")
+        else:
+            _value(item, schema, parts)
+    append("]")
+
+
+def _value(value, schema, parts):
+    """ Adds a value other than a string, an object or None to parts """
+
+    if value is True:
+        parts.append("true")
+    elif value is False:
+        parts.append("false")
+    elif isinstance(value, str):
+        parts.append(_strings[value])
+    elif isinstance(value, list):
+        _list(value, schema, parts)
+    elif isinstance(value, dict):
+        if not _object(value, schema or _GENERIC, parts):
+            parts.append("{}")
+    else:
+        parts.append(json.dumps(value))
+
+
+def _fields(value, schema, parts):
+    """ Adds an object to parts, without the fields that are None
+        or empty (strings, lists and objects)
+
+    Returns:
+        False if no field was written, and nothing was added
+    """
+
+    start = len(parts)
+    append = parts.append
+    keys = schema.keys
+    memos = schema.memos
+    strings = _strings
+
+    for name, item in value.items():
+        if item is None:
+            continue
+
+        cls = item.__class__
+        if cls is str:
+            if item:
+                append(keys[name])
+                append(strings[item])
+        elif cls is dict or isinstance(item, model.Record):
+            # Memoized objects (winds, visibilities...) are looked up here
+            string = None
+            memo = memos.get(name)
+            if memo is not None:
+                try:
+                    key = tuple(item.items())
+                    string = memo.get(key)
+                except TypeError:
+                    # Unhashable values
+                    key = None
+                if string is None and key is not None:
+                    fields = [keys[name]]
+                    string = "".join(fields) if _fields(item, schema.nested[name], fields) else ""
+                    if len(memo) >= _OBJECTS_SIZE:
+                        memo.clear()
+                    memo[key] = string
+
+            if string is None:
+                append(keys[name])
+                if not _object(item, schema.nested.get(name) or _GENERIC, parts):
+                    parts.pop()
+            elif string:
+                append(string)
+        elif cls is list:
+            if item:
+                append(keys[name])
+                # Lists of memoized objects (cloud layers, weather) are written
+                # at once if all of them are memoized
+                nested = schema.nested.get(name)
+                objects = nested.objects if nested is not None else None
+                items = None
+                if objects is not None:
+                    try:
+                        if nested.lists:
+                            items = [objects[(*obj, *map(tuple, obj.values()))] for obj in item]
+                        else:
+                            items = [objects[tuple(obj.items())] for obj in item]
+                    except (KeyError, TypeError, AttributeError):
+                        pass
+
+                if items is None or "" in items:
+                    _list(item, nested, parts)
+                else:
+                    append("[%s]" % ",".join(items))
+        else:
+            append(keys[name])
+            _value(item, None, parts)
+
+    if len(parts) == start:
+        return(False)
+
+    # Fields are written as if they followed another one, the first one opens the object
+    parts[start] = "{" + parts[start][1:]
+    parts.append("}")
+    return(True)
+
+
+def _report(result):
+    """ Returns the JSON of a TAF object or ParseFailure """
+
+    parts = []
+    if isinstance(result, ParseFailure):
+        _fields({"report": result.report, "status": TAF.STATUS_FAILED,
+                 "error": result.error, "error_stage": result.stage}, _REPORT, parts)
+        return("".join(parts))
+
+    try:
+        return(result._decoded[_MEMO])
+    except KeyError:
+        pass
+
+    # The parsed parts are read as they are: get_header() and get_groups()
+    # of ParseCache copies would copy them first, for the caller to modify
+    result._parse_lazy()
+    _fields({"report": result.get_taf(), "status": result.get_status(),
+             "error": result.get_error(), "error_stage": result.get_error_stage(),
+             "header": result._taf_header, "groups": result._weather_groups,
+             "maintenance": result.get_maintenance()}, _REPORT, parts)
+    string = result._decoded[_MEMO] = "".join(parts)
+    return(string)
+
+
+def dumps(result):
+    """ Returns a report as a JSON string
+
+    Args:
+        result: TAF object, or ParseFailure
+    """
+    return(_report(result))
+
+
+def _write_function(file):
+    """ Returns a function that writes strings to a text or binary file object """
+
+    if isinstance(file, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(file, "mode", ""):
+        write = file.write
+        return(lambda string: write(string.encode("ascii")))
+    return(file.write)
+
+
+def dump(result, file):
+    """ Writes a report as JSON to a text or binary file object """
+    _write_function(file)(dumps(result))
+
+
+def dump_lines(results, file):
+    """ Writes reports as JSON Lines, one at a time
+
+    Args:
+        results: Iterable of TAF (or ParseFailure) objects, such as a parse_many() generator
+        file: Text or binary file object, e.g. sys.stdout, an open file or io.BytesIO
+
+    Returns:
+        Number of reports written
+    """
+
+    write = _write_function(file)
+    count = 0
+    for result in results:
+        write(_report(result) + "\n")
+        count += 1
+    return(count)
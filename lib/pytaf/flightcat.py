@@ -0,0 +1,160 @@
+""" Flight categories of many reports at once
+
+Flight categories (FAA definitions) by ceiling and visibility:
+
+    LIFR  ceiling below 500 ft, or visibility below 1 statute mile
+    IFR   ceiling 500 to below 1000 ft, or visibility 1 to below 3 SM
+    MVFR  ceiling 1000 to 3000 ft, or visibility 3 to 5 SM
+    VFR   ceiling above 3000 ft (or none) and visibility above 5 SM
+
+categorize() computes them from visibility and ceiling arrays in one go,
+with NumPy if it's installed, such as the visibility_m and ceiling_ft columns
+of a pytaf.columnar.ColumnarCollector. flight_categories() collects just
+the values it needs from parsed reports, one row per weather group:
+
+    result = pytaf.flightcat.flight_categories(tafs)
+    for station, category in zip(result["station"], result["category"]):
+        print(station, pytaf.flightcat.NAMES[category])
+"""
+
+import array
+
+from . import units
+from .batch import ParseFailure
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NAN = float("nan")
+
+# Category codes, from the most to the least restrictive,
+# and UNKNOWN for groups with neither visibility nor ceiling
+LIFR = 0
+IFR = 1
+MVFR = 2
+VFR = 3
+UNKNOWN = -1
+
+NAMES = {LIFR: "LIFR", IFR: "IFR", MVFR: "MVFR", VFR: "VFR", UNKNOWN: None}
+
+# Lower bounds of IFR, MVFR and VFR
+CEILING_LIMITS = (500.0, 1000.0, 3000.0)
+VISIBILITY_LIMITS = (1 * units.METERS_PER_STATUTE_MILE,
+                     3 * units.METERS_PER_STATUTE_MILE,
+                     5 * units.METERS_PER_STATUTE_MILE)
+
+
+def _category(visibility, ceiling):
+    """ Category of a single group, NaN for missing values """
+
+    # NaN compares false with everything
+    if visibility != visibility:
+        if ceiling != ceiling:
+            return(UNKNOWN)
+        visibility_category = VFR
+    elif visibility < VISIBILITY_LIMITS[0]:
+        visibility_category = LIFR
+    elif visibility < VISIBILITY_LIMITS[1]:
+        visibility_category = IFR
+    elif visibility <= VISIBILITY_LIMITS[2]:
+        visibility_category = MVFR
+    else:
+        visibility_category = VFR
+
+    if ceiling < CEILING_LIMITS[0]:
+        ceiling_category = LIFR
+    elif ceiling < CEILING_LIMITS[1]:
+        ceiling_category = IFR
+    elif ceiling <= CEILING_LIMITS[2]:
+        ceiling_category = MVFR
+    else:
+        ceiling_category = VFR
+
+    return(min(visibility_category, ceiling_category))
+
+
+def categorize(visibility_m, ceiling_ft):
+    """ Computes flight categories
+
+    Args:
+        visibility_m: Sequence of visibilities in meters, NaN if not reported
+        ceiling_ft: Sequence of ceilings in feet, NaN if there is no ceiling
+
+    Returns:
+        Category codes (LIFR, IFR, MVFR, VFR or UNKNOWN): a NumPy int8 array
+        if NumPy is installed, an array.array("b") otherwise
+    """
+
+    if numpy is None:
+        return(array.array("b", map(_category, visibility_m, ceiling_ft)))
+
+    visibility = numpy.asarray(visibility_m, dtype=numpy.float64)
+    ceiling = numpy.asarray(ceiling_ft, dtype=numpy.float64)
+
+    # Comparisons with NaN are false, so missing values don't restrict the category
+    categories = numpy.full(visibility.shape, VFR, dtype=numpy.int8)
+    for limits, values in ((VISIBILITY_LIMITS, visibility), (CEILING_LIMITS, ceiling)):
+        numpy.minimum(categories, numpy.where(values < limits[0], LIFR,
+                                              numpy.where(values < limits[1], IFR,
+                                                          numpy.where(values <= limits[2], MVFR, VFR))),
+                      out=categories, casting="unsafe")
+
+    categories[numpy.isnan(visibility) & numpy.isnan(ceiling)] = UNKNOWN
+    return(categories)
+
+
+def flight_categories(tafs):
+    """ Computes flight categories of every weather group of many reports
+
+    Args:
+        tafs: Iterable of TAF objects. ParseFailure objects and failed reports
+              have no groups, but they count for report_index.
+
+    Returns:
+        Dict of columns, one row per group: "station" (list of ICAO codes),
+        "report_index" and "group_index" (positions in the input and in the report),
+        "visibility_m", "ceiling_ft" (NaN if missing) and "category",
+        as NumPy arrays if NumPy is installed, array.array otherwise
+    """
+
+    stations = []
+    report_indexes = array.array("l")
+    group_indexes = array.array("l")
+    visibilities = array.array("d")
+    ceilings = array.array("d")
+
+    report_index = 0
+    for taf in tafs:
+        if isinstance(taf, ParseFailure):
+            report_index += 1
+            continue
+
+        header = taf.get_header()
+        station = header.get("icao_code") if header else None
+
+        group_index = 0
+        for group in taf.get_groups() or ():
+            clouds = group.get("clouds")
+            visibility = units.visibility_meters(group.get("visibility"), clouds)
+            ceiling = units.ceiling_feet(clouds, group.get("vertical_visibility"))
+
+            stations.append(station)
+            report_indexes.append(report_index)
+            group_indexes.append(group_index)
+            visibilities.append(NAN if visibility is None else visibility)
+            ceilings.append(NAN if ceiling is None else ceiling)
+            group_index += 1
+
+        report_index += 1
+
+    result = {"station": stations, "report_index": report_indexes, "group_index": group_indexes,
+              "visibility_m": visibilities, "ceiling_ft": ceilings}
+
+    if numpy is not None:
+        for name in ("report_index", "group_index", "visibility_m", "ceiling_ft"):
+            result[name] = numpy.frombuffer(result[name], dtype=result[name].typecode)
+
+    result["category"] = categorize(result["visibility_m"], result["ceiling_ft"])
+    return(result)
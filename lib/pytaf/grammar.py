@@ -0,0 +1,405 @@
+""" Shared registry of the regular expressions used by the TAF parser and decoder
+
+Every pattern is kept here in its source form and compiled once,
+on first use, so that parsing a report does not go through the
+re module cache for every field of every group.
+
+The registry can be inspected and individual patterns can be
+overridden, e.g. to accept a local variation of the format:
+
+    import pytaf.grammar
+    print(pytaf.grammar.get_source("pressure"))
+    pytaf.grammar.override("pressure", "(?<= \\s ) (?P<altimeter_setting> Q|A) (?P<athm_pressure> \\d{4}) (?= \\s|$)")
+
+Overrides affect all TAF and Decoder objects created afterwards.
+"""
+
+import re
+
+_FLAGS = re.VERBOSE
+
+# Pattern sources, keyed by name
+_DEFAULT_PATTERNS = {
+    # Report headers
+    "taf_header": r"""
+        ^
+        (TAF)?    # TAF header (at times missing or duplicate)
+        \s*
+        (?P<type> (COR|AMD|AMD\sCOR|COR\sAMD|RTD)){0,1}
+
+        \s* # There may or may not be space as COR/AMD/RTD is optional
+        (?P<icao_code> [A-Z]{4}) # Station ICAO code
+
+        \s* # at some aerodromes does not appear
+        (?P<origin_date> \d{0,2}) # at some aerodromes does not appear
+        (?P<origin_hours> \d{0,2}) # at some aerodromes does not appear
+        (?P<origin_minutes> \d{0,2}) # at some aerodromes does not appear
+        Z? # Zulu time (UTC, that is) # at some aerodromes does not appear
+
+        \s*
+        (?P<valid_from_date> \d{0,2})
+        (?P<valid_from_hours> \d{0,2})
+        /
+        (?P<valid_till_date> \d{0,2})
+        (?P<valid_till_hours> \d{0,2})
+    """,
+
+    "metar_header": r"""
+        ^
+        (METAR)?    # METAR header (at times missing or duplicate)
+        \s*
+        (?P<icao_code> [A-Z]{4}) # Station ICAO code
+
+        \s* # at some aerodromes does not appear
+        (?P<origin_date> \d{0,2}) # at some aerodromes does not appear
+        (?P<origin_hours> \d{0,2}) # at some aerodromes does not appear
+        (?P<origin_minutes> \d{0,2}) # at some aerodromes does not appear
+        Z? # Zulu time (UTC, that is) # at some aerodromes does not appear
+        \s+
+        (?P<type> (COR){0,1}) # Corrected # TODO: Any other values possible?
+    """,
+
+    # TAF weather groups (FM, PROB etc.)
+    "taf_group": r"""
+        (?:FM|(?:PROB(?:\d{1,2})\s*(?:TEMPO)?)|TEMPO|BECMG|[\S\s])[A-Z0-9\+\-/\s$]+?(?=FM|PROB|TEMPO|BECMG|$)
+    """,
+
+    # From header pattern
+    "fm_group_header": r"""
+        (?P<type> FM) (?P<from_date>\d{2}) (?P<from_hours>\d{2})(?P<from_minutes> \d{2})
+    """,
+
+    # PROB|TEMPO|BECMG header pattern, they have almost the same format
+    "ptb_group_header": r"""
+        (?P<type> (?:PROB(?P<probability>\d{1,2})\s*(?:TEMPO)?)|TEMPO|BECMG)
+        \s+
+        (?P<from_date> \d{2})
+        (?P<from_hours> \d{2})
+        /
+        (?P<till_date> \d{2})
+        (?P<till_hours> \d{2})
+    """,
+
+    "wind": r"""
+        (?<= \s )
+        (?P<direction> (\d{3}|VRB)) # Three digits or VRB
+        (?P<speed> \d{2,3})         # Next two digits are speed in knots
+        (G(?P<gust> \d{2,3})){0,1}  # Optional gust data (Gxx)
+        (?P<unit> KT|MPS)           # Knots or meters per second
+        (?= \s|$ )
+    """,
+
+    # Visibility in statute miles
+    "visibility": r"""
+        (?<= \s )
+        (?P<more> P){0,1} # "P" prefix indicates visibility more than
+        (?P<range> \d | \d/\d | \d\s\d/\d)    # More than 6 is always just P6SM
+        (?P<unit> SM)                # Statute miles
+        (?= \s|$ )
+    """,
+
+    # Visibility in meters
+    # XXX: In case "TEMPO 1012" style reports still exist,
+    # it will not work as is and I haven't came up with a fix yet
+    "visibility_meters": r"""
+        (?<= \s )
+        (?P<range> \d{4})
+        (?= \s|$ )
+    """,
+
+    "clouds": r"""
+        (?<= \s )
+        (?P<layer> BKN|SCT|FEW|OVC)
+        (?P<ceiling> \d{3})
+        (?P<type> CU|CB|TCU|CI){0,1}
+        (?= \s|$ )
+    """,
+
+    "clouds_clear": r""" (SKC|CLR|NSC|CAVOK|CAVU) """,
+
+    "clouds_obscured": r"""VV///""",
+
+    "vertical_visibility": r"""
+        (?<= \s )
+        VV
+        (?P<vertical_visibility> \d{3} )
+        (?= \s|$ )
+    """,
+
+    "weather_word": r"""
+        (?<= \s )
+        ( (?: \+|\-|VC|RE|MI|BC|DR|BL|SH|TS|FZ|PR|DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|DU|SA|HZ|PY|VA|PO|SQ|FC|SS|DS)+ )
+        (?= \s|$)
+    """,
+
+    "weather_intensity": r"""(\+|\-|VC|RE)""",
+
+    "weather_modifier": r"""(MI|BC|DR|BL|SH|TS|FZ|PR)""",
+
+    "weather_phenomenon": r"""(DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|DU|SA|HZ|PY|VA|PO|SQ|FC|SS|DS)""",
+
+    "wind_shear": r"""
+        \s+
+        WS (?P<altitude> \d{3})
+        /
+        (?P<direction> \d{3})
+        (?P<speed> \d{2})
+        (?P<unit> KT|MPS)
+    """,
+
+    "maintenance": r""" ( \$ ) """,
+
+    # METAR specific
+    "temperature": r"""
+        (?<= \s )
+        (?P<air_prefix> M?)
+        (?P<air> \d{2})
+        /
+        (?P<dewpoint_prefix> M?)
+        (?P<dewpoint> \d{2})
+        (?= \s|$)
+    """,
+
+    # FIXME: Any other possible values than 'Q' as altimeter setting?
+    "pressure": r"""
+        (?<= \s )
+        (?P<altimeter_setting> Q)
+        (?P<athm_pressure> \d{4})
+        (?= \s|$)
+    """,
+
+    # Single token patterns used by the "tokens" parsing engine.
+    # They are matched against whitespace-separated tokens,
+    # so they are anchored instead of using lookarounds.
+    "wind_token": r"""
+        (?P<direction> (\d{3}|VRB))
+        (?P<speed> \d{2,3})
+        (G(?P<gust> \d{2,3})){0,1}
+        (?P<unit> KT|MPS)
+        $
+    """,
+
+    "visibility_token": r"""
+        (?P<more> P){0,1}
+        (?P<range> \d | \d/\d)
+        (?P<unit> SM)
+        $
+    """,
+
+    # Whole part of a "1 1/2SM" style visibility
+    "visibility_whole_token": r"""P?\d$""",
+
+    "visibility_meters_token": r"""(?P<range> \d{4})$""",
+
+    "clouds_token": r"""
+        (?P<layer> BKN|SCT|FEW|OVC)
+        (?P<ceiling> \d{3})
+        (?P<type> CU|CB|TCU|CI){0,1}
+        $
+    """,
+
+    "vertical_visibility_token": r"""VV (?P<vertical_visibility> \d{3}) $""",
+
+    "weather_word_token": r"""
+        (?: \+|\-|VC|RE|MI|BC|DR|BL|SH|TS|FZ|PR|DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|DU|SA|HZ|PY|VA|PO|SQ|FC|SS|DS)+
+        $
+    """,
+
+    # Not anchored at the end, just like the "wind_shear" pattern
+    "wind_shear_token": r"""
+        WS (?P<altitude> \d{3})
+        /
+        (?P<direction> \d{3})
+        (?P<speed> \d{2})
+        (?P<unit> KT|MPS)
+    """,
+
+    "temperature_token": r"""
+        (?P<air_prefix> M?)
+        (?P<air> \d{2})
+        /
+        (?P<dewpoint_prefix> M?)
+        (?P<dewpoint> \d{2})
+        $
+    """,
+
+    "pressure_token": r"""
+        (?P<altimeter_setting> Q)
+        (?P<athm_pressure> \d{4})
+        $
+    """,
+
+    # WMO bulletins
+    # Abbreviated heading, e.g. "FTUS80 KWBC 291200" or "SAUS70 KWBC 291200 RRA"
+    "wmo_heading": r"""
+        ^
+        [A-Z]{4}\d{2} \s+ [A-Z]{4} \s+ \d{6} (\s+ [A-Z]{3})?
+        \s* $
+    """,
+
+    # Transmission sequence number, end of message marker or a blank line
+    "bulletin_filler": r"""^ \s* (\d{3,5} | NNNN)? \s* $""",
+
+    # Decoder
+    "whitespace": r"""\s+""",
+
+    "ordinal_th": r""".*(1[12]|[04-9])$""",
+    "ordinal_st": r""".*1$""",
+    "ordinal_nd": r""".*2$""",
+    "ordinal_rd": r""".*3$""",
+}
+
+_patterns = dict(_DEFAULT_PATTERNS)
+_compiled = {}
+
+# Combined patterns made by get_alternation(), keyed by tuples of names
+_alternations = {}
+
+_GROUP_NAME = re.compile(r"\(\?P<(\w+)>")
+
+# Incremented on every change, so that users of the patterns
+# can invalidate anything they derived from them
+_generation = 0
+
+
+def get(name):
+    """ Returns the compiled pattern with the given name, compiling it on first use
+
+    Args:
+        name: Pattern name
+
+    Raises:
+        KeyError: No such pattern
+    """
+    try:
+        return _compiled[name]
+    except KeyError:
+        pattern = re.compile(_patterns[name], _FLAGS)
+        _compiled[name] = pattern
+        return pattern
+
+
+def get_alternation(names):
+    """ Returns a pattern that tries the named patterns in order, as a single regex
+
+    Every pattern is wrapped in a group named after it, and its own
+    match groups are prefixed with its name and two underscores
+    (e.g. "metar_header__icao_code"). Use branch() to find out
+    which pattern matched.
+
+    Args:
+        names: Tuple of pattern names
+
+    Raises:
+        KeyError: No such pattern
+    """
+    try:
+        return _alternations[names][0]
+    except KeyError:
+        branches = []
+        for name in names:
+            source = _GROUP_NAME.sub(r"(?P<%s__\1>" % name, _patterns[name])
+            # Sources may end with a comment, so the closing paren goes on a new line
+            branches.append("(?P<%s> %s\n)" % (name, source))
+        pattern = re.compile("|".join(branches), _FLAGS)
+
+        # Group numbers of every branch and its fields, in pattern order
+        groups = []
+        for name in names:
+            prefix = name + "__"
+            fields = sorted((number, key[len(prefix):]) for key, number in pattern.groupindex.items()
+                            if key.startswith(prefix))
+            groups.append((name, pattern.groupindex[name], [(key, number) for number, key in fields]))
+
+        _alternations[names] = (pattern, groups)
+        return pattern
+
+
+def branch(match, names):
+    """ Finds out which pattern of an alternation matched
+
+    Args:
+        match: Match object of a get_alternation() pattern
+        names: Tuple of pattern names the alternation was made of
+
+    Returns:
+        (name, groupdict) tuple, with group names of the matched pattern
+        stripped of their prefix, or (None, None) if nothing matched
+    """
+    if match is None:
+        return((None, None))
+
+    get_alternation(names)
+    for name, number, fields in _alternations[names][1]:
+        if match.start(number) != -1:
+            values = match.groups()
+            return((name, dict((key, values[number - 1]) for key, number in fields)))
+
+    return((None, None))
+
+
+def get_source(name):
+    """ Returns the source string of the pattern with the given name """
+    return(_patterns[name])
+
+
+def names():
+    """ Returns a sorted list of all pattern names """
+    return(sorted(_patterns.keys()))
+
+
+def is_default(name):
+    """ Tells if the pattern with the given name is not overridden """
+    return(_patterns[name] is _DEFAULT_PATTERNS[name])
+
+
+def override(name, source):
+    """ Replaces a pattern with a custom one
+
+    The new pattern is compiled immediately (with re.VERBOSE),
+    so that errors surface at override time rather than at parse time.
+
+    Args:
+        name: Pattern name
+        source: Pattern source string
+
+    Raises:
+        KeyError: No such pattern
+        re.error: The new pattern does not compile
+    """
+    if name not in _patterns:
+        raise KeyError(name)
+
+    global _generation
+
+    compiled = re.compile(source, _FLAGS)
+    _patterns[name] = source
+    _compiled[name] = compiled
+    _alternations.clear()
+    _generation += 1
+
+
+def reset(name=None):
+    """ Restores the default pattern (or all patterns if name is not given) """
+    global _generation
+
+    if name is None:
+        _patterns.clear()
+        _patterns.update(_DEFAULT_PATTERNS)
+        _compiled.clear()
+    else:
+        _patterns[name] = _DEFAULT_PATTERNS[name]
+        _compiled.pop(name, None)
+    _alternations.clear()
+    _generation += 1
+
+
+def generation():
+    """ Returns a number that changes every time a pattern is overridden or reset """
+    return(_generation)
+
+
+def compile_all():
+    """ Compiles all patterns eagerly, e.g. before forking worker processes """
+    for name in _patterns:
+        get(name)
@@ -0,0 +1,221 @@
+""" Parsing and decoding instrumentation
+
+install() wraps the parsing stages of TAF and the decoding methods
+of Decoder with timers, which add up call counts and time spent per stage
+in a Stats object, until uninstall() puts the original methods back:
+
+    stats = pytaf.instrument.install(slow_threshold=0.005)
+    ...
+    print(stats.snapshot())
+    pytaf.instrument.uninstall()
+
+Nothing is wrapped until install() is called, so there is no overhead
+otherwise. Stages:
+
+    report          TAF object construction, as a whole
+    header          Header parsing (TAF._init_header)
+    groups          Splitting the report into weather groups (TAF._init_groups)
+    group           Parsing a weather group (TAF._parse_group)
+    field.<name>    Field parsers (TAF._parse_wind, _parse_clouds...)
+    decode          Decoder.decode_taf()
+    decode_group    Decoder.decode_group()
+
+Stages are nested: a report includes its header and groups, a group
+includes its fields. Weather groups are counted when they are parsed
+(TAF._init_weather_groups), so groups of lazy reports are counted
+the first time get_groups() is called. Only the current process is instrumented,
+not parse_many() worker processes. Methods overridden in subclasses
+are not timed.
+"""
+
+import time
+import threading
+import functools
+import collections
+
+from .taf import TAF
+from .tafdecoder import Decoder
+
+_clock = time.perf_counter
+
+# Stage -> (class, method name)
+STAGES = collections.OrderedDict([
+    ("report", (TAF, "__init__")),
+    ("header", (TAF, "_init_header")),
+    ("groups", (TAF, "_init_groups")),
+    ("group", (TAF, "_parse_group")),
+])
+for _, _parser in TAF.TAF_GROUP_FIELDS + TAF.METAR_GROUP_FIELDS[:2] + (("maintenance", "_parse_maintenance"),):
+    STAGES["field." + _parser[len("_parse_"):]] = (TAF, _parser)
+STAGES["decode"] = (Decoder, "decode_taf")
+STAGES["decode_group"] = (Decoder, "decode_group")
+
+# Method that returns the weather groups of a report, wrapped to count them
+GROUPS = (TAF, "_init_weather_groups")
+
+# (class, method name) -> original method, while installed
+_originals = {}
+_lock = threading.Lock()
+
+
+class Stats(object):
+    """ Counters filled in by instrumented methods """
+
+    def __init__(self, hook=None, slow_threshold=None, on_slow=None, slow_log_size=100):
+        """
+        Args:
+            hook: Function called with the stage name and time taken in seconds
+                  after every timed call, e.g. to feed a metrics exporter
+            slow_threshold: Reports that take longer to parse than that
+                            many seconds are logged in slow_reports
+            on_slow: Function called with the report string and time taken
+                     in seconds for every slow report
+            slow_log_size: Number of slow reports to keep, the latest ones are kept
+        """
+
+        self.hook = hook
+        self.slow_threshold = slow_threshold
+        self.on_slow = on_slow
+
+        # Stage -> [calls, seconds]
+        self.stages = {}
+        self.reports = 0
+        self.groups = 0
+        # (seconds, report string) tuples
+        self.slow_reports = collections.deque(maxlen=slow_log_size)
+
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        """ Counts a call """
+
+        with self._lock:
+            counters = self.stages.get(stage)
+            if counters is None:
+                counters = self.stages[stage] = [0, 0.0]
+            counters[0] += 1
+            counters[1] += seconds
+
+        if self.hook is not None:
+            self.hook(stage, seconds)
+
+    def add_report(self, taf, string, seconds):
+        """ Counts a parsed report """
+
+        with self._lock:
+            self.reports += 1
+
+        self.add("report", seconds)
+
+        if self.slow_threshold is not None and seconds >= self.slow_threshold:
+            self.slow_reports.append((seconds, string))
+            if self.on_slow is not None:
+                self.on_slow(string, seconds)
+
+    def add_groups(self, count):
+        """ Counts parsed weather groups """
+
+        with self._lock:
+            self.groups += count
+
+    def snapshot(self):
+        """ Returns the counters as a dict: reports, groups, and calls
+            and seconds by stage, e.g. {"stages": {"header": {"calls": 10, "seconds": 0.002}}}
+        """
+
+        with self._lock:
+            return({"reports": self.reports, "groups": self.groups,
+                    "stages": dict((stage, {"calls": calls, "seconds": seconds})
+                                   for stage, (calls, seconds) in self.stages.items())})
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.reports = 0
+            self.groups = 0
+            self.slow_reports.clear()
+
+    def __repr__(self):
+        return("Stats(reports=%d, groups=%d, stages=%r)" % (self.reports, self.groups, self.stages))
+
+
+def _timed(function, stage, stats):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = _clock()
+        try:
+            return(function(*args, **kwargs))
+        finally:
+            stats.add(stage, _clock() - start)
+    return(wrapper)
+
+
+def _timed_init(function, stats):
+    @functools.wraps(function)
+    def __init__(self, string, *args, **kwargs):
+        start = _clock()
+        try:
+            function(self, string, *args, **kwargs)
+        finally:
+            stats.add_report(self, string, _clock() - start)
+    return(__init__)
+
+
+def _counted_groups(function, stats):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        groups = function(*args, **kwargs)
+        stats.add_groups(len(groups))
+        return(groups)
+    return(wrapper)
+
+
+def install(stats=None, **options):
+    """ Starts timing parsing and decoding
+
+    Args:
+        stats: Stats object to add counters to, a new one if not given
+        options: Keyword arguments for Stats, if not given
+
+    Raises:
+        RuntimeError: Instrumentation is installed already
+
+    Returns:
+        The Stats object
+    """
+
+    if stats is None:
+        stats = Stats(**options)
+
+    with _lock:
+        if _originals:
+            raise RuntimeError("Instrumentation is installed already")
+
+        for stage, (cls, name) in STAGES.items():
+            function = cls.__dict__[name]
+            _originals[(cls, name)] = function
+            if stage == "report":
+                setattr(cls, name, _timed_init(function, stats))
+            else:
+                setattr(cls, name, _timed(function, stage, stats))
+
+        cls, name = GROUPS
+        function = cls.__dict__[name]
+        _originals[GROUPS] = function
+        setattr(cls, name, _counted_groups(function, stats))
+
+    return(stats)
+
+
+def uninstall():
+    """ Stops timing, restoring the original methods """
+
+    with _lock:
+        for (cls, name), function in _originals.items():
+            setattr(cls, name, function)
+        _originals.clear()
+
+
+def installed():
+    """ Returns True if instrumentation is installed """
+    return(bool(_originals))
@@ -0,0 +1,237 @@
+""" Forecast conditions at a given time
+
+A TAF is a sequence of groups with overlapping validity periods:
+the initial group and FM groups set the prevailing conditions until
+the next FM group, BECMG groups change them gradually over a period,
+and TEMPO and PROB groups describe temporary changes.
+
+Timeline turns a TAF into a sorted list of boundaries between which
+the same groups apply, so the conditions at any time are found
+with a binary search:
+
+    index = pytaf.intervals.ForecastIndex()
+    for taf in tafs:
+        index.add(taf)
+    conditions = index.at("KDEN", time.time())
+    conditions["prevailing"]["wind"], conditions["changes"]
+
+Times are POSIX timestamps, see pytaf.timeutil.
+"""
+
+import time
+import bisect
+
+from . import timeutil
+
+# Group types that change prevailing conditions for good
+FROM = "FM"
+BECOMING = "BECMG"
+
+
+def _merge(prevailing, group):
+    """ Returns prevailing conditions after a BECMG group """
+    merged = dict(prevailing or {})
+    for key, value in group.items():
+        if key != "header" and value:
+            merged[key] = value
+    return(merged)
+
+
+class Timeline(object):
+    """ Conditions forecast by a single TAF, indexed by time """
+
+    def __init__(self, taf, reference=None):
+        """
+        Args:
+            taf: TAF object
+            reference: POSIX time close to the report issue time, used to resolve
+                       days of month to dates. Defaults to now.
+        """
+
+        self.taf = taf
+        self.valid_from = None
+        self.valid_till = None
+
+        # Boundaries, and (prevailing group, change groups) between every
+        # boundary and the next one
+        self._boundaries = []
+        self._states = []
+
+        header = taf.get_header()
+        if not header or header.get("form") != "taf":
+            return
+
+        if reference is None:
+            reference = time.time()
+
+        # Reports parsed with a reference time have their times resolved already
+        self.valid_from = header.get("valid_from_time")
+        self.valid_till = header.get("valid_till_time")
+
+        if self.valid_from is None:
+            issued = timeutil.resolve_time(header.get("origin_date"), header.get("origin_hours"),
+                                           header.get("origin_minutes"), reference)
+            if issued is not None:
+                reference = issued
+
+            self.valid_from = timeutil.resolve_time(header.get("valid_from_date"), header.get("valid_from_hours"),
+                                                    0, reference)
+            if self.valid_from is None:
+                return
+
+        if self.valid_till is None:
+            self.valid_till = timeutil.resolve_time(header.get("valid_till_date"), header.get("valid_till_hours"),
+                                                    0, self.valid_from)
+        if self.valid_till is None or self.valid_till <= self.valid_from:
+            return
+
+        self._build(taf.get_groups())
+
+    def _build(self, groups):
+        # Prevailing conditions as (start, sequence number, group), and change periods
+        prevailing = []
+        changes = []
+        current = None
+
+        for index, group in enumerate(groups):
+            header = group.get("header")
+            group_type = " ".join(header["type"].split()) if header and header.get("type") else None
+
+            if group_type is None:
+                # Only the initial group has no header. Later ones are change
+                # groups with a header that couldn't be parsed, e.g. "FM29XX00",
+                # and nothing is known about when they apply.
+                if index == 0:
+                    current = group
+                    prevailing.append((self.valid_from, len(prevailing), group))
+                continue
+
+            start = header.get("from_time")
+            if start is None:
+                start = timeutil.resolve_time(header.get("from_date"), header.get("from_hours"),
+                                              header.get("from_minutes"), self.valid_from)
+            if start is None:
+                continue
+
+            if group_type == FROM:
+                current = group
+                prevailing.append((start, len(prevailing), group))
+                continue
+
+            end = header.get("till_time")
+            if end is None:
+                end = timeutil.resolve_time(header.get("till_date"), header.get("till_hours"), 0, start)
+            if end is None or end <= start:
+                continue
+
+            changes.append((start, end, group))
+            if group_type == BECOMING:
+                current = _merge(current, group)
+                prevailing.append((end, len(prevailing), current))
+
+        prevailing.sort(key=lambda item: item[:2])
+        starts = [item[0] for item in prevailing]
+
+        boundaries = set([self.valid_from, self.valid_till])
+        boundaries.update(starts)
+        for start, end, _ in changes:
+            boundaries.add(start)
+            boundaries.add(end)
+        boundaries = sorted(b for b in boundaries if self.valid_from <= b <= self.valid_till)
+
+        for boundary in boundaries[:-1]:
+            i = bisect.bisect_right(starts, boundary) - 1
+            group = prevailing[i][2] if i >= 0 else None
+            active = [change for start, end, change in changes if start <= boundary < end]
+            self._states.append((group, active))
+
+        self._boundaries = boundaries
+
+    def _result(self, i):
+        prevailing, changes = self._states[i]
+        return({"station": self.taf.get_header()["icao_code"],
+                "from": self._boundaries[i], "till": self._boundaries[i + 1],
+                "prevailing": prevailing, "changes": list(changes)})
+
+    def at(self, timestamp):
+        """ Returns conditions forecast at a given time
+
+        Returns:
+            Dict with the station ICAO code, the period during which
+            the same groups apply ("from", "till"), the prevailing
+            conditions group and the list of TEMPO, PROB and BECMG groups
+            in effect ("changes"), or None if the time is out of the
+            validity period
+        """
+
+        i = bisect.bisect_right(self._boundaries, timestamp) - 1
+        if i < 0 or i >= len(self._states):
+            return(None)
+        return(self._result(i))
+
+    def between(self, start, end):
+        """ Returns conditions forecast during a period, see at()
+
+        Returns:
+            List of dicts, one for every part of the period
+            during which the same groups apply
+        """
+
+        first = max(bisect.bisect_right(self._boundaries, start) - 1, 0)
+        last = min(bisect.bisect_left(self._boundaries, end), len(self._states))
+        return([self._result(i) for i in range(first, last)])
+
+
+class ForecastIndex(object):
+    """ Timelines of many stations, by ICAO code """
+
+    def __init__(self):
+        self._timelines = {}
+
+    def add(self, taf, reference=None):
+        """ Adds a TAF, replacing the previous one of its station
+
+        Args:
+            taf: TAF object
+            reference: See Timeline
+
+        Returns:
+            The Timeline, or None if the report is not a TAF with a valid period
+        """
+
+        timeline = Timeline(taf, reference)
+        if not timeline._states:
+            return(None)
+
+        self._timelines[taf.get_header()["icao_code"]] = timeline
+        return(timeline)
+
+    def remove(self, icao_code):
+        self._timelines.pop(icao_code, None)
+
+    def timeline(self, icao_code):
+        """ Returns the Timeline of a station, or None """
+        return(self._timelines.get(icao_code))
+
+    def at(self, icao_code, timestamp):
+        """ Returns conditions forecast for a station at a given time, see Timeline.at() """
+        timeline = self._timelines.get(icao_code)
+        if timeline is None:
+            return(None)
+        return(timeline.at(timestamp))
+
+    def between(self, icao_code, start, end):
+        """ Returns conditions forecast for a station during a period, see Timeline.between() """
+        timeline = self._timelines.get(icao_code)
+        if timeline is None:
+            return([])
+        return(timeline.between(start, end))
+
+    def stations(self):
+        return(list(self._timelines))
+
+    def __contains__(self, icao_code):
+        return(icao_code in self._timelines)
+
+    def __len__(self):
+        return(len(self._timelines))
@@ -0,0 +1,368 @@
+""" Compact result objects
+
+By default TAF objects store the header and weather groups as nested dicts.
+With TAF(string, model="slots"), they are stored as the objects below instead.
+They use __slots__, so they carry no per-instance dict, but they still
+behave like the dicts they replace: fields are accessible with
+record["wind"] as well as record.wind, and a field that would be missing
+from the dict is missing from the record too, so existing code that
+works with the dicts (including Decoder) keeps working.
+Fields that are not in the record's __slots__, such as the ones added by
+overridden patterns (see pytaf.grammar), are kept in a per-record dict
+that is only created when there are any, and are part of the record
+like any other field.
+
+Approximate memory footprint of a parsed report (measured with tracemalloc
+on CPython 3.11, 64-bit, for the 8 group TAF from examples/demo.py):
+
+    dict model:                ~18 KB per report
+    slots model:               ~12.5 KB per report
+    dict model, intern=True:   ~13.5 KB per report
+    slots model, intern=True:  ~8 KB per report
+"""
+
+
+class Record(object):
+    """ Base class for slotted records with a read-write dict-like interface """
+
+    # Dict of fields that have no slot, only set if there are any
+    __slots__ = ("_extra",)
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, fields):
+        """ Creates a record from a dict, or returns None for None """
+        if fields is None:
+            return(None)
+
+        record = cls.__new__(cls)
+        for key, value in fields.items():
+            record[key] = value
+        return(record)
+
+    def to_dict(self):
+        """ Returns the record (and any nested records) as plain dicts and lists """
+        result = {}
+        for key, value in self.items():
+            result[key] = _to_plain(value)
+        return(result)
+
+    def copy(self):
+        """ Returns a shallow copy """
+        return(self.__class__.from_dict(self))
+
+    def _get_extra(self):
+        try:
+            return(self._extra)
+        except AttributeError:
+            return(None)
+
+    # Dict interface
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            try:
+                return(getattr(self, key))
+            except AttributeError:
+                raise KeyError(key)
+
+        extra = self._get_extra()
+        if extra is None:
+            raise KeyError(key)
+        return(extra[key])
+
+    def __setitem__(self, key, value):
+        if key in self.__slots__:
+            setattr(self, key, value)
+            return
+
+        extra = self._get_extra()
+        if extra is None:
+            extra = self._extra = {}
+        extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.__slots__:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+            return
+
+        extra = self._get_extra()
+        if extra is None:
+            raise KeyError(key)
+        del extra[key]
+        if not extra:
+            del self._extra
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not set:
+        # missing fields, and fields without a slot
+        if name != "_extra":
+            extra = self._get_extra()
+            if extra is not None and name in extra:
+                return(extra[name])
+        raise AttributeError(name)
+
+    def __contains__(self, key):
+        if key in self.__slots__:
+            return(hasattr(self, key))
+        extra = self._get_extra()
+        return(extra is not None and key in extra)
+
+    def get(self, key, default=None):
+        try:
+            return(self[key])
+        except KeyError:
+            return(default)
+
+    def keys(self):
+        keys = [key for key in self.__slots__ if hasattr(self, key)]
+        extra = self._get_extra()
+        if extra is not None:
+            keys.extend(extra)
+        return(keys)
+
+    def values(self):
+        return([value for _, value in self.items()])
+
+    def items(self):
+        items = [(key, getattr(self, key)) for key in self.__slots__ if hasattr(self, key)]
+        extra = self._get_extra()
+        if extra is not None:
+            items.extend(extra.items())
+        return(items)
+
+    def __iter__(self):
+        return(iter(self.keys()))
+
+    def __len__(self):
+        return(len(self.keys()))
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return(dict(self.items()) == dict(other.items()))
+        return(NotImplemented)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return(result)
+        return(not result)
+
+    __hash__ = None
+
+    # Slotted objects without __dict__ need explicit pickle support
+    # for protocols older than 2
+    def __getstate__(self):
+        return(dict(self.items()))
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            self[key] = value
+
+    def __repr__(self):
+        return("%s(%s)" % (self.__class__.__name__,
+                           ", ".join("%s=%r" % item for item in self.items())))
+
+
+class Header(Record):
+    """ Report header """
+    __slots__ = ("type", "icao_code", "origin_date", "origin_hours", "origin_minutes",
+                 "valid_from_date", "valid_from_hours", "valid_till_date", "valid_till_hours",
+                 "form", "origin_time", "valid_from_time", "valid_till_time")
+
+
+class GroupHeader(Record):
+    """ FM/TEMPO/BECMG/PROB group header """
+    __slots__ = ("type", "probability", "from_date", "from_hours", "from_minutes",
+                 "till_date", "till_hours", "from_time", "till_time")
+
+
+class Wind(Record):
+    __slots__ = ("direction", "speed", "gust", "unit")
+
+
+class Visibility(Record):
+    __slots__ = ("more", "range", "unit")
+
+
+class CloudLayer(Record):
+    __slots__ = ("layer", "ceiling", "type")
+
+
+class WeatherWord(Record):
+    """ Weather string, e.g. "-SHRA", split into its parts """
+    __slots__ = ("intensity", "modifier", "phenomenon")
+
+
+class WindShear(Record):
+    __slots__ = ("altitude", "direction", "speed", "unit")
+
+
+class Temperature(Record):
+    __slots__ = ("air_prefix", "air", "dewpoint_prefix", "dewpoint")
+
+
+class Pressure(Record):
+    __slots__ = ("altimeter_setting", "athm_pressure")
+
+
+class Group(Record):
+    """ Weather group (or the only group of a METAR) """
+    __slots__ = ("header", "temperature", "pressure", "wind", "visibility", "clouds",
+                 "vertical_visibility", "weather", "windshear")
+
+    @classmethod
+    def from_dict(cls, fields):
+        if fields is None:
+            return(None)
+
+        group = cls.__new__(cls)
+        for key, value in fields.items():
+            if key == "header":
+                value = GroupHeader.from_dict(value)
+            elif key == "temperature":
+                value = Temperature.from_dict(value)
+            elif key == "pressure":
+                value = Pressure.from_dict(value)
+            elif key == "wind":
+                value = Wind.from_dict(value)
+            elif key == "visibility":
+                value = Visibility.from_dict(value)
+            elif key == "windshear":
+                value = WindShear.from_dict(value)
+            elif key == "clouds":
+                value = [CloudLayer.from_dict(layer) for layer in value]
+            elif key == "weather":
+                value = [WeatherWord.from_dict(word) for word in value]
+            group[key] = value
+        return(group)
+
+
+def _to_plain(value):
+    if isinstance(value, Record):
+        return(value.to_dict())
+    elif isinstance(value, list):
+        return([_to_plain(item) for item in value])
+    else:
+        return(value)
+
+
+class LazyGroup(dict):
+    """ Group dict that parses its fields on first access
+
+    Used by TAF(string, lazy=True). Fields are parsed when they are looked up,
+    and all remaining fields are parsed as soon as the group is used as
+    a whole (iterated, compared, copied, pickled...), so it is
+    indistinguishable from the dict it stands for.
+    """
+
+    __slots__ = ("_fields", "_load")
+
+    def __init__(self, fields, load):
+        """
+        Args:
+            fields: Field names, in the order they appear in a group dict
+            load: Function that takes a field name and returns its value
+        """
+        dict.__init__(self)
+        self._fields = fields
+        self._load = load
+
+        # The C implementation of json skips dict subclasses that look empty,
+        # so keep at least one field loaded
+        if fields:
+            self[fields[0]]
+
+    def __missing__(self, key):
+        if self._load is None or key not in self._fields:
+            raise KeyError(key)
+        value = self._load(key)
+        dict.__setitem__(self, key, value)
+        return(value)
+
+    def _materialize(self):
+        if self._load is None:
+            return
+
+        for key in self._fields:
+            if not dict.__contains__(self, key):
+                dict.__setitem__(self, key, self._load(key))
+
+        # Restore the usual field order
+        extra = [(key, value) for key, value in dict.items(self) if key not in self._fields]
+        ordered = [(key, dict.__getitem__(self, key)) for key in self._fields]
+        dict.clear(self)
+        dict.update(self, ordered)
+        dict.update(self, extra)
+
+        self._load = None
+
+    def __contains__(self, key):
+        if self._load is not None and key in self._fields:
+            return(True)
+        return(dict.__contains__(self, key))
+
+    def get(self, key, default=None):
+        try:
+            return(self[key])
+        except KeyError:
+            return(default)
+
+    def __setitem__(self, key, value):
+        self._materialize()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._materialize()
+        dict.__delitem__(self, key)
+
+    def __iter__(self):
+        self._materialize()
+        return(dict.__iter__(self))
+
+    def __len__(self):
+        self._materialize()
+        return(dict.__len__(self))
+
+    def __eq__(self, other):
+        self._materialize()
+        if isinstance(other, LazyGroup):
+            other._materialize()
+        return(dict.__eq__(self, other))
+
+    def __ne__(self, other):
+        self._materialize()
+        if isinstance(other, LazyGroup):
+            other._materialize()
+        return(dict.__ne__(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        self._materialize()
+        return(dict.__repr__(self))
+
+    def __reduce__(self):
+        # Pickles and copies are plain dicts
+        self._materialize()
+        return((dict, (list(dict.items(self)),)))
+
+
+def _lazy_dict_method(name):
+    method = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._materialize()
+        return(method(self, *args, **kwargs))
+
+    wrapper.__name__ = name
+    return(wrapper)
+
+
+for _name in ("keys", "values", "items", "copy", "pop", "popitem", "setdefault", "update", "clear"):
+    setattr(LazyGroup, _name, _lazy_dict_method(_name))
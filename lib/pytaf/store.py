@@ -0,0 +1,187 @@
+""" Current reports by station
+
+StationStore keeps the latest forecast (TAF) and observation (METAR)
+for every station, so that the current report for a station is a dict lookup:
+
+    store = pytaf.StationStore()
+    for taf in pytaf.read_bulletins(path, errors="skip"):
+        store.add(taf)
+    store.forecast("KDEN")
+
+A report replaces the current one if it was issued later, or at the same
+time but is an amendment or correction of it. Forecasts expire at the
+end of their validity period, observations after max_observation_age.
+The number of stations is bounded, stations that haven't received
+reports for the longest time are dropped first.
+"""
+
+import time
+import threading
+import collections
+
+from . import timeutil
+
+# Report types in order of precedence for reports issued at the same time
+TYPE_RANKS = {
+    None: 0,
+    "": 0,
+    "RTD": 0,
+    "AMD": 1,
+    "COR": 1,
+    "AMD COR": 2,
+    "COR AMD": 2,
+}
+
+FORECAST = "taf"
+OBSERVATION = "metar"
+
+
+class _Entry(object):
+    __slots__ = ("report", "issued", "rank", "expires")
+
+    def __init__(self, report, issued, rank, expires):
+        self.report = report
+        self.issued = issued
+        self.rank = rank
+        self.expires = expires
+
+
+class StationStore(object):
+    """ Latest forecast and observation per ICAO code """
+
+    def __init__(self, max_stations=20000, max_observation_age=2 * 3600, clock=time.time):
+        """
+        Args:
+            max_stations: Maximum number of stations to keep reports for
+            max_observation_age: Seconds after issue time when observations expire
+            clock: Function that returns the current POSIX time
+        """
+
+        self.max_stations = max_stations
+        self.max_observation_age = max_observation_age
+        self._clock = clock
+
+        # ICAO code -> {form: _Entry}, least recently updated stations first
+        self._stations = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, taf, received=None):
+        """ Adds a report, if it's newer than the current one for its station
+
+        Args:
+            taf: TAF object (a TAF or METAR)
+            received: POSIX time the report was received, now if not given.
+                      Report times are resolved relative to it.
+
+        Returns:
+            True if the report became current, False if it was superseded
+            already, expired or has no usable header
+        """
+
+        header = taf.get_header()
+        if not header or not header.get("icao_code"):
+            return(False)
+
+        if received is None:
+            received = self._clock()
+
+        form = header.get("form")
+
+        # Reports parsed with a reference time have their times resolved already
+        issued = header.get("origin_time")
+        if issued is None:
+            issued = timeutil.resolve_time(header.get("origin_date"), header.get("origin_hours"),
+                                           header.get("origin_minutes"), received)
+        if issued is None:
+            issued = received
+
+        if form == FORECAST:
+            expires = header.get("valid_till_time")
+            if expires is None:
+                expires = timeutil.resolve_time(header.get("valid_till_date"), header.get("valid_till_hours"),
+                                                0, issued)
+        else:
+            expires = issued + self.max_observation_age
+
+        if expires is not None and expires <= self._clock():
+            return(False)
+
+        entry = _Entry(taf, issued, TYPE_RANKS.get(header.get("type"), 0), expires)
+        icao_code = header["icao_code"]
+
+        with self._lock:
+            station = self._stations.pop(icao_code, None)
+            if station is None:
+                station = {}
+
+            current = station.get(form)
+            if current is not None and (current.issued, current.rank) > (entry.issued, entry.rank):
+                self._stations[icao_code] = station
+                return(False)
+
+            station[form] = entry
+            self._stations[icao_code] = station
+
+            while len(self._stations) > self.max_stations:
+                self._stations.popitem(last=False)
+
+        return(True)
+
+    def _get(self, icao_code, form):
+        station = self._stations.get(icao_code)
+        if station is None:
+            return(None)
+
+        entry = station.get(form)
+        if entry is None:
+            return(None)
+
+        if entry.expires is not None and entry.expires <= self._clock():
+            with self._lock:
+                if station.get(form) is entry:
+                    del station[form]
+                # Like expire(), don't keep stations without reports
+                if not station and self._stations.get(icao_code) is station:
+                    del self._stations[icao_code]
+            return(None)
+
+        return(entry.report)
+
+    def forecast(self, icao_code):
+        """ Returns the current TAF for a station, or None """
+        return(self._get(icao_code, FORECAST))
+
+    def observation(self, icao_code):
+        """ Returns the current METAR for a station, or None """
+        return(self._get(icao_code, OBSERVATION))
+
+    def expire(self):
+        """ Drops all expired reports
+
+        Returns:
+            Number of reports dropped
+        """
+
+        now = self._clock()
+        dropped = 0
+        with self._lock:
+            for icao_code in list(self._stations):
+                station = self._stations[icao_code]
+                for form in list(station):
+                    expires = station[form].expires
+                    if expires is not None and expires <= now:
+                        del station[form]
+                        dropped += 1
+                if not station:
+                    del self._stations[icao_code]
+        return(dropped)
+
+    def stations(self):
+        """ Returns ICAO codes of all stations with reports (expired reports included) """
+        return(list(self._stations))
+
+    def __contains__(self, icao_code):
+        return(icao_code in self._stations)
+
+    def __len__(self):
+        return(len(self._stations))
@@ -1,53 +1,288 @@
-import re
+import sys
+
+from . import codes
+from . import grammar
+from . import timeutil
+from . import tokenizer
+from . import weather as weather_codes
+from . import model as result_model
 
 class MalformedTAF(Exception):
-    def __init__(self, msg):
+    def __init__(self, msg, stage=None):
         self.strerror = msg
+        # Parsing stage that failed, one of TAF.STAGES
+        self.stage = stage
 
 class TAF(object):
     """ TAF "envelope" parser """
 
-    def __init__(self, string):
+    ENGINES = ("regex", "tokens")
+    MODELS = ("dict", "slots")
+
+    # Result status codes: everything parsed, header parsed
+    # but not all groups, nothing parsed
+    STATUS_OK = "ok"
+    STATUS_PARTIAL = "partial"
+    STATUS_FAILED = "failed"
+
+    # Parsing stages, as reported for errors
+    STAGES = ("input", "header", "groups", "field")
+
+    # Header patterns for reports without a TAF or METAR keyword, in order of preference
+    HEADER_PATTERNS = ("taf_header", "metar_header")
+
+    # Longest report accepted, far more than any real report. Longer strings
+    # are most likely garbage, and are rejected before any parsing.
+    MAX_LENGTH = 16384
+
+    # Group fields and their parsers, in the order they appear in group dicts
+    TAF_GROUP_FIELDS = (("header", "_parse_group_header"),
+                        ("wind", "_parse_wind"),
+                        ("visibility", "_parse_visibility"),
+                        ("clouds", "_parse_clouds"),
+                        ("vertical_visibility", "_parse_vertical_visibility"),
+                        ("weather", "_parse_weather_phenomena"),
+                        ("windshear", "_parse_wind_shear"))
+
+    METAR_GROUP_FIELDS = (("temperature", "_parse_temperature"),
+                          ("pressure", "_parse_pressure")) + TAF_GROUP_FIELDS[1:]
+
+    def __init__(self, string, engine="regex", model="dict", lazy=False, strict=True,
+                 reference_time=None, intern=False):
         """
         Initializes the object with TAF/METAR report text.
 
         Args:
             string: TAF/METAR report string
+            engine: Weather group parsing engine, "regex" (one search per field)
+                    or "tokens" (one pass over whitespace-separated tokens).
+                    Both produce the same groups. With overridden field
+                    patterns (see pytaf.grammar), "tokens" uses the regex engine.
+            model: Result representation, "dict" for nested dicts
+                   or "slots" for the compact objects from pytaf.model,
+                   which can be used as the dicts they replace
+            lazy: Only parse the header right away. Weather groups are parsed
+                  on the first get_groups() call, and with the default regex
+                  engine and dict model, individual group fields are only parsed
+                  when they are looked up. Results are the same,
+                  but errors in groups are raised by get_groups().
+            strict: Raise MalformedTAF on errors. If False, errors are
+                    recorded instead, see get_status(), get_error()
+                    and get_error_stage(), and the groups parsed before
+                    the error are kept.
+            reference_time: POSIX timestamp close to the report issue time,
+                    such as the time it was received. If given, day and time
+                    fields are also resolved to POSIX timestamps: origin_time,
+                    valid_from_time and valid_till_time in the header,
+                    from_time and till_time in group headers (None if missing).
+                    See pytaf.timeutil.
+            intern: Share strings with other reports: codes, units and numbers
+                    are replaced with the equal strings from pytaf.codes,
+                    and ICAO codes are interned with sys.intern(). Results
+                    are the same, but take less memory when many reports
+                    are kept around.
 
         Raises:
-            MalformedTAF: An error parsing the TAF/METAR report
+            MalformedTAF: An error parsing the TAF/METAR report (only if strict)
         """
 
-        # Instance variables
-        self._raw_taf = None
-        self._taf_header = None
-        self._raw_weather_groups = []
-        self._weather_groups = []
-        self._maintenance = None
+        if engine not in self.ENGINES:
+            raise ValueError("Unknown parsing engine: %s" % engine)
+
+        if model not in self.MODELS:
+            raise ValueError("Unknown result model: %s" % model)
+
+        self._init_state(engine, model, lazy, strict, reference_time, intern)
 
         if isinstance(string, str) and string != "":
             self._raw_taf = string
         else:
-            raise MalformedTAF("TAF/METAR string expected")
+            self._fail("input", "TAF/METAR string expected")
+            return
 
         # Patterns use ^ and $, so we don't want
         # leading/trailing spaces
         self._raw_taf = self._raw_taf.strip()
 
+        if len(self._raw_taf) > self.MAX_LENGTH:
+            self._fail("input", "Report is too long")
+            return
+
         # Initialize header part
         self._taf_header = self._init_header(self._raw_taf)
+        if self._taf_header is None:
+            return
+
+        if reference_time is not None:
+            self._resolve_header_times(self._taf_header)
+
+        if intern:
+            self._intern_header(self._taf_header)
+
+        if model == "slots":
+            self._taf_header = result_model.Header.from_dict(self._taf_header)
+
+        if not lazy:
+            self._weather_groups = self._init_weather_groups()
+            self.get_maintenance()
+
+    def _init_state(self, engine, model, lazy, strict, reference_time, intern=False):
+        """ Sets instance variables to their initial values """
+
+        self._engine = engine
+        self._model = model
+        self._lazy = lazy
+        self._strict = strict
+        self._intern = intern
+        self._status = self.STATUS_OK
+        self._error = None
+        self._error_stage = None
+        self._reference_time = reference_time
+        self._valid_from_time = None
+        self._raw_taf = None
+        self._taf_header = None
+        self._header_span = None
+        self._raw_weather_groups = []
+        self._weather_groups = None
+        self._maintenance = None
+        self._maintenance_parsed = False
+
+        # Decoded text and JSON, memoized by Decoder and pytaf.export
+        self._decoded = {}
+
+    @classmethod
+    def _restore(cls, raw_taf, header, groups, maintenance, header_span=None,
+                 status=STATUS_OK, error=None, error_stage=None, model="dict"):
+        """ Creates a TAF object from already parsed parts, e.g. deserialized ones.
+            Parts are used as given, they must use the given model.
+        """
+
+        taf = cls.__new__(cls)
+        taf._init_state("regex", model, False, error is None, None)
+        taf._raw_taf = raw_taf
+        taf._taf_header = header
+        taf._header_span = header_span
+        taf._weather_groups = groups
+        taf._maintenance = maintenance
+        taf._maintenance_parsed = True
+        taf._status = status
+        taf._error = error
+        taf._error_stage = error_stage
+        return(taf)
+
+    def __getstate__(self):
+        # Make sure there's nothing left to parse
+        self._parse_lazy()
+        self.get_maintenance()
+
+        # Raw group strings are only needed during parsing,
+        # leave them out to keep pickles (e.g. sent from worker processes) small
+        state = self.__dict__.copy()
+        state['_raw_weather_groups'] = []
+        state['_decoded'] = {}
+        return(state)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._intern = state.get('_intern', False)
+
+        # Unpickled strings are new copies, e.g. in results from worker processes
+        if self._intern:
+            if self._taf_header is not None:
+                self._intern_header(self._taf_header)
+            for group in self._weather_groups or ():
+                codes.intern_fields(group)
+            self._maintenance = codes.intern(self._maintenance)
+
+    @staticmethod
+    def _intern_header(header):
+        codes.intern_fields(header)
+        if header.get("icao_code") is not None:
+            header["icao_code"] = sys.intern(header["icao_code"])
+
+    def _fail(self, stage, message):
+        """ Raises MalformedTAF, or records the error if not strict """
+
+        if self._strict:
+            raise MalformedTAF(message, stage)
+
+        if self._taf_header is None:
+            self._status = self.STATUS_FAILED
+            # Nothing else to parse
+            self._weather_groups = []
+            self._maintenance_parsed = True
+        else:
+            self._status = self.STATUS_PARTIAL
+        self._error = message
+        self._error_stage = stage
+
+    def _init_weather_groups(self):
+        """ Parses weather groups (or the METAR body)
+
+        Raises:
+            MalformedTAF: Group decoding error
+
+        Returns:
+            List of group dicts (or records, or lazy groups)
+        """
 
         if self._taf_header['form'] == 'metar':
-            self._weather_groups.append(self._parse_group(self._raw_taf))
+            raw_groups = [self._get_body()]
+            fields = self.METAR_GROUP_FIELDS
         else:
             # Get all TAF weather groups
-            self._raw_weather_groups = self._init_groups(self._raw_taf)
+            self._raw_weather_groups = self._init_groups(self._get_body())
+            if self._raw_weather_groups is None:
+                self._raw_weather_groups = []
+                return([])
+            raw_groups = self._raw_weather_groups
+            fields = self.TAF_GROUP_FIELDS
+
+        weather_groups = []
+
+        # Lazy fields would raise errors long after parsing,
+        # so they are only used in strict mode
+        if self._lazy and self._strict and self._engine == "regex" and self._model == "dict":
+            names = tuple(name for name, _ in fields)
+            for group in raw_groups:
+                weather_groups.append(result_model.LazyGroup(names, self._field_loader(group, dict(fields))))
+        else:
+            for group in raw_groups:
+                if self._strict:
+                    parsed_group = self._parse_group(group)
+                else:
+                    try:
+                        parsed_group = self._parse_group(group)
+                    except Exception as e:
+                        self._fail("field", "Error parsing group: %s" % e)
+                        break
+                if self._intern:
+                    codes.intern_fields(parsed_group)
+                if self._model == "slots":
+                    parsed_group = result_model.Group.from_dict(parsed_group)
+                weather_groups.append(parsed_group)
+
+        return(weather_groups)
+
+    def _get_body(self):
+        """ Returns the report text that follows the header
+
+        Field patterns only match after whitespace, so whitespace
+        consumed by the header pattern is given back.
+        """
 
-            for group in self._raw_weather_groups:
-                parsed_group = self._parse_group(group)
-                self._weather_groups.append(parsed_group)
+        end = self._header_span[1]
+        if end > 0 and self._raw_taf[end - 1].isspace():
+            end -= 1
+        return(self._raw_taf[end:])
 
-        self._maintenance = self._parse_maintenance(self._raw_taf)
+    def _field_loader(self, string, parsers):
+        def load(name):
+            value = getattr(self, parsers[name])(string)
+            if self._intern:
+                value = codes.intern_fields({name: value})[name]
+            return(value)
+        return(load)
 
     def _init_header(self, string):
         """ Extracts header part from TAF/METAR string and populates header dict
@@ -62,62 +297,54 @@ class TAF(object):
             Header dictionary
         """
 
-        taf_header_pattern = """
-            ^
-            (TAF)?    # TAF header (at times missing or duplicate)
-            \s*
-            (?P<type> (COR|AMD|AMD\sCOR|COR\sAMD|RTD)){0,1}
-
-            \s* # There may or may not be space as COR/AMD/RTD is optional
-            (?P<icao_code> [A-Z]{4}) # Station ICAO code
-
-            \s* # at some aerodromes does not appear
-            (?P<origin_date> \d{0,2}) # at some aerodromes does not appear
-            (?P<origin_hours> \d{0,2}) # at some aerodromes does not appear
-            (?P<origin_minutes> \d{0,2}) # at some aerodromes does not appear
-            Z? # Zulu time (UTC, that is) # at some aerodromes does not appear
-
-            \s*
-            (?P<valid_from_date> \d{0,2})
-            (?P<valid_from_hours> \d{0,2})
-            /
-            (?P<valid_till_date> \d{0,2})
-            (?P<valid_till_hours> \d{0,2})
-        """
-
-        metar_header_pattern = """
-            ^
-            (METAR)?    # METAR header (at times missing or duplicate)
-            \s*
-            (?P<icao_code> [A-Z]{4}) # Station ICAO code
-
-            \s* # at some aerodromes does not appear
-            (?P<origin_date> \d{0,2}) # at some aerodromes does not appear
-            (?P<origin_hours> \d{0,2}) # at some aerodromes does not appear
-            (?P<origin_minutes> \d{0,2}) # at some aerodromes does not appear
-            Z? # Zulu time (UTC, that is) # at some aerodromes does not appear
-            \s+
-            (?P<type> (COR){0,1}) # Corrected # TODO: Any other values possible?
-        """
+        # Reports usually start with a keyword that tells what they are,
+        # otherwise both patterns are tried in a single match.
+        # The difference between a METAR and TAF header isn't that big
+        # so it's likely for both to match. TAF is a bit more specific
+        # so if both match then we're most likely dealing with a TAF string.
+        if string.startswith("TAF") and string[3:4].isspace():
+            name = "taf_header"
+            match = grammar.get(name).match(string)
+            header_dict = match.groupdict() if match else None
+        elif string.startswith("METAR") and string[5:6].isspace():
+            name = "metar_header"
+            match = grammar.get(name).match(string)
+            header_dict = match.groupdict() if match else None
+        else:
+            match = grammar.get_alternation(self.HEADER_PATTERNS).match(string)
+            name, header_dict = grammar.branch(match, self.HEADER_PATTERNS)
 
-        header_taf = re.match(taf_header_pattern, string, re.VERBOSE)
-        header_metar = re.match(metar_header_pattern, string, re.VERBOSE)
+        if header_dict is None:
+            self._fail("header", "No valid TAF/METAR header found")
+            return None
 
-        # The difference between a METAR and TAF header isn't that big
-        # so it's likely to get both regex to match. TAF is a bit more specific so if
-        # both regex match then we're most likely dealing with a TAF string.
-        if header_taf:
-            header_dict = header_taf.groupdict()
+        if name == "taf_header":
             header_dict['form'] = 'taf'
-        elif header_metar:
-            header_dict = header_metar.groupdict()
-            header_dict['form'] = 'metar'
         else:
-            raise MalformedTAF("No valid TAF/METAR header found")
+            header_dict['form'] = 'metar'
+
+        self._header_span = match.span()
 
         return header_dict
 
 
+    def _resolve_header_times(self, header):
+        """ Adds POSIX timestamps to the header dict """
+
+        origin_time = timeutil.resolve_time(header["origin_date"], header["origin_hours"],
+                                            header["origin_minutes"], self._reference_time)
+        header["origin_time"] = origin_time
+
+        if header["form"] == "taf":
+            reference = origin_time or self._reference_time
+            header["valid_from_time"] = timeutil.resolve_time(header["valid_from_date"], header["valid_from_hours"],
+                                                              0, reference)
+            header["valid_till_time"] = timeutil.resolve_time(header["valid_till_date"], header["valid_till_hours"],
+                                                              0, header["valid_from_time"] or reference)
+            self._valid_from_time = header["valid_from_time"] or reference
+        else:
+            self._valid_from_time = origin_time or self._reference_time
+
     def _init_groups(self, string):
         """ Extracts weather groups (FM, PROB etc.) and populates group list
 
@@ -129,22 +356,21 @@ class TAF(object):
 
         """
 
-        taf_group_pattern = """
-            (?:FM|(?:PROB(?:\d{1,2})\s*(?:TEMPO)?)|TEMPO|BECMG|[\S\s])[A-Z0-9\+\-/\s$]+?(?=FM|PROB|TEMPO|BECMG|$)
-        """
-
-        group_list = []
+        if grammar.is_default("taf_group"):
+            groups = tokenizer.split_groups(string)
+        else:
+            groups = grammar.get("taf_group").findall(string)
 
-        groups = re.findall(taf_group_pattern, string, re.VERBOSE)
         if not groups:
-            raise MalformedTAF("No valid groups found")
+            self._fail("groups", "No valid groups found")
+            return None
 
-        for group in groups:
-            group_list.append(group)
-
-        return(group_list)
+        return(list(groups))
 
     def _parse_group(self, string):
+        if self._engine == "tokens" and tokenizer.supports_grammar():
+            return(tokenizer.parse_group(self, string))
+
         group = {}
 
         if self._taf_header['form'] == "taf":
@@ -163,47 +389,38 @@ class TAF(object):
 
         return(group)
 
-    def _parse_group_header(self, string):
-        # From header pattern
-        fm_pattern = """
-            (?P<type> FM) (?P<from_date>\d{2}) (?P<from_hours>\d{2})(?P<from_minutes> \d{2})
+    def _parse_group_header(self, string, fm_start=0, ptb_start=0):
         """
-
-        # PROB|TEMPO|BECMG header pattern, they have almost the same format
-        ptb_pattern = """
-            (?P<type> (?:PROB(?P<probability>\d{1,2})\s*(?:TEMPO)?)|TEMPO|BECMG)
-            \s+
-            (?P<from_date> \d{2})
-            (?P<from_hours> \d{2})
-            /
-            (?P<till_date> \d{2})
-            (?P<till_hours> \d{2})
+        Args:
+            string: Group string
+            fm_start, ptb_start: Positions to look for FM and PROB/TEMPO/BECMG
+                                 headers from, None if there can't be any
         """
 
         header = {}
 
         # Get type and associated fields
-        fm = re.search(fm_pattern, string, re.VERBOSE)
-        if fm:
-            header = fm.groupdict()
-
-        ptb = re.search(ptb_pattern, string, re.VERBOSE)
-        if ptb:
-            header = ptb.groupdict()
+        if fm_start is not None:
+            fm = grammar.get("fm_group_header").search(string, fm_start)
+            if fm:
+                header = fm.groupdict()
+
+        if ptb_start is not None:
+            ptb = grammar.get("ptb_group_header").search(string, ptb_start)
+            if ptb:
+                header = ptb.groupdict()
+
+        if header and self._reference_time is not None:
+            # FM groups have no end time
+            header["from_time"] = timeutil.resolve_time(header["from_date"], header["from_hours"],
+                                                        header.get("from_minutes"), self._valid_from_time)
+            header["till_time"] = timeutil.resolve_time(header.get("till_date"), header.get("till_hours"),
+                                                        0, header["from_time"] or self._valid_from_time)
 
         return(header)
 
     def _parse_wind(self, string):
-        wind_pattern = """
-            (?<= \s )
-            (?P<direction> (\d{3}|VRB)) # Three digits or VRB
-            (?P<speed> \d{2,3})         # Next two digits are speed in knots
-            (G(?P<gust> \d{2,3})){0,1}  # Optional gust data (Gxx)
-            (?P<unit> KT|MPS)           # Knots or meters per second
-            (?= \s|$ )
-        """
-
-        wind = re.search(wind_pattern, string, re.VERBOSE)
+        wind = grammar.get("wind").search(string)
 
         if wind:
             return(wind.groupdict())
@@ -211,33 +428,15 @@ class TAF(object):
             return(None)
 
     def _parse_visibility(self, string):
-        # Visibility in statute miles
-        visibility_pattern = """
-            (?<= \s )
-            (?P<more> P){0,1} # "P" prefix indicates visibility more than
-            (?P<range> \d | \d/\d | \d\s\d/\d)    # More than 6 is always just P6SM
-            (?P<unit> SM)                # Statute miles
-            (?= \s|$ )
-        """
-
-        # Visibility in meters
-        # XXX: In case "TEMPO 1012" style reports still exist,
-        # it will not work as is and I haven't came up with a fix yet
-        visibility_meters_pattern = """
-            (?<= \s )
-            (?P<range> \d{4})
-            (?= \s|$ )
-        """
-
         visibility = {}
 
         # US-style
-        visibility_sm = re.search(visibility_pattern, string, re.VERBOSE)
+        visibility_sm = grammar.get("visibility").search(string)
         if visibility_sm:
             visibility = visibility_sm.groupdict()
 
         # Metric style
-        visibility_meters = re.search(visibility_meters_pattern, string, re.VERBOSE)
+        visibility_meters = grammar.get("visibility_meters").search(string)
         if visibility_meters:
             visibility["range"] = visibility_meters.group("range")
             # 9999 in fact means "more than 10 km"
@@ -249,31 +448,20 @@ class TAF(object):
         return(visibility)
 
     def _parse_clouds(self, string):
-        clouds_pattern = """
-            (?<= \s )
-            (?P<layer> BKN|SCT|FEW|OVC)
-            (?P<ceiling> \d{3})
-            (?P<type> CU|CB|TCU|CI){0,1}
-            (?= \s|$ )
-        """
-
-        special_case_pattern = """ (SKC|CLR|NSC|CAVOK|CAVU) """
-        special_case_vv = """VV///"""
-        
         clouds = []
 
-        clear = re.search(special_case_pattern, string, re.VERBOSE)
+        clear = grammar.get("clouds_clear").search(string)
         if clear:
             clouds.append({"layer": clear.group(0)})
             return(clouds)
         
-        vv = re.search(special_case_vv, string, re.VERBOSE)
+        vv = grammar.get("clouds_obscured").search(string)
         if vv:
             clouds.append({"layer": vv.group(0)})
             return(clouds)
         
 
-        cloud_layers = re.finditer(clouds_pattern, string, re.VERBOSE)
+        cloud_layers = grammar.get("clouds").finditer(string)
         for layer in cloud_layers:
             clouds.append(layer.groupdict())
 
@@ -281,16 +469,9 @@ class TAF(object):
 
     def _parse_vertical_visibility(self, string):
 
-        vertical_visibility_pattern = """
-            (?<= \s )
-            VV
-            (?P<vertical_visibility> \d{3} )
-            (?= \s|$ )
-        """
-
         vertical_visibility = None
 
-        vv = re.search(vertical_visibility_pattern, string, re.VERBOSE)
+        vv = grammar.get("vertical_visibility").search(string)
         if vv:
             vertical_visibility = vv.group("vertical_visibility")
 
@@ -298,60 +479,29 @@ class TAF(object):
 
     def _parse_weather_phenomena(self, string):
 
-        weather_word_pattern = """
-          (?<= \s )
-          ( (?: \+|\-|VC|RE|MI|BC|DR|BL|SH|TS|FZ|PR|DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|DU|SA|HZ|PY|VA|PO|SQ|FC|SS|DS)+ )
-          (?= \s|$)
-        """
-
         weather = []
 
         # At first, find all weather strings in the TAF weather group or METAR string.
-        weather_words = re.findall(weather_word_pattern, string, re.VERBOSE)
+        weather_words = grammar.get("weather_word").findall(string)
         for word in weather_words:
-            intensities = []
-            modifiers = []
-            phenomenons = []
-
-            # Find all intensity descriptors...
-            while re.match('(\+|\-|VC|RE)', word):
-                parsed_intensity = re.match('(\+|\-|VC|RE)', word)
-                intensities.append(parsed_intensity.group(0))
-                chars_len = len(intensities[-1])
-                word = word[chars_len:]
-
-            # Find all modifiers...
-            while re.match('(MI|BC|DR|BL|SH|TS|FZ|PR)', word):
-                parsed_modifier = re.match('(MI|BC|DR|BL|SH|TS|FZ|PR)', word)
-                modifiers.append(parsed_modifier.group(0))
-                chars_len = len(modifiers[-1])
-                word = word[chars_len:]
-
-            # Find all phenomenon descriptors...
-            while re.match('(DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|DU|SA|HZ|PY|VA|PO|SQ|FC|SS|DS)', word):
-                parsed_phenomenon = re.match('(DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|DU|SA|HZ|PY|VA|PO|SQ|FC|SS|DS)', word)
-                phenomenons.append(parsed_phenomenon.group(0))
-                chars_len = len(phenomenons[-1])
-                word = word[chars_len:]
-
-            # ...and put all three lists in a dictionary.
-            # There's a dictionary for each weather string found in a TAF weather group or METAR string.
-            group_dict = {'intensity' : intensities, 'modifier' : modifiers, 'phenomenon' : phenomenons}
-            weather.append(group_dict)
+            weather.append(self._parse_weather_word(word))
 
         return(weather)
 
-    def _parse_wind_shear(self, string):
-        wind_shear_pattern = """
-            \s+
-            WS (?P<altitude> \d{3})
-            /
-            (?P<direction> \d{3})
-            (?P<speed> \d{2})
-            (?P<unit> KT|MPS)
+    def _parse_weather_word(self, word):
+        """ Splits a single weather string (e.g. "-SHRA") into its parts
+
+        Returns:
+            Dictionary with intensity, modifier and phenomenon lists
         """
 
-        windshear = re.search(wind_shear_pattern, string, re.VERBOSE)
+        intensities, modifiers, phenomenons = weather_codes.split(word)
+
+        # There's a dictionary for each weather string found in a TAF weather group or METAR string.
+        return({'intensity' : list(intensities), 'modifier' : list(modifiers), 'phenomenon' : list(phenomenons)})
+
+    def _parse_wind_shear(self, string):
+        windshear = grammar.get("wind_shear").search(string)
 
         if windshear:
             return(windshear.groupdict())
@@ -359,9 +509,7 @@ class TAF(object):
             return(None)
 
     def _parse_maintenance(self, string):
-        maintenance_pattern = """ ( \$ ) """
-
-        maintenance = re.search(maintenance_pattern, string, re.VERBOSE)
+        maintenance = grammar.get("maintenance").search(string)
 
         if maintenance:
             return(maintenance.group(0))
@@ -372,17 +520,7 @@ class TAF(object):
     # TODO: Condition of runway(s)
     # TODO: Parse North American METAR codes (RMK)
     def _parse_temperature(self, string):
-        temperature_pattern = """
-            (?<= \s )
-            (?P<air_prefix> M?)
-            (?P<air> \d{2})
-            /
-            (?P<dewpoint_prefix> M?)
-            (?P<dewpoint> \d{2})
-            (?= \s|$)
-        """
-
-        temperature = re.search(temperature_pattern, string, re.VERBOSE)
+        temperature = grammar.get("temperature").search(string)
 
         if temperature:
             return(temperature.groupdict())
@@ -390,15 +528,7 @@ class TAF(object):
             return(None)
 
     def _parse_pressure(self, string):
-        # FIXME: Any other possible values than 'Q' as altimeter setting?
-        pressure_pattern = """
-            (?<= \s )
-            (?P<altimeter_setting> Q)
-            (?P<athm_pressure> \d{4})
-            (?= \s|$)
-        """
-
-        pressure = re.search(pressure_pattern, string, re.VERBOSE)
+        pressure = grammar.get("pressure").search(string)
 
         if pressure:
             return(pressure.groupdict())
@@ -413,14 +543,48 @@ class TAF(object):
         """ Return raw TAF string the object was initialized with """
         return self._raw_taf
 
+    def get_header_span(self):
+        """ Return (start, end) positions of the header in the TAF string """
+        return(self._header_span)
+
     def get_header(self):
         """ Return header dict """
         return(self._taf_header)
 
+    def _parse_lazy(self):
+        """ Parses the groups, if lazy parsing left them unparsed """
+        if self._weather_groups is None:
+            self._weather_groups = self._init_weather_groups()
+
     def get_groups(self):
         """ Return weather groups (initial and FM's) """
+        self._parse_lazy()
         return(self._weather_groups)
 
+    def get_status(self):
+        """ Return result status: STATUS_OK, STATUS_PARTIAL or STATUS_FAILED
+
+        Errors are only recorded with strict=False, strict parsing raises them.
+        """
+        # Lazy parsing may have something left to fail
+        self._parse_lazy()
+        return(self._status)
+
+    def get_error(self):
+        """ Return error message, or None if there was no error """
+        self._parse_lazy()
+        return(self._error)
+
+    def get_error_stage(self):
+        """ Return the parsing stage that failed (one of STAGES), or None """
+        self._parse_lazy()
+        return(self._error_stage)
+
     def get_maintenance(self):
         """ Return station maintenance indicator """
+        if not self._maintenance_parsed:
+            self._maintenance = self._parse_maintenance(self._raw_taf)
+            if self._intern:
+                self._maintenance = codes.intern(self._maintenance)
+            self._maintenance_parsed = True
         return(self._maintenance)
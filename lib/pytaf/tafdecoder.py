@@ -1,59 +1,108 @@
 # -*- coding: utf-8 -*-
 
-import re
+from . import grammar
+from . import weather as weather_codes
 from .taf import TAF
 
+# Decoded weather strings, keyed by decoder class and weather codes
+_WEATHER_TEXT_SIZE = 4096
+_weather_text = {}
+
 class DecodeError(Exception):
     def __init__(self, msg):
         self.strerror = msg
 
 class Decoder(object):
+    # Dicts for translating the weather abbreviations
+    INTENSITIES = weather_codes.INTENSITIES
+    MODIFIERS = weather_codes.MODIFIERS
+    PHENOMENA = weather_codes.PHENOMENA
+
     def __init__(self, taf):
         if isinstance(taf, TAF):
             self._taf = taf
         else:
             raise DecodeError("Argument is not a TAF parser object")
 
+        if taf.get_header() is None:
+            raise DecodeError("Report header could not be parsed")
+
     def decode_taf(self):
-        form = self._taf.get_header()["form"]
+        """ Returns the decoded report text
+
+        Decoding doesn't modify the TAF object. The text is memoized
+        on the TAF object (per decoder class), so decoding the same report
+        again is a lookup. Reports shouldn't be modified after decoding.
+        """
+
+        memo = self._taf._decoded
+        key = self.__class__
+        try:
+            return(memo[key])
+        except KeyError:
+            pass
+
         result = ""
 
         result += self._decode_header(self._taf.get_header()) + "\n"
 
-        for group in self._taf.get_groups():
-            # TAF specific stuff
-            if form == "taf":
-                if group["header"]:
-                    result += self._decode_group_header(group["header"]) + "\n"
+        for index in range(len(self._taf.get_groups())):
+            result += self.decode_group(index)
 
-            # METAR specific stuff
-            if form == "metar":
-                if group["temperature"]:
-                    result += "    Temperature: %s\n" % self._decode_temperature(group["temperature"])
+        if self._taf.get_maintenance():
+            result += self._decode_maintenance(self._taf.get_maintenance())
 
-                if group["pressure"]:
-                    result += "    Pressure: %s\n" % self._decode_pressure(group["pressure"])
+        memo[key] = result
+        return(result)
 
-            # Both TAF and METAR
-            if group["wind"]:
-                result += "    Wind: %s \n" % self._decode_wind(group["wind"])
+    def decode_group(self, index):
+        """ Returns the decoded text of a single weather group, memoized like decode_taf() """
 
-            if group["visibility"]:
-                result += "    Visibility: %s \n" % self._decode_visibility(group["visibility"])
+        memo = self._taf._decoded
+        key = (self.__class__, index)
+        try:
+            return(memo[key])
+        except KeyError:
+            pass
 
-            if group["clouds"]:
-                result += "    Sky conditions: %s \n" % self._decode_clouds(group["clouds"])
+        result = self._decode_group(self._taf.get_groups()[index], self._taf.get_header()["form"])
 
-            if group["weather"]:
-                result += "    Weather: %s \n" % self._decode_weather(group["weather"])
+        memo[key] = result
+        return(result)
 
-            if group["windshear"]:
-                result += "    Windshear: %s\n" % self._decode_windshear(group["windshear"])
+    def _decode_group(self, group, form):
+        result = ""
 
-            result += " \n"
+        # TAF specific stuff
+        if form == "taf":
+            if group["header"]:
+                result += self._decode_group_header(group["header"]) + "\n"
 
-        if self._taf.get_maintenance():
-            result += self._decode_maintenance(self._taf.get_maintenance())
+        # METAR specific stuff
+        if form == "metar":
+            if group["temperature"]:
+                result += "    Temperature: %s\n" % self._decode_temperature(group["temperature"])
+
+            if group["pressure"]:
+                result += "    Pressure: %s\n" % self._decode_pressure(group["pressure"])
+
+        # Both TAF and METAR
+        if group["wind"]:
+            result += "    Wind: %s \n" % self._decode_wind(group["wind"])
+
+        if group["visibility"]:
+            result += "    Visibility: %s \n" % self._decode_visibility(group["visibility"])
+
+        if group["clouds"]:
+            result += "    Sky conditions: %s \n" % self._decode_clouds(group["clouds"])
+
+        if group["weather"]:
+            result += "    Weather: %s \n" % self._decode_weather(group["weather"])
+
+        if group["windshear"]:
+            result += "    Windshear: %s\n" % self._decode_windshear(group["windshear"])
+
+        result += " \n"
 
         return(result)
 
@@ -61,7 +110,7 @@ class Decoder(object):
         result = ""
 
         # Ensure it's side effect free
-        _header = header
+        _header = dict(header)
 
         if _header["form"] == 'taf':
             # Decode TAF header
@@ -104,7 +153,7 @@ class Decoder(object):
 
     def _decode_group_header(self, header):
         result = ""
-        _header = header
+        _header = dict(header)
 
         from_str = "From %(from_hours)s:%(from_minutes)s on the %(from_date)s: "
         prob_str = "Probability %(probability)s%% of the following between %(from_hours)s:00 on the %(from_date)s and %(till_hours)s:00 on the %(till_date)s: "
@@ -236,7 +285,7 @@ class Decoder(object):
             result = "%s %s clouds at %d feet" % (layer_type, type, int(layer["ceiling"])*100)
 
             # Remove extra whitespace, if any
-            result = re.sub(r'\s+', ' ', result)
+            result = grammar.get("whitespace").sub(' ', result)
 
             list.append(result)
 
@@ -248,127 +297,95 @@ class Decoder(object):
         return(result)
 
     def _decode_weather(self, weather):
-        # Dicts for translating the abbreviations
-        dict_intensities = {
-            "-" : "light",
-            "+" : "heavy",
-            "VC" : "in the vicinity",
-            "RE" : "recent"
-        }
-
-        dict_modifiers = {
-            "MI" : "shallow",
-            "BC" : "patchy",
-            "DR" : "low drifting",
-            "BL" : "blowing",
-            "SH" : "showers",
-            "TS" : "thunderstorms",
-            "FZ" : "freezing",
-            "PR" : "partial"
-        }
-
-        dict_phenomenons = {
-            "DZ" : "drizzle",
-            "RA" : "rain",
-            "SN" : "snow",
-            "SG" : "snow grains",
-            "IC" : "ice",
-            "PL" : "ice pellets",
-            "GR" : "hail",
-            "GS" : "small snow/hail pellets",
-            "UP" : "unknown precipitation",
-            "BR" : "mist",
-            "FG" : "fog",
-            "FU" : "smoke",
-            "DU" : "dust",
-            "SA" : "sand",
-            "HZ" : "haze",
-            "PY" : "spray",
-            "VA" : "volcanic ash",
-            "PO" : "dust/sand whirl",
-            "SQ" : "squall",
-            "FC" : "funnel cloud",
-            "SS" : "sand storm",
-            "DS" : "dust storm",
-        }
-
         weather_txt_blocks = []
 
-        # Check for special cases first. If a certain combination is found
-        # then skip parsing the whole weather string and return a defined string
-        # immediately
         for group in weather:
-            # +FC = Tornado or Waterspout
-            if "+" in group["intensity"] and "FC" in group["phenomenon"]:
-                weather_txt_blocks.append("tornado or waterspout")
-                continue
-
-            # Sort the elements of the weather string, if no special combi-
-            # nation is found.
-            intensities_pre = []
-            intensities_post = []
-            if "RE" in group["intensity"]:
-                intensities_pre.append("RE")
-                group["intensity"].remove("RE")
-            for intensity in group["intensity"]:
-                if intensity != "VC":
-                    intensities_pre.append(intensity)
-                else:
-                    intensities_post.append(intensity)
-
-            modifiers_pre = []
-            modifiers_post = []
-            for modifier in group["modifier"]:
-                if modifier != "TS" and modifier != "SH":
-                    modifiers_pre.append(modifier)
-                else:
-                    modifiers_post.append(modifier)
-
-            phenomenons_pre = []
-            phenomenons_post = []
-            for phenomenon in group["phenomenon"]:
-                if phenomenon != "UP":
-                    phenomenons_pre.append(phenomenon)
-                else:
-                    phenomenons_post.append(phenomenon)
-
-            # Build the human readable text from the single weather string
-            # and append it to a list containing all the interpreted text
-            # blocks from a TAF group
-            weather_txt = ""
-            for intensity in intensities_pre:
-                weather_txt += dict_intensities[intensity] + " "
-
-            for modifier in modifiers_pre:
-                weather_txt += dict_modifiers[modifier] + " "
-
-            phenomenons = phenomenons_pre + phenomenons_post
-            cnt = len(phenomenons)
-            for phenomenon in phenomenons:
-                weather_txt += dict_phenomenons[phenomenon]
-                if cnt > 2:
-                    weather_txt += ", "
-                if cnt == 2:
-                    weather_txt += " and "
-                cnt = cnt-1
-            weather_txt += " "
-
-            for modifier in modifiers_post:
-                weather_txt += dict_modifiers[modifier] + " "
-
-            for intensity in intensities_post:
-                weather_txt += dict_intensities[intensity] + " "
-
-            weather_txt_blocks.append(weather_txt.strip())
+            key = (self.__class__, tuple(group["intensity"]), tuple(group["modifier"]), tuple(group["phenomenon"]))
+            try:
+                weather_txt = _weather_text[key]
+            except KeyError:
+                weather_txt = self._decode_weather_word(key[1], key[2], key[3])
+                if len(_weather_text) >= _WEATHER_TEXT_SIZE:
+                    _weather_text.clear()
+                _weather_text[key] = weather_txt
+
+            weather_txt_blocks.append(weather_txt)
 
         # Put all the human readable stuff together and return the final
         # output as a string.
-        weather_txt_full = ""
-        for block in weather_txt_blocks[:-1]:
-            weather_txt_full += block + " / "
-        weather_txt_full += weather_txt_blocks[-1]
+        return(" / ".join(weather_txt_blocks))
+
+    def _decode_weather_word(self, intensities, modifiers, phenomenons):
+        """ Decodes a single weather string from its intensity, modifier and phenomenon codes
+
+        Results are memoized per decoder class, so this method
+        must only depend on its arguments.
+        """
+
+        # Check for special cases first. If a certain combination is found
+        # then skip parsing the whole weather string and return a defined string
+        # immediately
+
+        # +FC = Tornado or Waterspout
+        if "+" in intensities and "FC" in phenomenons:
+            return("tornado or waterspout")
+
+        # Sort the elements of the weather string, if no special combi-
+        # nation is found.
+        intensities = list(intensities)
+        intensities_pre = []
+        intensities_post = []
+        if "RE" in intensities:
+            intensities_pre.append("RE")
+            intensities.remove("RE")
+        for intensity in intensities:
+            if intensity != "VC":
+                intensities_pre.append(intensity)
+            else:
+                intensities_post.append(intensity)
+
+        modifiers_pre = []
+        modifiers_post = []
+        for modifier in modifiers:
+            if modifier != "TS" and modifier != "SH":
+                modifiers_pre.append(modifier)
+            else:
+                modifiers_post.append(modifier)
+
+        phenomenons_pre = []
+        phenomenons_post = []
+        for phenomenon in phenomenons:
+            if phenomenon != "UP":
+                phenomenons_pre.append(phenomenon)
+            else:
+                phenomenons_post.append(phenomenon)
+
+        # Build the human readable text from the single weather string
+        weather_txt = ""
+        for intensity in intensities_pre:
+            weather_txt += self.INTENSITIES[intensity] + " "
+
+        for modifier in modifiers_pre:
+            weather_txt += self.MODIFIERS[modifier] + " "
+
+        phenomenons = phenomenons_pre + phenomenons_post
+        cnt = len(phenomenons)
+        for phenomenon in phenomenons:
+            weather_txt += self.PHENOMENA[phenomenon]
+            if cnt > 2:
+                weather_txt += ", "
+            if cnt == 2:
+                weather_txt += " and "
+            cnt = cnt-1
+        weather_txt += " "
+
+        for modifier in modifiers_post:
+            weather_txt += self.MODIFIERS[modifier] + " "
+
+        for intensity in intensities_post:
+            weather_txt += self.INTENSITIES[intensity] + " "
 
-        return(weather_txt_full)
+        return(weather_txt.strip())
 
     def _decode_temperature(self, temperature, unit='C'):
         if temperature["air_prefix"] == 'M':
@@ -411,13 +428,13 @@ class Decoder(object):
 
         suffix = ""
 
-        if re.match(".*(1[12]|[04-9])$", _date):
+        if grammar.get("ordinal_th").match(_date):
             suffix = "th"
-        elif re.match(".*1$", _date):
+        elif grammar.get("ordinal_st").match(_date):
             suffix = "st"
-        elif re.match(".*2$", _date):
+        elif grammar.get("ordinal_nd").match(_date):
             suffix = "nd"
-        elif re.match(".*3$", _date):
+        elif grammar.get("ordinal_rd").match(_date):
             suffix = "rd"
 
         return(suffix)
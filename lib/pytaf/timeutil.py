@@ -0,0 +1,63 @@
+""" Report times
+
+Reports only give the day of month and time of day, so the month
+and year have to be guessed from a reference time, usually the time
+the report was received. The month that puts the report time closest
+to the reference is chosen, which is right for any report
+issued or valid within about two weeks of the reference time.
+"""
+
+import time
+import calendar
+
+
+def _int(value):
+    try:
+        return(int(value))
+    except (TypeError, ValueError):
+        return(None)
+
+
+def resolve_time(day, hours, minutes=0, reference=None):
+    """ Turns a day of month and time into a POSIX timestamp
+
+    Args:
+        day: Day of month, int or string ("29")
+        hours: Hours, int or string. "24" is the end of the day.
+        minutes: Minutes, int or string
+        reference: POSIX timestamp close to the resulting time, now if not given
+
+    Returns:
+        POSIX timestamp (int), or None if the day or hours are missing or invalid
+    """
+
+    day = _int(day)
+    hours = _int(hours)
+    minutes = _int(minutes) or 0
+
+    if day is None or hours is None or not 1 <= day <= 31 or not 0 <= hours <= 24:
+        return(None)
+
+    if reference is None:
+        reference = time.time()
+
+    year, month = time.gmtime(reference)[:2]
+    offset = hours * 3600 + minutes * 60
+
+    best = None
+    for delta in (-1, 0, 1):
+        candidate_year = year
+        candidate_month = month + delta
+        if candidate_month < 1:
+            candidate_year, candidate_month = year - 1, 12
+        elif candidate_month > 12:
+            candidate_year, candidate_month = year + 1, 1
+
+        if day > calendar.monthrange(candidate_year, candidate_month)[1]:
+            continue
+
+        timestamp = calendar.timegm((candidate_year, candidate_month, day, 0, 0, 0)) + offset
+        if best is None or abs(timestamp - reference) < abs(best - reference):
+            best = timestamp
+
+    return(best)
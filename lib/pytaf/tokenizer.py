@@ -0,0 +1,349 @@
+""" Single-pass weather group parser (the "tokens" engine)
+
+The default TAF parser runs a separate regex search over the group
+string for every field. This engine splits the group into
+whitespace-separated tokens once, and classifies every token
+by its shape in one linear pass.
+
+Reports are made of a rather small vocabulary of tokens ("P6SM", "-RA",
+"BKN050" and so on), so token classifications are memoized,
+and most tokens cost a single dict lookup.
+
+It produces the same group dicts as the regex engine. Its token patterns
+are derived from the default field patterns, so when any of those is
+overridden (see pytaf.grammar), groups are parsed by the regex engine instead.
+
+This module also splits TAFs into weather groups, for both engines.
+"""
+
+import re
+
+from . import grammar
+from . import weather as weather_codes
+
+# Token kinds
+WIND = 1
+VISIBILITY = 2
+VISIBILITY_METERS = 3
+CLOUDS = 4
+VERTICAL_VISIBILITY = 5
+WEATHER = 6
+WIND_SHEAR = 7
+TEMPERATURE = 8
+PRESSURE = 9
+
+# Patterns of the regex engine that the token patterns stand for
+FIELD_PATTERNS = ("fm_group_header", "ptb_group_header", "wind", "visibility", "visibility_meters",
+                  "clouds", "clouds_clear", "clouds_obscured", "vertical_visibility", "weather_word",
+                  "wind_shear", "temperature", "pressure")
+
+_CLOUD_LAYERS = ("BKN", "SCT", "FEW", "OVC")
+_WIND_UNITS = ("KT", "MPS")
+
+# Tokens that may start a group, see _is_group_start()
+_GROUP_KEYWORD = re.compile(r"(?<!\S)(?:FM|PROB|TEMPO|BECMG)\S*")
+
+# Memoized token classifications: (kind, value, markers) by token.
+# Winds and times make for many tokens that are seen once or twice,
+# so when the cache fills up it is set aside as the old cache and a new one
+# is started, and tokens still in use move over from the old one.
+# Both are cleared when the grammar changes.
+_CACHE_SIZE = 8192
+_cache = {}
+_old_cache = {}
+_cache_generation = None
+
+# Grammar generation -> whether no field pattern is overridden
+_defaults = (None, True)
+
+
+def supports_grammar():
+    """ Tells if the token patterns still stand for the field patterns,
+        that is, none of FIELD_PATTERNS is overridden
+    """
+
+    global _defaults
+
+    generation, supported = _defaults
+    if generation != grammar.generation():
+        supported = all(grammar.is_default(name) for name in FIELD_PATTERNS)
+        _defaults = (grammar.generation(), supported)
+    return(supported)
+
+
+def classify(token):
+    """ Classifies a single token
+
+    Args:
+        token: Non-empty string without whitespace
+
+    Returns:
+        (kind, value) tuple, where value is a dict of match groups
+        (or an (intensity, modifier, phenomenon) tuple for weather),
+        or (None, None) for tokens that carry no group data
+    """
+
+    match = None
+    kind = None
+
+    if token.endswith(_WIND_UNITS):
+        if token.startswith("WS"):
+            match = grammar.get("wind_shear_token").match(token)
+            kind = WIND_SHEAR
+        else:
+            match = grammar.get("wind_token").match(token)
+            kind = WIND
+    elif token.endswith("SM"):
+        match = grammar.get("visibility_token").match(token)
+        kind = VISIBILITY
+    elif token[:3] in _CLOUD_LAYERS:
+        match = grammar.get("clouds_token").match(token)
+        kind = CLOUDS
+    elif token.startswith("VV"):
+        match = grammar.get("vertical_visibility_token").match(token)
+        kind = VERTICAL_VISIBILITY
+    elif token.startswith("WS"):
+        match = grammar.get("wind_shear_token").match(token)
+        kind = WIND_SHEAR
+    elif token.isdigit():
+        match = grammar.get("visibility_meters_token").match(token)
+        kind = VISIBILITY_METERS
+    elif "/" in token:
+        match = grammar.get("temperature_token").match(token)
+        kind = TEMPERATURE
+    elif token[0] == "Q":
+        match = grammar.get("pressure_token").match(token)
+        kind = PRESSURE
+    elif grammar.get("weather_word_token").match(token):
+        return((WEATHER, weather_codes.split(token)))
+
+    if match:
+        return((kind, match.groupdict()))
+    else:
+        return((None, None))
+
+
+def markers(token):
+    """ Finds codes that the regex engine looks for anywhere in a group,
+        not just in whole tokens: clear and obscured sky, and group headers
+
+    Returns:
+        None if there are none, or a (clear, obscured, fm, ptb) tuple:
+        the clear sky code (e.g. "CAVOK") and obscured sky code found in the token
+        or None, and whether it may be a part of an FM or PROB/TEMPO/BECMG header
+    """
+
+    # Tokens are only classified with the default patterns, and every
+    # clear sky code has a C in it
+    clear = grammar.get("clouds_clear").search(token) if "C" in token else None
+    obscured = grammar.get("clouds_obscured").search(token) if "VV" in token else None
+    fm = "FM" in token
+    ptb = "PROB" in token or "TEMPO" in token or "BECMG" in token
+
+    if clear is None and obscured is None and not fm and not ptb:
+        return(None)
+    return((clear.group(0) if clear else None, obscured.group(0) if obscured else None, fm, ptb))
+
+
+def _classify_new(token):
+    """ Classifies a token that is not in the cache, and caches it """
+
+    global _cache, _old_cache
+
+    entry = _old_cache.get(token)
+    if entry is None:
+        kind, value = classify(token)
+        entry = (kind, value, markers(token))
+
+    if len(_cache) >= _CACHE_SIZE:
+        _old_cache = _cache
+        _cache = {}
+    _cache[token] = entry
+    return(entry)
+
+
+def parse_group(taf, string):
+    """ Parses a weather group (or a whole METAR) in one pass over its tokens
+
+    Args:
+        taf: TAF object the group belongs to
+        string: Group string
+
+    Returns:
+        Group dictionary, same as TAF._parse_group() produces
+    """
+
+    global _cache_generation
+
+    if _cache_generation != grammar.generation():
+        _cache.clear()
+        _old_cache.clear()
+        _cache_generation = grammar.generation()
+
+    form = taf._taf_header['form']
+
+    wind = None
+    visibility_sm = None
+    visibility_meters = None
+    layers = []
+    vertical_visibility = None
+    weather = []
+    windshear = None
+    temperature = None
+    pressure = None
+    clear = None
+    obscured = None
+    fm_start = None
+    ptb_start = None
+
+    tokens = string.split()
+
+    # Field patterns only match after whitespace, so the first token
+    # only counts if the string starts with whitespace
+    if string[:1].isspace():
+        start = 0
+    else:
+        start = 1
+
+    cached = _cache.get
+    for i, token in enumerate(tokens):
+        kind, value, marks = cached(token) or _classify_new(token)
+
+        if marks is not None:
+            if clear is None:
+                clear = marks[0]
+            if obscured is None:
+                obscured = marks[1]
+            # Headers can't start before the first token that may hold them,
+            # the first occurrence of the token is no later than that
+            if fm_start is None and marks[2]:
+                fm_start = string.find(token)
+            if ptb_start is None and marks[3]:
+                ptb_start = string.find(token)
+
+        if kind is None or i < start:
+            continue
+        elif kind == WEATHER:
+            weather.append({'intensity': list(value[0]), 'modifier': list(value[1]), 'phenomenon': list(value[2])})
+        elif kind == CLOUDS:
+            layers.append(dict(value))
+        elif kind == WIND:
+            if wind is None:
+                wind = dict(value)
+        elif kind == VISIBILITY:
+            if visibility_sm is None:
+                visibility_sm = dict(value)
+                # "1 1/2SM" spans two tokens, let the regex engine sort out
+                # the exact whitespace between them
+                if (i > start and value["more"] is None and "/" in value["range"]
+                        and grammar.get("visibility_whole_token").match(tokens[i - 1])):
+                    visibility_sm = grammar.get("visibility").search(string).groupdict()
+        elif kind == VISIBILITY_METERS:
+            if visibility_meters is None:
+                visibility_meters = value["range"]
+        elif kind == VERTICAL_VISIBILITY:
+            if vertical_visibility is None:
+                vertical_visibility = value["vertical_visibility"]
+        elif kind == WIND_SHEAR:
+            if windshear is None:
+                windshear = dict(value)
+        elif kind == TEMPERATURE:
+            if temperature is None and form == "metar":
+                temperature = dict(value)
+        elif kind == PRESSURE:
+            if pressure is None and form == "metar":
+                pressure = dict(value)
+
+    group = {}
+
+    if form == "taf":
+        group["header"] = taf._parse_group_header(string, fm_start, ptb_start)
+
+    if form == "metar":
+        group["temperature"] = temperature
+        group["pressure"] = pressure
+
+    group["wind"] = wind
+
+    visibility = {}
+    if visibility_sm:
+        visibility = visibility_sm
+    if visibility_meters:
+        visibility["range"] = visibility_meters
+        # 9999 in fact means "more than 10 km"
+        if visibility_meters == "9999":
+            visibility["more"] = True
+            visibility["range"] = "10 000"
+        visibility["unit"] = "M"
+    group["visibility"] = visibility
+
+    # Special cases are not bound to token boundaries in the regex engine,
+    # but they can't span whitespace, so the first token that has them has the first one
+    if clear is not None:
+        group["clouds"] = [{"layer": clear}]
+    elif obscured is not None:
+        group["clouds"] = [{"layer": obscured}]
+    else:
+        group["clouds"] = layers
+
+    group["vertical_visibility"] = vertical_visibility
+    group["weather"] = weather
+    group["windshear"] = windshear
+
+    return(group)
+
+
+def _is_group_start(token, previous):
+    if token.startswith("FM"):
+        return(token[2:3].isdigit())
+    elif token.startswith("PROB"):
+        return(token[4:5].isdigit())
+    elif token.startswith("TEMPO"):
+        # PROB30 TEMPO is a single group
+        return(not (previous is not None and previous.startswith("PROB") and
+                    previous[4:].isdigit() and len(previous) <= 6))
+    elif token.startswith("BECMG"):
+        return(True)
+    else:
+        return(False)
+
+
+def split_groups(string):
+    """ Splits a TAF into weather group strings in a single pass over its tokens
+
+    A group starts at every FMddhhmm, PROBnn, TEMPO or BECMG token
+    (except TEMPO right after PROBnn). The first group starts with the header.
+    Whitespace after a group belongs to the group.
+
+    Groups are the same as the ones the taf_group pattern finds, except
+    for reports that end with the "=" terminator of WMO bulletins: the pattern
+    silently dropped their last group, here it's kept, terminator included.
+    Fields followed by the terminator (e.g. "BKN020=") are not recognized
+    in that group, so terminators are best stripped first,
+    as pytaf.read_bulletins() does.
+
+    Args:
+        string: TAF report string
+
+    Returns:
+        List of group strings
+    """
+
+    # Only the tokens that may start a group are looked at. A TEMPO
+    # depends on the token right before it, which is only a PROBnn
+    # if it is the previous keyword token, with nothing but whitespace between them.
+    starts = [0]
+    previous = None
+    previous_end = 0
+    for match in _GROUP_KEYWORD.finditer(string):
+        token = match.group(0)
+        start = match.start()
+        if previous is not None and not string[previous_end:start].isspace():
+            previous = None
+        if start > 0 and _is_group_start(token, previous):
+            starts.append(start)
+        previous = token
+        previous_end = match.end()
+    starts.append(len(string))
+
+    return([string[starts[i]:starts[i + 1]] for i in range(len(starts) - 1)])
@@ -0,0 +1,124 @@
+""" Numeric values from parsed report fields """
+
+METERS_PER_STATUTE_MILE = 1609.344
+KNOTS_PER_MPS = 1.943844
+
+# Cloud layers that constitute a ceiling
+CEILING_LAYERS = ("BKN", "OVC")
+
+# Visibility for CAVOK ("ceiling and visibility OK"): 10 km or more
+CAVOK_VISIBILITY = 10000.0
+
+# Visibility strings repeat a lot ("P6SM", "9999"), so conversions are memoized
+_VISIBILITY_CACHE_SIZE = 1024
+_visibility_cache = {}
+
+
+def visibility_meters(visibility, clouds=None):
+    """ Converts a visibility dict to meters
+
+    Args:
+        visibility: Visibility dict from a parsed group, e.g.
+                    {"more": None, "range": "1 1/2", "unit": "SM"}
+        clouds: List of cloud layer dicts from the same group. CAVOK
+                stands in for the visibility, if it's not reported otherwise.
+
+    Returns:
+        Visibility in meters (float), or None if not reported or not understood.
+        "More than" values (P6SM, 9999, CAVOK) are returned as their lower bound.
+    """
+
+    if not visibility:
+        for layer in clouds or []:
+            if layer["layer"] == "CAVOK":
+                return(CAVOK_VISIBILITY)
+        return(None)
+
+    key = (visibility.get("range"), visibility.get("unit"))
+    try:
+        return(_visibility_cache[key])
+    except KeyError:
+        pass
+
+    meters = _parse_visibility(key[0], key[1])
+
+    if len(_visibility_cache) >= _VISIBILITY_CACHE_SIZE:
+        _visibility_cache.clear()
+    _visibility_cache[key] = meters
+
+    return(meters)
+
+
+def _parse_visibility(distance, unit):
+    if not distance:
+        return(None)
+
+    try:
+        if unit == "M":
+            # "10 000" is what 9999 is turned into
+            return(float(distance.replace(" ", "")))
+        elif unit == "SM":
+            # "6", "1/2" or "1 1/2"
+            miles = 0.0
+            for part in distance.split():
+                if "/" in part:
+                    numerator, denominator = part.split("/")
+                    miles += float(numerator) / float(denominator)
+                else:
+                    miles += float(part)
+            return(miles * METERS_PER_STATUTE_MILE)
+    except (ValueError, ZeroDivisionError):
+        pass
+
+    return(None)
+
+
+def ceiling_feet(clouds, vertical_visibility=None):
+    """ Finds the ceiling: the lowest broken or overcast layer, or vertical visibility
+
+    Args:
+        clouds: List of cloud layer dicts from a parsed group
+        vertical_visibility: Vertical visibility string from a parsed group ("002")
+
+    Returns:
+        Ceiling in feet (int), 0 for obscured sky with unknown vertical
+        visibility (VV///), or None if there is no ceiling
+    """
+
+    ceiling = None
+
+    if vertical_visibility:
+        try:
+            ceiling = int(vertical_visibility) * 100
+        except ValueError:
+            pass
+
+    for layer in clouds or []:
+        if layer["layer"] == "VV///":
+            return(0)
+
+        if layer["layer"] in CEILING_LAYERS:
+            try:
+                height = int(layer["ceiling"]) * 100
+            except (KeyError, TypeError, ValueError):
+                continue
+            if ceiling is None or height < ceiling:
+                ceiling = height
+
+    return(ceiling)
+
+
+def speed_knots(speed, unit):
+    """ Converts a wind speed string in KT or MPS to knots (float), or None """
+    if speed is None:
+        return(None)
+
+    try:
+        value = float(speed)
+    except ValueError:
+        return(None)
+
+    if unit == "MPS":
+        return(value * KNOTS_PER_MPS)
+    else:
+        return(value)
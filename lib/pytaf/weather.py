@@ -0,0 +1,163 @@
+""" Weather word splitting
+
+A weather word such as "-SHRA" or "+TSRAGR" is made of intensity
+descriptors, modifiers and phenomena, in that order. The codes
+are fixed strings, so words are split by table lookups rather than
+regular expressions, and split results are memoized: weather
+words repeat a lot, and most of them are split only once.
+"""
+
+from . import grammar
+
+# Codes and their plain English meaning
+INTENSITIES = {
+    "-": "light",
+    "+": "heavy",
+    "VC": "in the vicinity",
+    "RE": "recent"
+}
+
+MODIFIERS = {
+    "MI": "shallow",
+    "BC": "patchy",
+    "DR": "low drifting",
+    "BL": "blowing",
+    "SH": "showers",
+    "TS": "thunderstorms",
+    "FZ": "freezing",
+    "PR": "partial"
+}
+
+PHENOMENA = {
+    "DZ": "drizzle",
+    "RA": "rain",
+    "SN": "snow",
+    "SG": "snow grains",
+    "IC": "ice",
+    "PL": "ice pellets",
+    "GR": "hail",
+    "GS": "small snow/hail pellets",
+    "UP": "unknown precipitation",
+    "BR": "mist",
+    "FG": "fog",
+    "FU": "smoke",
+    "DU": "dust",
+    "SA": "sand",
+    "HZ": "haze",
+    "PY": "spray",
+    "VA": "volcanic ash",
+    "PO": "dust/sand whirl",
+    "SQ": "squall",
+    "FC": "funnel cloud",
+    "SS": "sand storm",
+    "DS": "dust storm",
+}
+
+# Patterns the table-driven splitter stands for. If any of them
+# is overridden, words are split with the patterns instead.
+_PATTERNS = ("weather_intensity", "weather_modifier", "weather_phenomenon")
+
+# Word -> (intensities, modifiers, phenomena) tuples. Pre-filled with
+# every word of at most one descriptor of each kind, extended with
+# other words as they are seen, and cleared when it grows too big.
+_TABLE_SIZE = 8192
+_table = {}
+_table_generation = None
+
+
+def _prefill():
+    for intensity in [""] + list(INTENSITIES):
+        for modifier in [""] + list(MODIFIERS):
+            for phenomenon in [""] + list(PHENOMENA):
+                word = intensity + modifier + phenomenon
+                if word:
+                    _table[word] = _split_codes(word)
+
+
+def _split_codes(word):
+    """ Splits a word the same way the weather_* patterns do,
+        ignoring anything that follows the last recognized code
+    """
+
+    length = len(word)
+    i = 0
+
+    intensities = []
+    while i < length:
+        if word[i] in "+-":
+            code = word[i]
+        else:
+            code = word[i:i + 2]
+            if code not in INTENSITIES:
+                break
+        intensities.append(code)
+        i += len(code)
+
+    modifiers = []
+    while word[i:i + 2] in MODIFIERS:
+        modifiers.append(word[i:i + 2])
+        i += 2
+
+    phenomena = []
+    while word[i:i + 2] in PHENOMENA:
+        phenomena.append(word[i:i + 2])
+        i += 2
+
+    return((tuple(intensities), tuple(modifiers), tuple(phenomena)))
+
+
+def _split_regex(word):
+    """ Splits a word with the (possibly overridden) weather_* patterns """
+
+    parts = []
+    for name in _PATTERNS:
+        pattern = grammar.get(name)
+        codes = []
+        match = pattern.match(word)
+        while match:
+            codes.append(match.group(0))
+            word = word[len(codes[-1]):]
+            match = pattern.match(word)
+        parts.append(tuple(codes))
+
+    return(tuple(parts))
+
+
+def _default_patterns():
+    for name in _PATTERNS:
+        if not grammar.is_default(name):
+            return(False)
+    return(True)
+
+
+def split(word):
+    """ Splits a weather word into its parts
+
+    Args:
+        word: Weather string, e.g. "-SHRA"
+
+    Returns:
+        (intensities, modifiers, phenomena) tuple of tuples of codes,
+        e.g. (("-",), ("SH",), ("RA",))
+    """
+
+    global _table_generation
+
+    if _table_generation != grammar.generation() or len(_table) > _TABLE_SIZE:
+        _table.clear()
+        _table_generation = grammar.generation()
+        if _default_patterns():
+            _prefill()
+
+    try:
+        return(_table[word])
+    except KeyError:
+        pass
+
+    if _default_patterns():
+        parts = _split_codes(word)
+    else:
+        parts = _split_regex(word)
+
+    _table[word] = parts
+    return(parts)
@@ -11,13 +11,16 @@ setup(name='pytaf',
       package_dir={'': 'lib'},
       packages=['pytaf'],
       zip_safe=True,
+      python_requires='>=3.6',
+      entry_points={
+          'console_scripts': ['pytaf = pytaf.cli:main']
+      },
       classifiers = [
                         "Development Status :: 5 - Production/Stable",
                         "License :: OSI Approved :: MIT License",
                         "Operating System :: OS Independent",
-                        "Programming Language :: Python :: 2.6",
-                        "Programming Language :: Python :: 2.7",
                         "Programming Language :: Python :: 3",
+                        "Programming Language :: Python :: 3 :: Only",
                         "Topic :: Scientific/Engineering"
                     ],
       keywords="aviation weather meteorology taf metar"
@@ -0,0 +1,14 @@
+""" pytaf tests
+
+Run from the source tree with either of:
+
+    python -m unittest
+    python -m pytest tests
+
+The pytaf package from the source tree (lib/) is tested, not an installed one.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib"))
@@ -0,0 +1,196 @@
+""" Parsing reports from an asyncio stream, over a real TCP connection """
+
+import asyncio
+import unittest
+import concurrent.futures
+
+import pytaf
+from pytaf import bulletin
+
+try:
+    import pytaf.aio
+except SyntaxError:
+    # async generators need Python 3.6
+    aio = None
+else:
+    aio = pytaf.aio
+
+BULLETIN = (b"\x01\r\r\n123\r\r\nFTUS80 KWBC 291200\r\r\nTAF\r\r\n"
+            b"KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001\r\r\n"
+            b"     TEMPO 2914/2915 1SM -BR CLR=\r\r\n"
+            b"KBOS 291130Z 2912/3018 18005KT P6SM SKC=\r\r\n"
+            b"TAF EGLL 291100Z 2912/3018 24015G25KT CAVOK\r\r\n"
+            b"     BECMG 3003/3006 30008KT 9999 NSC=\r\r\n\x03")
+
+STATIONS = ["KDEN", "KBOS", "EGLL"]
+
+
+@unittest.skipIf(aio is None, "pytaf.aio needs Python 3.6")
+class TestParseStream(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def serve(self, data, piece=7, **options):
+        """ Sends data to a server on a local port in pieces of the given size,
+            and returns what the server parsed out of it
+        """
+
+        results = []
+
+        async def handle(reader, writer):
+            async for taf in aio.parse_stream(reader, executor=self.executor, **options):
+                results.append(taf)
+            writer.close()
+
+        async def send():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for start in range(0, len(data), piece):
+                writer.write(data[start:start + piece])
+                await writer.drain()
+            writer.write_eof()
+            # The server closes the connection when it's done
+            await reader.read()
+            writer.close()
+
+            server.close()
+            await server.wait_closed()
+
+        self.loop.run_until_complete(asyncio.wait_for(send(), 30))
+        return(results)
+
+    def test_reports(self):
+        for piece in (1, 7, 64, len(BULLETIN)):
+            results = self.serve(BULLETIN, piece=piece, blocksize=16)
+            self.assertEqual([taf.get_header()["icao_code"] for taf in results], STATIONS)
+            self.assertEqual(len(results[0].get_groups()), 2)
+
+    def test_order(self):
+        results = self.serve(BULLETIN * 20, piece=100, chunksize=1, queue_size=2)
+        self.assertEqual([taf.get_header()["icao_code"] for taf in results], STATIONS * 20)
+
+    def test_missing_terminator(self):
+        results = self.serve(b"KBOS 291130Z 2912/3018 18005KT P6SM SKC\r\n")
+        self.assertEqual([taf.get_header()["icao_code"] for taf in results], ["KBOS"])
+
+    def test_errors(self):
+        data = b"KBOS 291130Z 2912/3018 18005KT P6SM SKC= NOT A REPORT= " + BULLETIN
+
+        results = self.serve(data, errors="yield")
+        self.assertEqual(len(results), 5)
+        self.assertIsInstance(results[1], pytaf.ParseFailure)
+        self.assertEqual(results[1].index, 1)
+
+        results = self.serve(data, errors="skip")
+        self.assertEqual([taf.get_header()["icao_code"] for taf in results], ["KBOS"] + STATIONS)
+
+    def test_unterminated_junk(self):
+        # Junk without terminators is passed on in pieces, not buffered
+        # to the end of the stream
+        junk = b"ZZZZ " * (bulletin.MAX_PENDING * 3 // 5)
+        results = self.serve(junk + b"=" + BULLETIN, piece=4096, blocksize=4096, errors="yield")
+        failures = [result for result in results if isinstance(result, pytaf.ParseFailure)]
+        self.assertGreaterEqual(len(failures), 2)
+        self.assertEqual(failures[0].stage, "input")
+        self.assertEqual([taf.get_header()["icao_code"] for taf in results[len(failures):]], STATIONS)
+
+    def test_queue_size(self):
+        # All reports arrive in one block, yet no more than queue_size
+        # chunks may be in flight
+        executor = CountingExecutor(max_workers=2)
+        in_flight = []
+
+        async def consume(reader):
+            yielded = 0
+            async for taf in aio.parse_stream(reader, executor=executor, chunksize=1, queue_size=3):
+                in_flight.append(executor.submitted - yielded)
+                yielded += 1
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"KBOS 291130Z 2912/3018 18005KT P6SM SKC=" * 200)
+        reader.feed_eof()
+        try:
+            self.loop.run_until_complete(asyncio.wait_for(consume(reader), 30))
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(len(in_flight), 200)
+        self.assertEqual(executor.submitted, 200)
+        self.assertLessEqual(max(in_flight), 3)
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return(super(CountingExecutor, self).submit(*args, **kwargs))
+
+
+@unittest.skipIf(aio is None, "pytaf.aio needs Python 3.6")
+class TestSharedExecutor(unittest.TestCase):
+    def setUp(self):
+        aio.shutdown()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        aio.shutdown()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_shared(self):
+        async def parse(data):
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return([taf async for taf in aio.parse_stream(reader, concurrency=2)])
+
+        async def parse_all():
+            return(await asyncio.gather(*[parse(BULLETIN) for _ in range(5)]))
+
+        results = self.loop.run_until_complete(asyncio.wait_for(parse_all(), 60))
+        for tafs in results:
+            self.assertEqual([taf.get_header()["icao_code"] for taf in tafs], STATIONS)
+
+        executor = aio.get_executor()
+        self.assertIs(aio.get_executor(2), executor)
+        with self.assertRaises(ValueError):
+            aio.get_executor(3)
+
+        aio.shutdown()
+        self.assertIsNot(aio.get_executor(3), executor)
+
+
+class TestSplitBlock(unittest.TestCase):
+    def test_pending(self):
+        reports, pending = bulletin._split_block(b"KBOS 291130Z", b" 2912/3018 SKC= KDEN", "latin-1")
+        self.assertEqual(reports, ["KBOS 291130Z 2912/3018 SKC"])
+        self.assertEqual(pending, b" KDEN")
+
+        reports, pending = bulletin._split_block(pending, " 291134Z", "latin-1")
+        self.assertEqual(reports, [])
+        self.assertEqual(pending, b" KDEN 291134Z")
+
+    def test_max_pending(self):
+        pending = b""
+        flushed = []
+        for i in range(bulletin.MAX_PENDING // 1000 * 3):
+            reports, pending = bulletin._split_block(pending, b"X" * 999 + b" ", "latin-1")
+            self.assertLessEqual(len(pending), bulletin.MAX_PENDING)
+            flushed.extend(reports)
+        self.assertGreaterEqual(len(flushed), 2)
+        self.assertTrue(all(len(report) > pytaf.TAF.MAX_LENGTH for report in flushed))
+
+
+if __name__ == "__main__":
+    unittest.main()
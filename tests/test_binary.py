@@ -0,0 +1,175 @@
+""" Binary serialization round trips and in-place lookups """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytaf
+from pytaf import binary
+from pytaf.model import Record, _to_plain
+
+REPORTS = [
+    "TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001 "
+    "TEMPO 2912/2914 1SM BR OVC004 "
+    "FM291500 04006KT P6SM SKC "
+    "FM292200 09011G21KT P6SM SCT080 "
+    "PROB30 3001/3005 4SM -TSRA BR BKN050CB "
+    "BECMG 3006/3008 VRB03KT",
+
+    "TAF EGLL 291100Z 2912/3018 24015G25KT CAVOK "
+    "PROB40 TEMPO 2914/2918 5000 SHRA BKN015CB "
+    "BECMG 3003/3006 30008KT 9999 NSC",
+
+    "TAF AMD UUEE 291200Z 2912/3012 18005MPS 9999 BKN020 "
+    "TEMPO 2912/2918 -SHRA BKN010CB PROB30 TEMPO 2918/2924 0800 FG VV002",
+
+    "METAR KBOS 291154Z 18005KT 10SM FEW250 18/09 A3012",
+]
+
+# Not parsed in strict mode
+BROKEN = ["", "garbage", "TAF KDEN"]
+
+# 2025-09-29 12:00 UTC, close to the issue times above
+REFERENCE_TIME = 1759147200
+
+
+def _snapshot(taf):
+    """ Everything a TAF object or a ReportView gives, as plain values """
+    return((taf.get_taf(), _to_plain(taf.get_header()), _to_plain(taf.get_groups()), taf.get_maintenance(),
+            taf.get_status(), taf.get_error(), taf.get_error_stage(), taf.get_header_span()))
+
+
+class TestRoundTrip(unittest.TestCase):
+    def assertRoundTrip(self, tafs):
+        data = binary.dumps(tafs)
+        for model in pytaf.TAF.MODELS:
+            restored = binary.loads(data, model)
+            self.assertEqual(len(restored), len(tafs))
+            for taf, copy in zip(tafs, restored):
+                self.assertEqual(_snapshot(copy), _snapshot(taf))
+                self.assertEqual(copy._model, model)
+        return(data)
+
+    def test_strict(self):
+        self.assertRoundTrip([pytaf.TAF(report) for report in REPORTS])
+
+    def test_not_strict(self):
+        tafs = [pytaf.TAF(report, strict=False) for report in REPORTS + BROKEN]
+        self.assertIn(pytaf.TAF.STATUS_FAILED, [taf.get_status() for taf in tafs])
+        self.assertRoundTrip(tafs)
+
+        restored = binary.loads(binary.dumps(tafs))
+        self.assertEqual(restored[-1].get_error_stage(), tafs[-1].get_error_stage())
+        self.assertIsNone(restored[len(REPORTS)].get_header())
+
+    def test_reference_time(self):
+        tafs = [pytaf.TAF(report, reference_time=REFERENCE_TIME) for report in REPORTS]
+        self.assertRoundTrip(tafs)
+
+        header = binary.loads(binary.dumps(tafs))[0].get_header()
+        self.assertEqual(header["origin_time"], tafs[0].get_header()["origin_time"])
+        self.assertIsInstance(header["origin_time"], int)
+        self.assertEqual(binary.Reader(binary.dumps(tafs))[0].group_field(1, "header", "from_time"),
+                         tafs[0].get_groups()[1]["header"]["from_time"])
+
+    def test_slots(self):
+        tafs = [pytaf.TAF(report, model="slots", strict=False) for report in REPORTS + BROKEN]
+        self.assertRoundTrip(tafs)
+
+        # Same data as the dict model
+        dicts = [pytaf.TAF(report, strict=False) for report in REPORTS + BROKEN]
+        self.assertEqual([_snapshot(taf) for taf in binary.loads(binary.dumps(tafs))],
+                         [_snapshot(taf) for taf in dicts])
+
+        restored = binary.loads(binary.dumps(tafs), "slots")
+        self.assertIsInstance(restored[0].get_header(), Record)
+        self.assertIsInstance(restored[0].get_groups()[0], Record)
+
+    def test_lazy(self):
+        self.assertRoundTrip([pytaf.TAF(report, lazy=True) for report in REPORTS])
+
+    def test_decoder(self):
+        for taf in binary.loads(binary.dumps([pytaf.TAF(report) for report in REPORTS[:3]])):
+            self.assertEqual(pytaf.Decoder(taf).decode_taf(), pytaf.Decoder(pytaf.TAF(taf.get_taf())).decode_taf())
+
+    def test_bad_data(self):
+        for data in (b"", b"PTAF", b"JUNK" + bytes(20)):
+            with self.assertRaises(binary.FormatError):
+                binary.Reader(data)
+
+        data = bytearray(binary.dumps([]))
+        data[4] = binary.VERSION + 1
+        with self.assertRaises(binary.FormatError):
+            binary.Reader(data)
+
+
+class TestReader(unittest.TestCase):
+    def setUp(self):
+        self.tafs = [pytaf.TAF(report, strict=False, reference_time=REFERENCE_TIME) for report in REPORTS + BROKEN]
+        self.data = binary.dumps(self.tafs)
+
+    def test_views(self):
+        reader = binary.Reader(self.data)
+        self.assertEqual(len(reader), len(self.tafs))
+        for taf, view in zip(self.tafs, reader):
+            self.assertEqual(_snapshot(view), _snapshot(taf))
+            self.assertEqual(view.group_count(), len(taf.get_groups() or []))
+        self.assertEqual(_snapshot(reader[-1]), _snapshot(self.tafs[-1]))
+        with self.assertRaises(IndexError):
+            reader[len(self.tafs)]
+
+    def test_open(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "reports.bin")
+            with open(path, "wb") as f:
+                binary.dump(self.tafs, f)
+
+            with binary.Reader.open(path) as reader:
+                self.assertEqual([_snapshot(view) for view in reader], [_snapshot(taf) for taf in self.tafs])
+                self.assertEqual(reader[1].header_field("icao_code"), "EGLL")
+
+            with open(path, "rb") as f:
+                restored = binary.load(f, "slots")
+            self.assertEqual([_snapshot(taf) for taf in restored], [_snapshot(taf) for taf in self.tafs])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_header_field(self):
+        view = binary.Reader(self.data)[2]
+        header = self.tafs[2].get_header()
+        self.assertEqual(view.header_field("icao_code"), "UUEE")
+        self.assertEqual(view.header_field("type"), header["type"])
+        self.assertEqual(view.header_field("origin_time"), header["origin_time"])
+        self.assertIsNone(view.header_field("no_such_field"))
+        self.assertEqual(view.header_field("no_such_field", default=""), "")
+        self.assertIsNone(view.header_field("icao_code", "too_deep"))
+
+        # Failed reports have no header
+        self.assertIsNone(binary.Reader(self.data)[-1].header_field("icao_code"))
+
+    def test_group_field(self):
+        view = binary.Reader(self.data)[0]
+        groups = self.tafs[0].get_groups()
+        self.assertEqual(view.group_field(0, "wind"), groups[0]["wind"])
+        self.assertEqual(view.group_field(0, "wind", "speed"), "06")
+        self.assertEqual(view.group_field(0, "clouds", 0, "layer"), "OVC")
+        self.assertEqual(view.group_field(4, "clouds", -1, "type"), "CB")
+        self.assertEqual(view.group_field(-1, "header", "type"), "BECMG")
+        self.assertEqual(view.group_field(4, "weather", 0), groups[4]["weather"][0])
+        self.assertEqual(view.group_field(4, "weather", 1, "phenomenon", 0), "BR")
+
+        self.assertIsNone(view.group_field(0, "clouds", 5, "layer"))
+        self.assertIsNone(view.group_field(0, "clouds", "layer"))
+        self.assertEqual(view.group_field(0, "no_such_field", default=0), 0)
+        with self.assertRaises(IndexError):
+            view.group_field(len(groups), "wind")
+
+        for i, group in enumerate(groups):
+            self.assertEqual(view.get_group(i), group)
+            self.assertEqual(view.group_field(i, "header"), group["header"])
+
+
+if __name__ == "__main__":
+    unittest.main()
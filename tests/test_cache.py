@@ -0,0 +1,67 @@
+""" Parse cache and the copies it hands out """
+
+import pickle
+import unittest
+
+import pytaf
+from pytaf import export
+
+REPORT = ("TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001\n"
+          "     TEMPO 2912/2914 1SM BR OVC004 FM291500 04006KT P6SM SKC")
+
+
+class TestCopies(unittest.TestCase):
+    def test_shared_until_handed_out(self):
+        for model in pytaf.TAF.MODELS:
+            cache = pytaf.ParseCache(model=model)
+            cached = cache.parse(REPORT, copy=False)
+            copy = cache.parse(REPORT)
+            self.assertEqual(cache.hits, 1)
+
+            # Exporting or checking the status doesn't copy anything
+            self.assertEqual(copy.get_status(), pytaf.TAF.STATUS_OK)
+            self.assertEqual(export.dumps(copy), export.dumps(cached))
+            self.assertIs(copy._weather_groups, cached._weather_groups)
+
+            copy.get_groups()[0]["wind"]["speed"] = "99"
+            copy.get_header()["icao_code"] = "KBOS"
+            self.assertEqual(cached.get_groups()[0]["wind"]["speed"], "06")
+            self.assertEqual(cached.get_header()["icao_code"], "KDEN")
+            self.assertEqual(cache.parse(REPORT).get_groups(), cached.get_groups())
+
+    def test_decoded(self):
+        cache = pytaf.ParseCache()
+        cached = cache.parse(REPORT, copy=False)
+        text = pytaf.Decoder(cached).decode_taf()
+        json = export.dumps(cached)
+
+        # Memoized text of the cached object doesn't hold for a modified copy
+        copy = cache.parse(REPORT)
+        copy.get_groups()[0]["wind"]["speed"] = "99"
+        self.assertIn("99 knots", pytaf.Decoder(copy).decode_taf())
+        self.assertIn('"speed":"99"', export.dumps(copy))
+
+        self.assertEqual(pytaf.Decoder(cached).decode_taf(), text)
+        self.assertEqual(export.dumps(cached), json)
+        self.assertEqual(pytaf.Decoder(cache.parse(REPORT)).decode_taf(), text)
+
+    def test_pickle(self):
+        cache = pytaf.ParseCache()
+        cache.parse(REPORT)
+        copy = pickle.loads(pickle.dumps(cache.parse(REPORT)))
+        copy.get_groups()[0]["wind"]["speed"] = "99"
+        self.assertEqual(cache.parse(REPORT, copy=False).get_groups()[0]["wind"]["speed"], "06")
+
+    def test_normalized_text(self):
+        cache = pytaf.ParseCache()
+        taf = cache.parse(REPORT)
+        self.assertIsNot(cache.parse(" ".join(REPORT.split())), taf)
+        self.assertEqual(cache.hits, 1)
+
+        self.assertEqual(taf.get_taf(), " ".join(REPORT.split()))
+        start, end = taf.get_header_span()
+        self.assertEqual(taf.get_taf()[start:end], "TAF KDEN 291134Z 2912/3018")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+""" JSON export of parsed reports """
+
+import io
+import json
+import unittest
+
+import pytaf
+from pytaf import export
+
+REPORT = ("TAF EGLL 291100Z 2912/3018 24015G25KT CAVOK "
+          "BECMG 3003/3006 30008KT 9999 NSC")
+
+
+class TestExport(unittest.TestCase):
+    def test_empty_fields(self):
+        for model in pytaf.TAF.MODELS:
+            text = export.dumps(pytaf.TAF(REPORT, model=model))
+            for empty in (":null", ':""', ":[]", ":{}"):
+                self.assertNotIn(empty, text)
+
+            report = json.loads(text)
+            self.assertNotIn("error", report)
+            self.assertNotIn("header", report["groups"][0])
+            self.assertNotIn("visibility", report["groups"][0])
+            self.assertEqual(report["groups"][0]["wind"], {"direction": "240", "speed": "15", "gust": "25", "unit": "KT"})
+            self.assertEqual(report["groups"][1]["visibility"], {"range": "10 000", "more": True, "unit": "M"})
+
+    def test_memoized(self):
+        # Groups of the second report are written from memoized objects
+        for model in pytaf.TAF.MODELS:
+            tafs = [pytaf.TAF(REPORT + " $", model=model), pytaf.TAF(REPORT.replace("EGLL", "EGKK") + " $", model=model)]
+            first, second = [json.loads(export.dumps(taf)) for taf in tafs]
+            self.assertEqual(second["groups"], first["groups"])
+            self.assertEqual(second["header"]["icao_code"], "EGKK")
+            self.assertEqual(second["maintenance"], "$")
+
+    def test_failures(self):
+        results = list(pytaf.parse_many([REPORT, "garbage"], errors="yield"))
+        report = json.loads(export.dumps(results[1]))
+        self.assertEqual(report["status"], pytaf.TAF.STATUS_FAILED)
+        self.assertEqual(report["report"], "garbage")
+
+        report = json.loads(export.dumps(pytaf.TAF("TAF", strict=False)))
+        self.assertEqual(report["status"], pytaf.TAF.STATUS_FAILED)
+        self.assertNotIn("header", report)
+
+    def test_dump_lines(self):
+        tafs = [pytaf.TAF(REPORT), pytaf.TAF(REPORT.replace("EGLL", "EGKK"))]
+        binary = io.BytesIO()
+        text = io.StringIO()
+        self.assertEqual(export.dump_lines(tafs, binary), 2)
+        export.dump_lines(tafs, text)
+        self.assertEqual(binary.getvalue().decode("ascii"), text.getvalue())
+        self.assertEqual([json.loads(line)["header"]["icao_code"] for line in text.getvalue().splitlines()],
+                         ["EGLL", "EGKK"])
+
+
+if __name__ == "__main__":
+    unittest.main()
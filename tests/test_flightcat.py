@@ -0,0 +1,55 @@
+""" Flight categories, from parsed reports and from columns """
+
+import unittest
+
+import pytaf
+from pytaf import flightcat
+from pytaf import units
+from pytaf.columnar import ColumnarCollector
+
+REPORTS = [
+    "TAF EGLL 291100Z 2912/3018 24015G25KT CAVOK "
+    "PROB40 TEMPO 2914/2918 5000 SHRA BKN015CB "
+    "BECMG 3003/3006 30008KT 9999 NSC",
+
+    "TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001 "
+    "FM291500 04006KT P6SM SKC "
+    "FM292200 09011G21KT 4SM SCT080 "
+    "BECMG 3006/3008 VRB03KT",
+
+    "METAR KBOS 291154Z 18005KT 2SM BR BKN008 18/17 A3012",
+]
+
+# Per group, in order
+CATEGORIES = [flightcat.VFR, flightcat.MVFR, flightcat.VFR,
+              flightcat.LIFR, flightcat.VFR, flightcat.MVFR, flightcat.UNKNOWN,
+              flightcat.IFR]
+
+
+class TestFlightCategories(unittest.TestCase):
+    def test_cavok(self):
+        self.assertEqual(units.visibility_meters({}, [{"layer": "CAVOK"}]), units.CAVOK_VISIBILITY)
+        self.assertIsNone(units.visibility_meters({}, [{"layer": "BKN", "ceiling": "010"}]))
+        self.assertEqual(units.visibility_meters({"range": "1", "unit": "SM"}, [{"layer": "CAVOK"}]),
+                         units.METERS_PER_STATUTE_MILE)
+
+    def test_flight_categories(self):
+        result = flightcat.flight_categories(pytaf.TAF(report) for report in REPORTS)
+        self.assertEqual(list(result["category"]), CATEGORIES)
+        self.assertEqual(result["station"][:3], ["EGLL"] * 3)
+
+    def test_same_as_columns(self):
+        tafs = list(pytaf.parse_many(REPORTS[:1] + ["garbage"] + REPORTS[1:], errors="yield"))
+        result = flightcat.flight_categories(tafs)
+
+        collector = ColumnarCollector()
+        collector.extend(tafs)
+        columns = collector.columns()
+
+        self.assertEqual(list(result["report_index"]), list(columns["report_index"]))
+        self.assertEqual(list(result["category"]), CATEGORIES)
+        self.assertEqual(list(flightcat.categorize(columns["visibility_m"], columns["ceiling_ft"])), CATEGORIES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+""" Weather group splitting, and its time bound on hostile input """
+
+import time
+import random
+import unittest
+
+import pytaf
+from pytaf import grammar
+from pytaf import tokenizer
+
+# Seconds a single report may take to parse. Junk of the sizes below
+# takes a few milliseconds, the old backtracking splitter took
+# up to 8 seconds (see test_unterminated_run).
+TIME_BOUND = 1.0
+
+REPORTS = [
+    "TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001 "
+    "TEMPO 2912/2914 1SM BR OVC004 "
+    "FM291500 04006KT P6SM SKC "
+    "FM292200 09011G21KT P6SM SCT080 "
+    "PROB30 3001/3005 4SM -TSRA BR BKN050CB "
+    "BECMG 3006/3008 VRB03KT",
+
+    "TAF EGLL 291100Z 2912/3018 24015G25KT CAVOK "
+    "PROB40 TEMPO 2914/2918 5000 SHRA BKN015CB "
+    "BECMG 3003/3006 30008KT 9999 NSC",
+
+    "TAF AMD UUEE 291200Z 2912/3012 18005MPS 9999 BKN020 "
+    "TEMPO 2912/2918 -SHRA BKN010CB PROB30 TEMPO 2918/2924 0800 FG VV002",
+]
+
+# Stations with FM in their ICAO code, well-formed, METAR, and garbled reports
+FM_STATIONS = [
+    "TAF KFMG 291134Z 2912/3018 32006KT P6SM SKC FM291500 04006KT P6SM SKC",
+    "TAF AMD KHFM 291134Z 2912/3018 32006KT P6SM SKC TEMPO 2914/2916 1SM BR",
+    "METAR KFMG 291153Z 32006KT 10SM SKC 18/09 A3012",
+    "METAR KHFM 291153Z 32006KT 10SM FEW250 18/09 A3012",
+    "TAF KFMG 2911Z 2912/3018 32006KT P6SM SKC FM291500 04006KT P6SM SKC",
+    "TAF KHFM 291134Z 2912/3018 32006KT P6SM SKC KFMG FM291500 04006KT P6SM SKC",
+]
+
+
+def _junk(generator, length):
+    """ Random junk made of group keywords, field-like tokens and garbage """
+
+    words = ("FM", "FM1", "FM121800", "PROB", "PROB30", "TEMPO", "BECMG", "1012/1014",
+             "BKN010", "-RA", "9999", "P6SM", "KT", "$", "///", "X", "ZZZZZZZZ")
+    parts = []
+    size = 0
+    while size < length:
+        word = generator.choice(words) if generator.random() < 0.8 else \
+            "".join(generator.choice("ABFMPRTOEGCNKS0123456789/+-") for _ in range(generator.randrange(1, 40)))
+        separator = generator.choice((" ", " ", "  ", "\n", ""))
+        parts.append(word + separator)
+        size += len(word) + len(separator)
+    return("".join(parts)[:length])
+
+
+class TestSplitGroups(unittest.TestCase):
+    def test_same_as_pattern(self):
+        for report in REPORTS:
+            body = pytaf.TAF(report)._get_body()
+            self.assertEqual(tokenizer.split_groups(body), grammar.get("taf_group").findall(body))
+
+    def test_same_as_regex_engine(self):
+        for report in REPORTS + FM_STATIONS:
+            for strict in (True, False):
+                regex = pytaf.TAF(report, strict=strict, engine="regex")
+                tokens = pytaf.TAF(report, strict=strict, engine="tokens")
+                self.assertEqual(tokens.get_groups(), regex.get_groups(), report)
+                self.assertEqual(tokens.get_status(), regex.get_status(), report)
+
+    def test_fm_stations(self):
+        # The taf_group pattern split groups at any FM, station codes included
+        body = pytaf.TAF(FM_STATIONS[-1], strict=False)._get_body()
+        self.assertEqual(tokenizer.split_groups(body), [" 32006KT P6SM SKC KFMG ", "FM291500 04006KT P6SM SKC"])
+        self.assertEqual(len(grammar.get("taf_group").findall(body)), 3)
+
+        groups = pytaf.TAF(FM_STATIONS[0]).get_groups()
+        self.assertEqual([group["header"].get("type") for group in groups], [None, "FM"])
+
+    def test_group_headers(self):
+        groups = pytaf.TAF(REPORTS[0]).get_groups()
+        self.assertEqual([group["header"].get("type") for group in groups],
+                         [None, "TEMPO", "FM", "FM", "PROB30", "BECMG"])
+
+    def test_prob_tempo(self):
+        groups = pytaf.TAF(REPORTS[2]).get_groups()
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(groups[2]["header"]["type"], "PROB30 TEMPO")
+        self.assertEqual(groups[2]["header"]["probability"], "30")
+
+    def test_terminator(self):
+        # The taf_group pattern dropped the last group of "=" terminated reports
+        body = " 18010KT P6SM SCT050 FM121800 20012KT 6SM -RA BKN020="
+        self.assertEqual(tokenizer.split_groups(body), [" 18010KT P6SM SCT050 ", "FM121800 20012KT 6SM -RA BKN020="])
+        self.assertEqual(grammar.get("taf_group").findall(body), [" 18010KT P6SM SCT050 "])
+
+
+class TestHostileInput(unittest.TestCase):
+    def assertFast(self, report):
+        start = time.perf_counter()
+        taf = pytaf.TAF(report, strict=False)
+        taf.get_groups()
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, TIME_BOUND, "%d byte report took %.2f s" % (len(report), elapsed))
+
+    def test_random_junk(self):
+        generator = random.Random(12)
+        for length in (2048, 8192, pytaf.TAF.MAX_LENGTH - 32):
+            for prefix in ("TAF KDEN 291134Z 2912/3018 ", "METAR KDEN 291134Z ", "", "TAF "):
+                junk = prefix + _junk(generator, length)
+                self.assertFast(junk)
+                self.assertLess(len(tokenizer.split_groups(junk)), len(junk.split()) + 1)
+
+    def test_repeated_keywords(self):
+        header = "TAF KDEN 291134Z 2912/3018 "
+        length = pytaf.TAF.MAX_LENGTH - len(header)
+        for word in ("TEMPO ", "PROB30 ", "PROB30 TEMPO ", "FM", "FM121800 ", "BECMG", "A", " ", "PROB"):
+            self.assertFast(header + (word * (length // len(word)))[:length])
+
+    def test_unterminated_run(self):
+        # Long keyword-free runs ending in a character the taf_group pattern
+        # doesn't allow made it retry the whole run from every position
+        header = "TAF KDEN 291134Z 2912/3018 "
+        length = pytaf.TAF.MAX_LENGTH - len(header) - 1
+        for word, end in (("BKN010 ", "="), ("A ", "x"), ("9999", "a"), ("-RA ", "=")):
+            self.assertFast(header + (word * (length // len(word)))[:length] + end)
+
+    def test_too_long(self):
+        report = "TAF KDEN 291134Z 2912/3018 " + "TEMPO " * pytaf.TAF.MAX_LENGTH
+
+        with self.assertRaises(pytaf.MalformedTAF) as context:
+            pytaf.TAF(report)
+        self.assertEqual(context.exception.stage, "input")
+
+        taf = pytaf.TAF(report, strict=False)
+        self.assertEqual(taf.get_status(), pytaf.TAF.STATUS_FAILED)
+        self.assertEqual(taf.get_error_stage(), "input")
+
+
+if __name__ == "__main__":
+    unittest.main()
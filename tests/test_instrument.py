@@ -0,0 +1,51 @@
+""" Parsing instrumentation counters """
+
+import unittest
+
+import pytaf
+import pytaf.instrument
+from pytaf import instrument
+
+REPORT = ("TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001 "
+          "TEMPO 2912/2914 1SM BR OVC004 FM291500 04006KT P6SM SKC")
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.stats = instrument.install()
+
+    def tearDown(self):
+        instrument.uninstall()
+
+    def test_groups(self):
+        pytaf.TAF(REPORT)
+        pytaf.TAF("METAR KBOS 291154Z 18005KT 10SM FEW250 18/09 A3012")
+        self.assertEqual(self.stats.snapshot()["reports"], 2)
+        self.assertEqual(self.stats.snapshot()["groups"], 4)
+        self.assertEqual(self.stats.snapshot()["stages"]["group"]["calls"], 4)
+
+    def test_lazy(self):
+        tafs = [pytaf.TAF(REPORT, lazy=True), pytaf.TAF(REPORT, lazy=True, engine="tokens")]
+        self.assertEqual(self.stats.groups, 0)
+
+        for taf in tafs:
+            taf.get_groups()
+            taf.get_groups()
+        self.assertEqual(self.stats.groups, 6)
+        self.assertEqual(self.stats.reports, 2)
+
+    def test_uninstall(self):
+        instrument.uninstall()
+        self.assertFalse(instrument.installed())
+        for stage, (cls, name) in instrument.STAGES.items():
+            self.assertFalse(hasattr(cls.__dict__[name], "__wrapped__"), stage)
+        cls, name = instrument.GROUPS
+        self.assertFalse(hasattr(cls.__dict__[name], "__wrapped__"))
+
+        pytaf.TAF(REPORT)
+        self.assertEqual(self.stats.groups, 0)
+        instrument.install(self.stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+""" String interning of parsed reports, TAF(string, intern=True) """
+
+import sys
+import pickle
+import unittest
+
+import pytaf
+from pytaf import codes
+
+REPORTS = [
+    "TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001 "
+    "TEMPO 2912/2914 1SM BR OVC004 FM291500 04006KT P6SM SKC",
+
+    "TAF KDEN 291734Z 2918/3024 04006KT P6SM SCT080 "
+    "PROB30 3001/3005 4SM -TSRA BR BKN050CB",
+
+    "TAF EGLL 291100Z 2912/3018 24015G25KT CAVOK "
+    "BECMG 3003/3006 30008KT 9999 NSC $",
+
+    "METAR KBOS 291154Z 18005KT 10SM FEW250 18/09 A3012",
+]
+
+
+def _strings(value):
+    """ Yields the string values of a header or group, and of the dicts, records and lists in it """
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            for string in _strings(item):
+                yield string
+    elif value is not None and hasattr(value, "items"):
+        for item in value.values():
+            for string in _strings(item):
+                yield string
+
+
+class TestIntern(unittest.TestCase):
+    def assertInterned(self, taf):
+        self.assertIs(taf.get_header()["icao_code"], sys.intern(taf.get_header()["icao_code"]))
+        for part in [taf.get_header()] + taf.get_groups():
+            for string in _strings(part):
+                if string in codes.INDEX:
+                    self.assertIs(string, codes.intern(string), string)
+        if taf.get_maintenance() is not None:
+            self.assertIs(taf.get_maintenance(), codes.intern(taf.get_maintenance()))
+
+    def test_same_results(self):
+        for engine in pytaf.TAF.ENGINES:
+            for model in pytaf.TAF.MODELS:
+                for lazy in (False, True):
+                    for report in REPORTS:
+                        options = {"engine": engine, "model": model, "lazy": lazy}
+                        taf = pytaf.TAF(report, intern=True, **options)
+                        expected = pytaf.TAF(report, **options)
+                        self.assertEqual(taf.get_header(), expected.get_header())
+                        self.assertEqual(taf.get_groups(), expected.get_groups())
+                        self.assertEqual(taf.get_maintenance(), expected.get_maintenance())
+                        self.assertInterned(taf)
+
+    def test_shared(self):
+        for model in pytaf.TAF.MODELS:
+            first, second = [pytaf.TAF(report, intern=True, model=model) for report in REPORTS[:2]]
+            self.assertIs(first.get_header()["icao_code"], second.get_header()["icao_code"])
+            self.assertIs(first.get_groups()[2]["wind"]["direction"], second.get_groups()[0]["wind"]["direction"])
+            self.assertIs(first.get_groups()[2]["wind"]["speed"], second.get_groups()[0]["wind"]["speed"])
+            self.assertIs(first.get_groups()[2]["visibility"]["unit"], second.get_groups()[0]["visibility"]["unit"])
+
+    def test_pickle(self):
+        # Unpickled strings are new objects, they are interned again
+        for model in pytaf.TAF.MODELS:
+            tafs = [pytaf.TAF(report, intern=True, model=model) for report in REPORTS]
+            for taf in pickle.loads(pickle.dumps(tafs, pickle.HIGHEST_PROTOCOL)):
+                self.assertInterned(taf)
+
+            restored = pickle.loads(pickle.dumps(tafs[0]))
+            self.assertIs(restored.get_header()["icao_code"], tafs[1].get_header()["icao_code"])
+            self.assertIs(restored.get_groups()[2]["wind"]["speed"], tafs[1].get_groups()[0]["wind"]["speed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+""" Forecast conditions at a given time """
+
+import unittest
+
+import pytaf
+from pytaf import intervals
+
+# 2025-09-29 12:00 UTC, close to the issue times below
+REFERENCE_TIME = 1759147200
+HOUR = 3600
+
+REPORT = ("TAF KDEN 291134Z 2912/3018 32006KT P6SM SKC "
+          "TEMPO 2914/2916 1SM BR "
+          "FM292200 04006KT P6SM SCT080")
+
+
+class TestTimeline(unittest.TestCase):
+    def test_groups(self):
+        timeline = intervals.Timeline(pytaf.TAF(REPORT), REFERENCE_TIME)
+        self.assertEqual(timeline.valid_from, REFERENCE_TIME)
+        self.assertEqual(timeline.valid_till, REFERENCE_TIME + 30 * HOUR)
+
+        conditions = timeline.at(REFERENCE_TIME + 3 * HOUR)
+        self.assertEqual(conditions["prevailing"]["wind"]["direction"], "320")
+        self.assertEqual([change["header"]["type"] for change in conditions["changes"]], ["TEMPO"])
+        self.assertEqual(timeline.at(REFERENCE_TIME + 11 * HOUR)["prevailing"]["wind"]["direction"], "040")
+        self.assertIsNone(timeline.at(REFERENCE_TIME + 31 * HOUR))
+
+    def test_headerless_change_group(self):
+        # The garbled FM group has no header, it must not replace the initial group
+        for engine in pytaf.TAF.ENGINES:
+            taf = pytaf.TAF(REPORT + " FM29XX00 18030KT 1/4SM FG", strict=False, engine=engine)
+            self.assertEqual(taf.get_groups()[-1]["header"], {})
+
+            timeline = intervals.Timeline(taf, REFERENCE_TIME)
+            for hour in (0, 3, 9):
+                self.assertEqual(timeline.at(REFERENCE_TIME + hour * HOUR)["prevailing"]["wind"]["direction"], "320")
+            self.assertEqual(timeline.at(REFERENCE_TIME + 11 * HOUR)["prevailing"]["wind"]["direction"], "040")
+
+
+if __name__ == "__main__":
+    unittest.main()
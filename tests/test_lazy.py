@@ -0,0 +1,29 @@
+""" Lazy parsing, TAF(string, lazy=True) """
+
+import unittest
+
+import pytaf
+
+REPORT = ("TAF KDEN 291134Z 2912/3018 32006KT 1/4SM FG OVC001 "
+          "TEMPO 2912/2914 1SM BR OVC004 FM291500 04006KT P6SM SKC")
+
+
+class TestLazy(unittest.TestCase):
+    def test_same_groups(self):
+        for engine in pytaf.TAF.ENGINES:
+            expected = pytaf.TAF(REPORT, engine=engine).get_groups()
+            self.assertEqual(pytaf.TAF(REPORT, engine=engine, lazy=True).get_groups(), expected)
+
+    def test_compare_unparsed(self):
+        # Neither side has been looked at before the comparison
+        first, second = [pytaf.TAF(REPORT, lazy=True).get_groups() for _ in range(2)]
+        self.assertEqual(first, second)
+        self.assertFalse(first != second)
+
+        first, second = [pytaf.TAF(REPORT, lazy=True).get_groups() for _ in range(2)]
+        self.assertFalse(first[0] != second[0])
+        self.assertEqual(second[1], first[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+""" Current reports by station """
+
+import unittest
+
+import pytaf
+
+# 2025-09-29 12:00 UTC, close to the issue times below
+REFERENCE_TIME = 1759147200
+HOUR = 3600
+
+FORECAST = "TAF KDEN 291134Z 2912/3018 32006KT P6SM SKC"
+OBSERVATION = "METAR KDEN 291153Z 32006KT 10SM SKC 18/09 A3012"
+
+
+class Clock(object):
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return(self.now)
+
+
+class TestExpiry(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock(REFERENCE_TIME)
+        self.store = pytaf.StationStore(clock=self.clock)
+
+    def test_lookup(self):
+        self.assertTrue(self.store.add(pytaf.TAF(OBSERVATION), received=REFERENCE_TIME))
+        self.assertEqual(self.store.observation("KDEN").get_taf(), OBSERVATION)
+
+        # An expired report is dropped when it's looked up,
+        # and so is its station if it has no other reports
+        self.clock.now += 3 * HOUR
+        self.assertIsNone(self.store.observation("KDEN"))
+        self.assertNotIn("KDEN", self.store)
+        self.assertEqual(len(self.store), 0)
+
+    def test_lookup_other_report(self):
+        self.store.add(pytaf.TAF(FORECAST), received=REFERENCE_TIME)
+        self.store.add(pytaf.TAF(OBSERVATION), received=REFERENCE_TIME)
+
+        self.clock.now += 3 * HOUR
+        self.assertIsNone(self.store.observation("KDEN"))
+        self.assertIn("KDEN", self.store)
+        self.assertEqual(self.store.forecast("KDEN").get_taf(), FORECAST)
+
+        self.clock.now += 30 * HOUR
+        self.assertIsNone(self.store.forecast("KDEN"))
+        self.assertEqual(self.store.stations(), [])
+
+    def test_expire(self):
+        self.store.add(pytaf.TAF(FORECAST), received=REFERENCE_TIME)
+        self.store.add(pytaf.TAF(OBSERVATION), received=REFERENCE_TIME)
+        self.clock.now += 3 * HOUR
+        self.assertEqual(self.store.expire(), 1)
+        self.clock.now += 30 * HOUR
+        self.assertEqual(self.store.expire(), 1)
+        self.assertEqual(len(self.store), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()